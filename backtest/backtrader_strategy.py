@@ -1,128 +1,185 @@
 import backtrader as bt
-from datetime import datetime, timedelta
-import random
-import pandas as pd
-import numpy as np
 import sys
 import os  # os 모듈 추가
+import json
+import pandas as pd
 
 # src 디렉토리 경로 추가
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from strategies.obv_strategy import OBVStrategy  # 전략 임포트
-import json
+from config import config
+from store_feed import config_feed
+from result_cache import ResultCache, backtest_key
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+class TradeList(bt.Analyzer):
+    """청산된 거래 목록 (진입/청산 시각, 수량, 진입가, 손익, 수수료, 보유 봉 수)"""
+
+    def start(self):
+        self.trades = []
+        self._sizes = {}
+
+    def notify_trade(self, trade):
+        if trade.justopened:
+            self._sizes[trade.ref] = trade.size
+        if not trade.isclosed:
+            return
+        self.trades.append({
+            'entry_time': bt.num2date(trade.dtopen),
+            'exit_time': bt.num2date(trade.dtclose),
+            'size': self._sizes.pop(trade.ref, 0.0),
+            'entry_price': trade.price,
+            'pnl': trade.pnl,
+            'pnl_net': trade.pnlcomm,
+            'commission': trade.commission,
+            'bars': trade.barlen,
+        })
+
+    def get_analysis(self):
+        return self.trades
+
+
+class EquityCurve(bt.Analyzer):
+    """봉마다 브로커 자산 가치"""
 
-# 간단한 랜덤 워크 데이터 생성 클래스 (날짜 정보 추가)
-class RandomWalk(bt.feeds.DataBase):
-    params = (
-        ('start', datetime(2023, 1, 1)),
-        ('open', 50000.0),
-        ('high', 52000.0),
-        ('low', 48000.0),
-        ('close', 51000.0),
-        ('volume', 10000.0),
-        ('timeframe', bt.TimeFrame.Minutes),
-        ('compression', 5),
-    )
-    
-    def __init__(self):
-        super().__init__()
-        self.last_price = self.p.close
-        self.vol = self.p.volume
-        self.current_date = self.p.start
-        
     def start(self):
-        super().start()
-        self._index = 0
-        
-    def _load(self):
-        if self._index >= 100:  # 100개의 봉 생성
-            return False
-            
-        # 랜덤 가격 생성
-        change = random.uniform(-0.02, 0.02)
-        self.lines.open[0] = self.last_price
-        self.lines.high[0] = self.last_price * (1 + abs(change))
-        self.lines.low[0] = self.last_price * (1 - abs(change))
-        self.lines.close[0] = self.last_price * (1 + change)
-        self.lines.volume[0] = self.vol * random.uniform(0.8, 1.2)
-        self.lines.datetime[0] = bt.date2num(self.current_date)
-        
-        # 다음 봉을 위해 날짜 업데이트 (5분 간격)
-        self.current_date += timedelta(minutes=5)
-        self.last_price = self.lines.close[0]
-        self._index += 1
-        
-        return True
-
-# 백테스팅 설정
-cerebro = bt.Cerebro()
-
-# 데이터 로드
-data = RandomWalk(
-    dataname='RandomWalk',
-    timeframe=bt.TimeFrame.Minutes,
-    compression=5,
-    start=datetime(2023, 1, 1),
-    open=50000.0,
-    high=52000.0,
-    low=48000.0,
-    close=51000.0,
-    volume=10000.0
-)
-cerebro.adddata(data)
-
-# 전략 추가
-cerebro.addstrategy(OBVStrategy)
-
-# 분석기 추가
-cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
-cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
-cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
-cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
-cerebro.addanalyzer(bt.analyzers.PeriodStats, _name='stats')
-
-# 초기 자본 설정
-cerebro.broker.setcash(10000.0)
-
-# 백테스팅 실행
-print('Starting Portfolio Value: %.2f' % cerebro.broker.getvalue())
-results = cerebro.run()
-print('Final Portfolio Value: %.2f' % cerebro.broker.getvalue())
-
-# 결과 저장
-os.makedirs('backtest/results', exist_ok=True)
-
-# 거래 내역 저장 (간소화)
-try:
-    trades_analysis = results[0].analyzers.trades.get_analysis()
-    if trades_analysis and hasattr(trades_analysis, 'total'):
-        trades_df = pd.DataFrame([{
-            'total_trades': trades_analysis.total.total,
-            'won': trades_analysis.won.total,
-            'lost': trades_analysis.lost.total,
-            'pnl_net': trades_analysis.pnl.net.total,
-        }])
-        trades_df.to_csv('backtest/results/trades.csv')
-        print(f"Saved trades summary")
+        self.times = []
+        self.values = []
+
+    def next(self):
+        self.times.append(self.strategy.datetime.datetime())
+        self.values.append(self.strategy.broker.getvalue())
+
+    def get_analysis(self):
+        return {'datetime': self.times, 'value': self.values}
+
+
+def run_backtest(cfg=config, strategy=OBVStrategy, data=None, cache=None, **strategy_params):
+    """
+    backtest/config.py 설정으로 Backtrader 백테스트 실행
+
+    데이터는 로컬 캔들 저장소에서 설정된 심볼/시간 단위/기간을 읽고 (compression > 1이면
+    리샘플링), 초기 자본과 수수료도 설정값을 사용한다.
+
+    :param cfg: 백테스트 설정 (backtest/config.py 형식)
+    :param strategy: Backtrader 전략 클래스
+    :param data: 사용할 피드 (None이면 config_feed(cfg))
+    :param cache: ResultCache (데이터 구간/전략 소스/파라미터/브로커 설정이 같으면 저장된 결과 반환,
+                  data를 직접 넘기면 내용을 해시할 수 없으므로 사용하지 않음)
+    :param strategy_params: 전략 파라미터 (예: ma_period=30)
+    :return: {'start_value', 'final_value', 'trades': 거래 요약, 'performance': 성과 지표,
+              'trade_list': 거래 목록 DataFrame, 'equity': 자산 곡선 Series, 'analyzers': 분석기 출력}
+    """
+    key = None
+    if cache is not None and data is None:
+        key = backtest_key(cfg, strategy, strategy_params)
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    cerebro = bt.Cerebro()
+
+    # 데이터 로드
+    data = data if data is not None else config_feed(cfg)
+    compression = cfg['data'].get('compression', 1)
+    if compression > 1:
+        cerebro.resampledata(data, timeframe=data.p.timeframe, compression=data.p.compression * compression)
     else:
-        print("No trades executed during backtest")
-except Exception as e:
-    print(f"Error saving trades: {e}")
-
-# 성과 지표 저장
-try:
-    perf = {
-        'sharpe_ratio': results[0].analyzers.sharpe.get_analysis()['sharperatio'],
-        'drawdown': results[0].analyzers.drawdown.get_analysis()['max']['drawdown'],
-        'return_percent': results[0].analyzers.returns.get_analysis()['rtot'],
+        cerebro.adddata(data)
+
+    # 전략 추가
+    cerebro.addstrategy(strategy, **strategy_params)
+
+    # 분석기 추가
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+    cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
+    cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
+    cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
+    cerebro.addanalyzer(bt.analyzers.PeriodStats, _name='stats')
+    cerebro.addanalyzer(TradeList, _name='trade_list')
+    cerebro.addanalyzer(EquityCurve, _name='equity')
+
+    # 초기 자본, 수수료 설정
+    cerebro.broker.setcash(cfg['initial_cash'])
+    cerebro.broker.setcommission(commission=cfg.get('fee', 0.0) / 100)
+
+    start_value = cerebro.broker.getvalue()
+    results = cerebro.run()
+    strat = results[0]
+    equity = strat.analyzers.equity.get_analysis()
+    result = {
+        'start_value': start_value,
+        'final_value': cerebro.broker.getvalue(),
+        'trades': _trades_summary(strat),
+        'performance': _performance(strat),
+        'trade_list': pd.DataFrame(strat.analyzers.trade_list.get_analysis(),
+                                   columns=['entry_time', 'exit_time', 'size', 'entry_price',
+                                            'pnl', 'pnl_net', 'commission', 'bars']),
+        'equity': pd.Series(equity['value'], index=pd.DatetimeIndex(equity['datetime']), name='equity'),
+        'analyzers': {name: _plain(strat.analyzers.getbyname(name).get_analysis())
+                      for name in ('trades', 'sharpe', 'drawdown', 'returns', 'stats')},
+    }
+    if key is not None:
+        cache.put(key, result)
+    return result
+
+
+def _plain(analysis):
+    """분석기 출력(AutoOrderedDict 등)을 일반 dict로"""
+    if isinstance(analysis, dict):
+        return {k: _plain(v) for k, v in analysis.items()}
+    return analysis
+
+
+def _trades_summary(strat):
+    """거래 요약 (거래가 없으면 None)"""
+    trades_analysis = strat.analyzers.trades.get_analysis()
+    if not trades_analysis or not hasattr(trades_analysis, 'total') or not trades_analysis.total.get('closed'):
+        return None
+    return {
+        'total_trades': trades_analysis.total.total,
+        'won': trades_analysis.won.total,
+        'lost': trades_analysis.lost.total,
+        'pnl_net': trades_analysis.pnl.net.total,
     }
-    with open('backtest/results/performance.json', 'w') as f:
-        json.dump(perf, f)
+
+
+def _performance(strat):
+    return {
+        'sharpe_ratio': strat.analyzers.sharpe.get_analysis().get('sharperatio'),
+        'drawdown': strat.analyzers.drawdown.get_analysis()['max']['drawdown'],
+        'return_percent': strat.analyzers.returns.get_analysis()['rtot'],
+    }
+
+
+def save_results(result, out_dir=RESULTS_DIR):
+    """거래 요약(trades.csv), 거래 목록(trade_list.csv), 자산 곡선(equity.csv), 성과 지표(performance.json) 저장"""
+    os.makedirs(out_dir, exist_ok=True)
+    result['equity'].to_csv(os.path.join(out_dir, 'equity.csv'))
+    if result['trades']:
+        pd.DataFrame([result['trades']]).to_csv(os.path.join(out_dir, 'trades.csv'))
+        result['trade_list'].to_csv(os.path.join(out_dir, 'trade_list.csv'), index=False)
+        print("Saved trades summary")
+    else:
+        print("No trades executed during backtest")
+    with open(os.path.join(out_dir, 'performance.json'), 'w') as f:
+        json.dump(result['performance'], f)
     print("Saved performance metrics")
-except Exception as e:
-    print(f"Performance analysis failed: {e}")
 
-# 결과 플롯 (옵션)
-# cerebro.plot(style='candlestick')
 
-print("Backtest results saved to backtest/results/")
\ No newline at end of file
+if __name__ == "__main__":
+    data_cfg = config['data']
+    print(f"Backtesting {data_cfg['symbol']} {data_cfg['timeframe']} "
+          f"{config['start_date']} ~ {config['end_date']}")
+    cache = ResultCache()
+    result = run_backtest(config, cache=cache)
+    print(f"Result cache: {'hit' if cache.hits else 'miss'} ({cache.root})")
+    print('Starting Portfolio Value: %.2f' % result['start_value'])
+    print('Final Portfolio Value: %.2f' % result['final_value'])
+
+    # 결과 저장
+    save_results(result)
+
+    print(f"Backtest results saved to {RESULTS_DIR}")
@@ -2,7 +2,8 @@
 config = {
     # 데이터 설정
     'data': {
-        'dataname': 'backtest/data/bybit_BTCUSDT_1h_20250810.csv',
+        'store': 'backtest/data/store',  # 로컬 캔들 저장소 경로 (src/history_store.py)
+        'symbol': 'BTC/USDT',    # 거래 심볼
         'timeframe': '1h',       # 캔들 시간 단위 (1m, 5m, 15m, 1h, 4h, 1d)
         'compression': 1,        # 데이터 압축률 (기본값 1)
     },
@@ -20,6 +21,7 @@ config = {
     'risk_per_trade': 1,  # 거래당 위험 비율 (%): 각 거래에서 위험하는 계정 자산의 비율 (1% 권장)
     'stop_loss': 2,       # 손절 비율 (%): 진입 가격 대비 손절 수준 (2% = 진입가격의 2% 하락 시 손절)
     'take_profit': 5,     # 익절 비율 (%): 진입 가격 대비 익절 수준 (5% = 진입가격의 5% 상승 시 익절)
+    'fee': 0.055,         # 체결 수수료 (%): 진입/청산 각각 명목 가치에 부과 (Bybit 테이커 0.055%)
     
     # 백테스팅 기간
     'start_date': '2025-07-01',  # 백테스팅 시작 일자
@@ -0,0 +1,216 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# src 디렉토리 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+METHODS = ('shuffle', 'bootstrap', 'slippage')
+METRICS = ('total_return', 'cagr', 'max_drawdown')
+
+CHUNK_SIMS = 2000          # 작업 하나의 시뮬레이션 수 (시드 분할 단위, 워커 수와 무관하게 결과 고정)
+BATCH_ELEMENTS = 4_000_000  # 한 번에 만드는 (시뮬레이션 x 구간) 배열 원소 수 (메모리 상한)
+
+
+def trade_returns(pnl, initial_cash):
+    """거래 손익을 거래 직전 자산 대비 수익률로 (순서대로 복리 적용하면 원래 자산 곡선)"""
+    pnl = np.asarray(pnl, dtype=float)
+    before = initial_cash + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    return pnl / before
+
+
+def trade_exposure(qty, entry_price, pnl, initial_cash):
+    """거래 명목 가치 / 거래 직전 자산 (슬리피지 비용 환산용)"""
+    pnl = np.asarray(pnl, dtype=float)
+    before = initial_cash + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    return np.abs(np.asarray(qty, dtype=float) * np.asarray(entry_price, dtype=float)) / before
+
+
+def from_trades(trades, initial_cash):
+    """
+    거래 목록 -> (수익률, 명목 노출)
+
+    :param trades: vector_backtest 거래 배열 딕셔너리 또는 run_backtest의 trade_list DataFrame
+    """
+    if isinstance(trades, pd.DataFrame):  # Backtrader TradeList
+        pnl, qty, price = trades['pnl_net'], trades['size'], trades['entry_price']
+    else:
+        pnl, qty, price = trades['pnl'], trades['qty'], trades['entry_price']
+    return trade_returns(pnl, initial_cash), trade_exposure(qty, price, pnl, initial_cash)
+
+
+def _shuffle(rng, returns, size):
+    """거래 순서 무작위 재배열 (최종 수익은 같고 경로/낙폭만 달라짐)"""
+    return rng.permuted(np.tile(returns, (size, 1)), axis=1)
+
+
+def _bootstrap(rng, returns, size, block):
+    """이동 블록 부트스트랩 (길이 block 구간을 복원 추출해 이어 붙임, 자기상관 유지)"""
+    n = len(returns)
+    block = min(block, n)
+    starts = rng.integers(0, n - block + 1, (size, -(-n // block)))
+    index = (starts[:, :, None] + np.arange(block)).reshape(size, -1)[:, :n]
+    return returns[index]
+
+
+def _slippage(rng, returns, exposure, size, slippage):
+    """진입/청산마다 평균 slippage(%)인 지수 분포 슬리피지를 명목 노출만큼 차감"""
+    shape = (size, len(returns))
+    cost = rng.exponential(slippage / 100, shape) + rng.exponential(slippage / 100, shape)
+    return returns - cost * exposure
+
+
+def path_metrics(returns, years, ruin):
+    """
+    수익률 경로 배열 (시뮬레이션, 구간) -> 경로별 지표
+
+    :param years: 경로 전체 기간 (연, CAGR 계산)
+    :param ruin: 파산 기준 손실률 (%, 초기 자본 대비 한 번이라도 이만큼 잃으면 파산)
+    :return: {'total_return', 'cagr', 'max_drawdown' (%), 'ruined' (bool)}
+    """
+    equity = np.cumprod(np.maximum(1.0 + returns, 0.0), axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)  # 시작 자산 1 포함
+    final = equity[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.where(final > 0, final ** (1.0 / years) - 1.0, -1.0)
+    return {
+        'total_return': (final - 1.0) * 100,
+        'cagr': cagr * 100,
+        'max_drawdown': ((peak - equity) / peak).max(axis=1) * 100,
+        'ruined': equity.min(axis=1) <= 1.0 - ruin / 100,
+    }
+
+
+def _simulate_chunk(method, returns, exposure, size, seed, years, ruin, block, slippage):
+    """시뮬레이션 size개를 메모리 상한 배치로 나눠 실행 (워커 작업 단위)"""
+    rng = np.random.default_rng(seed)
+    batch = max(1, BATCH_ELEMENTS // max(len(returns), 1))
+    parts = []
+    for start in range(0, size, batch):
+        count = min(batch, size - start)
+        if method == 'shuffle':
+            paths = _shuffle(rng, returns, count)
+        elif method == 'bootstrap':
+            paths = _bootstrap(rng, returns, count, block)
+        else:
+            paths = _slippage(rng, returns, exposure, count, slippage)
+        parts.append(path_metrics(paths, years, ruin))
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def simulate(returns, method='shuffle', n=10000, years=1.0, exposure=None, block=None, slippage=0.05,
+             ruin=50.0, seed=None, workers=None):
+    """
+    몬테카를로 시뮬레이션
+
+    :param returns: 거래별 또는 봉별 수익률 (비율)
+    :param method: 'shuffle' (거래 순서 재배열), 'bootstrap' (블록 부트스트랩), 'slippage' (슬리피지 교란)
+    :param n: 시뮬레이션 수
+    :param years: 원래 경로 기간 (연)
+    :param exposure: 거래별 명목 노출 (slippage용, None이면 1)
+    :param block: 부트스트랩 블록 길이 (None이면 N^(1/3))
+    :param slippage: 진입/청산 한 번당 평균 슬리피지 (%)
+    :param ruin: 파산 기준 손실률 (%)
+    :param seed: 난수 시드 (같은 시드면 워커 수와 무관하게 같은 결과)
+    :param workers: 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스)
+    :return: path_metrics 형식 배열 (길이 n)
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r} (expected one of {METHODS})")
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) == 0:
+        raise ValueError("No returns to simulate")
+    exposure = np.ones_like(returns) if exposure is None else np.asarray(exposure, dtype=float)
+    block = block or max(1, int(round(len(returns) ** (1 / 3))))
+
+    sizes = [min(CHUNK_SIMS, n - i) for i in range(0, n, CHUNK_SIMS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(method, returns, exposure, size, s, years, ruin, block, slippage) for size, s in zip(sizes, seeds)]
+    workers = min(workers or os.cpu_count(), len(args))
+    if workers <= 1:
+        chunks = [_simulate_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, *zip(*args)))
+    return {k: np.concatenate([c[k] for c in chunks]) for k in chunks[0]}
+
+
+def summarize(sims, confidence=0.95):
+    """
+    시뮬레이션 지표 요약
+
+    :return: 지표별 평균, 중앙값, 신뢰구간 하한/상한 DataFrame + 'risk_of_ruin' 행 (파산 확률 %)
+    """
+    lo, hi = (1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100
+    rows = []
+    for name in METRICS:
+        values = sims[name]
+        lower, upper = np.percentile(values, [lo, hi])
+        rows.append({'metric': name, 'mean': values.mean(), 'median': np.median(values),
+                     'lower': lower, 'upper': upper})
+    ruin = sims['ruined'].mean() * 100
+    rows.append({'metric': 'risk_of_ruin', 'mean': ruin, 'median': np.nan, 'lower': np.nan, 'upper': np.nan})
+    return pd.DataFrame(rows).set_index('metric')
+
+
+def robustness(trades, initial_cash, years, equity=None, methods=METHODS, n=10000, confidence=0.95,
+               **kwargs):
+    """
+    백테스트 결과 강건성 분석
+
+    거래 순서 재배열과 슬리피지 교란은 거래 목록으로, 블록 부트스트랩은 자산 곡선이 있으면
+    봉별 수익률로 (없으면 거래 수익률로) 실행한다.
+
+    사용 예:
+        result = backtest(df, signals, **settings)
+        report = robustness(result['trades'], settings['initial_cash'], years=1.0,
+                            equity=result['equity'], seed=0)
+
+    :param trades: vector_backtest 거래 배열 또는 run_backtest의 trade_list
+    :param years: 백테스트 기간 (연)
+    :param equity: 봉별 자산 곡선 (배열 또는 Series)
+    :param kwargs: simulate 인자 (block, slippage, ruin, seed, workers)
+    :return: {방법: summarize DataFrame}
+    """
+    returns, exposure = from_trades(trades, initial_cash)
+    report = {}
+    for method in methods:
+        series = returns
+        if method == 'bootstrap' and equity is not None:
+            values = np.asarray(equity, dtype=float)
+            series = np.diff(values) / values[:-1]
+        report[method] = summarize(simulate(series, method, n, years, exposure=exposure, **kwargs), confidence)
+    return report
+
+
+if __name__ == "__main__":
+    from config import config
+    from vector_backtest import backtest, risk_settings
+    from strategies.obv_strategy import OBVSignalStrategy
+
+    # 1시간봉 1년치 합성 데이터 OBV 백테스트 -> 방법별 2만 회 시뮬레이션
+    n = 365 * 24
+    rng = np.random.default_rng(0)
+    close = 30000 * np.exp(np.cumsum(rng.standard_normal(n) * 0.006))
+    open_ = np.r_[close[0], close[:-1]]
+    df = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.random(n) * 0.004),
+        'low': np.minimum(open_, close) * (1 - rng.random(n) * 0.004),
+        'close': close,
+        'volume': rng.exponential(100, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+    settings = risk_settings(config)
+    result = backtest(df, OBVSignalStrategy(df).generate_signals(), **settings)
+    print(f"Backtest: {result['metrics']['trades']} trades, "
+          f"return {result['metrics']['total_return']:.2f}%, max drawdown {result['metrics']['max_drawdown']:.2f}%")
+
+    for method in METHODS:
+        started = time.perf_counter()
+        report = robustness(result['trades'], settings['initial_cash'], years=1.0, equity=result['equity'],
+                            methods=(method,), n=20_000, ruin=30.0, seed=0)
+        print(f"\n{method}: 20,000 simulations in {time.perf_counter() - started:.2f}s")
+        print(report[method].round(3).to_string())
@@ -0,0 +1,289 @@
+import os
+import sys
+import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+# src 디렉토리 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from candle_view import CandleView, as_candle_view
+from strategy_loader import load_strategy
+from vector_backtest import backtest
+
+try:
+    import optuna  # 베이지안 탐색 (선택 의존성)
+except ImportError:
+    optuna = None
+
+# 전략 생성자 대신 simulate로 넘기는 파라미터
+RISK_PARAMS = ('risk_per_trade', 'stop_loss', 'take_profit', 'fee', 'initial_cash', 'max_leverage')
+SHARED_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+def grid(space):
+    """
+    격자 탐색 조합
+
+    :param space: {파라미터: 값 목록}
+    :return: 파라미터 딕셔너리 목록
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_search(space, n, seed=None):
+    """
+    무작위 탐색 조합
+
+    :param space: {파라미터: 값 목록 또는 (최소, 최대)} (정수 범위는 양 끝 포함, 실수 범위는 균등 분포)
+    :param n: 조합 개수
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, values in space.items():
+        if isinstance(values, tuple):
+            lo, hi = values
+            if isinstance(lo, (int, np.integer)) and isinstance(hi, (int, np.integer)):
+                columns[name] = rng.integers(lo, hi + 1, n).tolist()
+            else:
+                columns[name] = rng.uniform(lo, hi, n).tolist()
+        else:
+            columns[name] = [values[i] for i in rng.integers(0, len(values), n)]
+    return [{name: columns[name][i] for name in space} for i in range(n)]
+
+
+class SharedCandles:
+    def __init__(self, data):
+        """
+        캔들 컬럼을 공유 메모리 블록 하나에 복사 (워커는 이름으로 붙어 복사 없이 읽음)
+
+        timestamp도 float64로 저장한다 (ms 값은 2^53 미만이라 손실 없음).
+        """
+        view = as_candle_view(data)
+        self.columns = tuple(col for col in SHARED_COLUMNS if col in view)
+        self.length = len(view)
+        size = max(8 * len(self.columns) * self.length, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        arr = np.ndarray((len(self.columns), self.length), dtype=np.float64, buffer=self.shm.buf)
+        for i, col in enumerate(self.columns):
+            arr[i] = view[col]
+
+    @property
+    def spec(self):
+        """워커에 넘길 (블록 이름, 컬럼, 길이)"""
+        return self.shm.name, self.columns, self.length
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_candles(spec):
+    """공유 메모리 캔들을 CandleView로 (반환한 SharedMemory는 뷰를 쓰는 동안 유지해야 함)"""
+    name, columns, length = spec
+    shm = shared_memory.SharedMemory(name=name)
+    arr = np.ndarray((len(columns), length), dtype=np.float64, buffer=shm.buf)
+    return shm, CandleView({col: arr[i] for i, col in enumerate(columns)})
+
+
+def split_params(params, settings=None):
+    """(전략 생성자 인자, simulate 인자) (RISK_PARAMS 값은 settings를 덮어씀)"""
+    risk = dict(settings or {})
+    strategy_params = {}
+    for name, value in params.items():
+        (risk if name in RISK_PARAMS else strategy_params)[name] = value
+    return strategy_params, risk
+
+
+def evaluate(data, strategy, params, settings=None):
+    """
+    파라미터 조합 하나 백테스트
+
+    :param params: 전략 생성자 인자 + RISK_PARAMS
+    :return: 성과 지표 딕셔너리
+    """
+    strategy_params, risk = split_params(params, settings)
+    signals = load_strategy(strategy, data, **strategy_params).generate_signals()
+    return backtest(data, signals, **risk)['metrics']
+
+
+# 워커 프로세스 상태 (초기화 시 공유 메모리에 한 번 붙음)
+_worker = {}
+
+
+def _init_worker(spec, strategy, settings):
+    shm, view = attach_candles(spec)
+    _worker.update(shm=shm, view=view, strategy=strategy, settings=settings)
+
+
+def _run_batch(batch):
+    results = []
+    for i, params in batch:
+        try:
+            metrics = evaluate(_worker['view'], _worker['strategy'], params, _worker['settings'])
+        except Exception as e:
+            metrics = {'error': str(e)}
+        results.append((i, params, metrics))
+    return results
+
+
+class Optimizer:
+    def __init__(self, data, strategy='obv', settings=None, metric='sharpe', maximize=True,
+                 workers=None, batch_size=16):
+        """
+        프로세스 풀 기반 파라미터 탐색
+
+        캔들 데이터는 공유 메모리에 한 번만 올리고, 각 워커는 시작할 때 붙어서
+        작업마다 데이터를 피클링하지 않는다. 결과는 끝나는 대로 on_result로 전달되고
+        metric 기준 순위 표로 반환된다.
+
+        사용 예:
+            with Optimizer(df, 'obv', risk_settings(config)) as opt:
+                table = opt.run(grid({'ma_period': range(5, 60), 'stop_loss': [1, 2, 3]}))
+
+        :param data: DataFrame, CandleView 또는 (N, 6) OHLCV 배열
+        :param strategy: strategy_loader 등록 이름
+        :param settings: simulate 기본 인자 (risk_settings(config) 등)
+        :param metric: 순위 기준 성과 지표 (vector_backtest.performance 키)
+        :param maximize: 클수록 좋은 지표면 True (max_drawdown 등은 False)
+        :param workers: 프로세스 수 (None이면 CPU 수)
+        :param batch_size: 작업 하나에 묶을 조합 수
+        """
+        self.data = as_candle_view(data)
+        self.strategy = strategy
+        self.settings = dict(settings or {})
+        self.metric = metric
+        self.maximize = maximize
+        self.workers = workers or os.cpu_count()
+        self.batch_size = batch_size
+        self.shared = None
+        self.pool = None
+
+    def _executor(self):
+        if self.pool is None:
+            self.shared = SharedCandles(self.data)
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                            initargs=(self.shared.spec, self.strategy, self.settings))
+        return self.pool
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.shared.close()
+            self.pool = self.shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _stream(self, combos, task=_run_batch, *args):
+        """(순번, 파라미터, 결과)를 끝나는 순서대로 (task(batch, *args)를 워커에서 실행)"""
+        tasks = list(enumerate(combos))
+        batches = [tasks[i:i + self.batch_size] for i in range(0, len(tasks), self.batch_size)]
+        pool = self._executor()
+        for future in as_completed([pool.submit(task, batch, *args) for batch in batches]):
+            yield from future.result()
+
+    def run(self, combos, on_result=None):
+        """
+        조합 목록 백테스트
+
+        :param combos: 파라미터 딕셔너리 목록 (grid, random_search 결과 등)
+        :param on_result: 결과 하나마다 호출 (행 딕셔너리: 파라미터 + 지표 + 'trial')
+        :return: metric 순위 DataFrame
+        """
+        rows = []
+        for i, params, metrics in self._stream(combos):
+            row = {'trial': i, **params, **metrics}
+            rows.append(row)
+            if on_result is not None:
+                on_result(row)
+        return self.rank(rows)
+
+    def rank(self, rows):
+        table = pd.DataFrame(rows)
+        if self.metric in table:
+            table = table.sort_values(self.metric, ascending=not self.maximize, na_position='last',
+                                      kind='stable')
+        return table.reset_index(drop=True)
+
+    def bayesian(self, space, n_trials, seed=None, on_result=None):
+        """
+        optuna TPE 탐색 (한 번에 workers개씩 제안해 병렬 평가)
+
+        :param space: random_search와 같은 형식
+        """
+        if optuna is None:
+            raise ImportError("Bayesian search requires optuna (pip install optuna)")
+        direction = 'maximize' if self.maximize else 'minimize'
+        study = optuna.create_study(direction=direction, sampler=optuna.samplers.TPESampler(seed=seed))
+        rows = []
+        while len(rows) < n_trials:
+            trials = [study.ask() for _ in range(min(self.workers, n_trials - len(rows)))]
+            combos = [{name: self._suggest(trial, name, values) for name, values in space.items()}
+                      for trial in trials]
+            for i, params, metrics in self._stream(combos):
+                value = metrics.get(self.metric)
+                failed = value is None or not np.isfinite(value)
+                study.tell(trials[i], None if failed else value,
+                           state=optuna.trial.TrialState.FAIL if failed else None)
+                row = {'trial': trials[i].number, **params, **metrics}
+                rows.append(row)
+                if on_result is not None:
+                    on_result(row)
+        return self.rank(rows)
+
+    @staticmethod
+    def _suggest(trial, name, values):
+        if not isinstance(values, tuple):
+            return trial.suggest_categorical(name, list(values))
+        lo, hi = values
+        if isinstance(lo, (int, np.integer)) and isinstance(hi, (int, np.integer)):
+            return trial.suggest_int(name, lo, hi)
+        return trial.suggest_float(name, lo, hi)
+
+
+if __name__ == "__main__":
+    from config import config
+    from vector_backtest import risk_settings
+
+    # 1시간봉 1년치 합성 데이터: OBV 이동평균 기간 x 손절/익절 격자 탐색
+    n = 365 * 24
+    rng = np.random.default_rng(0)
+    close = 30000 * np.exp(np.cumsum(rng.standard_normal(n) * 0.006))
+    open_ = np.r_[close[0], close[:-1]]
+    df = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.random(n) * 0.004),
+        'low': np.minimum(open_, close) * (1 - rng.random(n) * 0.004),
+        'close': close,
+        'volume': rng.exponential(100, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+    space = {'ma_period': list(range(5, 105, 5)), 'stop_loss': [1, 2, 3, 4], 'take_profit': [2, 4, 6, 8, 10]}
+    combos = grid(space)
+    settings = risk_settings(config)
+    started = time.perf_counter()
+    with Optimizer(df, 'obv', settings) as opt:
+        table = opt.run(combos)
+    elapsed = time.perf_counter() - started
+    print(f"{len(combos):,} combinations on {opt.workers} workers in {elapsed:.1f}s "
+          f"({len(combos) / elapsed:,.0f}/s)")
+    print(table.head(10).to_string())
+
+    # 기본 전략 (VWAP + 거래량 스파이크) 무작위 탐색
+    space = {'volume_ma_period': (5, 60), 'volume_spike_ratio': (1.2, 3.0), 'stop_loss': (0.5, 4.0)}
+    with Optimizer(df, 'basic', settings) as opt:
+        table = opt.run(random_search(space, 200, seed=0))
+    print(table.head(5).to_string())
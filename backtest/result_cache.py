@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import pickle
+import inspect
+import hashlib
+from functools import lru_cache
+import backtrader as bt
+
+# src 디렉토리 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from history_store import HistoryStore
+from store_feed import ROOT_DIR, config_window, load_arrays
+
+PROJECT_DIR = os.path.abspath(ROOT_DIR)
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), 'cache')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# 결과 형식이 바뀌면 올려서 이전 항목 무효화
+CACHE_VERSION = 1
+
+DATASET_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+def dataset_digest(store_root, symbol, timeframe, start=None, end=None):
+    """저장소 구간 캔들 내용 해시 (load_arrays와 같은 인자, 같은 저장소 버전은 한 번만 계산)"""
+    revision = HistoryStore(store_root).revision(symbol, timeframe, start, end)
+    return _dataset_digest(store_root, symbol, timeframe, start, end, revision)
+
+
+@lru_cache(maxsize=8)
+def _dataset_digest(store_root, symbol, timeframe, start, end, revision):
+    """dataset_digest 본체 (revision이 캐시 키에 들어가 백필/저장 뒤에는 다시 계산)"""
+    arrays = load_arrays(store_root, symbol, timeframe, start, end)
+    h = hashlib.blake2b(digest_size=20)
+    for col in DATASET_COLUMNS:
+        h.update(col.encode())
+        h.update(arrays[col].tobytes())
+    return h.hexdigest()
+
+
+def _project_module(obj):
+    """객체가 정의된 프로젝트 모듈 (저장소 밖 라이브러리, 내장 모듈이면 None)"""
+    module = obj if inspect.ismodule(obj) else sys.modules.get(getattr(obj, '__module__', None) or '')
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return None
+    path = os.path.abspath(path)
+    if not path.startswith(PROJECT_DIR + os.sep) or os.sep + 'site-packages' + os.sep in path:
+        return None
+    return module
+
+
+def strategy_source(strategy):
+    """
+    전략이 의존하는 프로젝트 모듈 소스 전체 (backtrader 등 외부 라이브러리는 버전으로 대체)
+
+    전략 클래스와 상속한 클래스의 모듈에서 시작해 모듈 전역에서 참조하는 프로젝트 모듈
+    (임포트한 모듈, 함수, 클래스의 정의 모듈)을 따라가므로 지표 코드가 바뀌어도 키가 바뀐다.
+    """
+    pending = [m for m in map(_project_module, strategy.__mro__) if m is not None]
+    seen = {}
+    while pending:
+        module = pending.pop()
+        if module.__name__ in seen:
+            continue
+        seen[module.__name__] = inspect.getsource(module)
+        for value in list(vars(module).values()):
+            dep = _project_module(value)
+            if dep is not None and dep.__name__ not in seen:
+                pending.append(dep)
+    return '\n'.join(f"# {name}\n{seen[name]}" for name in sorted(seen))
+
+
+def backtest_key(cfg, strategy, params):
+    """
+    백테스트 결과 키 (데이터 구간 내용 + 전략 소스 + 파라미터 + 브로커 설정)
+
+    데이터는 파일 경로나 날짜가 아니라 실제 캔들 값으로 해시하므로 같은 구간을
+    다시 받아도 키가 유지되고, 캔들이 보정되면 키가 바뀐다.
+    """
+    data_cfg = cfg['data']
+    store_root = os.path.normpath(os.path.join(ROOT_DIR, data_cfg['store']))
+    start, end = config_window(cfg)
+    broker = {
+        'symbol': data_cfg['symbol'],
+        'timeframe': data_cfg['timeframe'],
+        'compression': data_cfg.get('compression', 1),
+        'initial_cash': cfg['initial_cash'],
+        'fee': cfg.get('fee', 0.0),
+    }
+    h = hashlib.blake2b(digest_size=20)
+    for part in (f"v{CACHE_VERSION} backtrader {bt.__version__}",
+                 dataset_digest(store_root, data_cfg['symbol'], data_cfg['timeframe'], start, end),
+                 strategy_source(strategy),
+                 json.dumps(params, sort_keys=True, default=repr),
+                 json.dumps(broker, sort_keys=True)):
+        h.update(part.encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        내용 주소 기반 백테스트 결과 캐시
+
+        키(backtest_key)마다 결과 딕셔너리(거래 목록, 자산 곡선, 분석기 출력)를 파일 하나로
+        저장한다. 읽을 때 파일 수정 시각을 갱신하고, 전체 크기가 max_bytes를 넘으면
+        가장 오래 읽지 않은 항목부터 지운다 (LRU). 같은 조합은 다시 계산하지 않으므로
+        중단된 파라미터 탐색도 다시 실행하면 끝난 조합을 건너뛴다.
+
+        사용 예:
+            cache = ResultCache()
+            result = run_backtest(config, OBVStrategy, cache=cache, ma_period=30)
+
+        :param root: 캐시 디렉토리
+        :param max_bytes: 최대 전체 크기 (바이트)
+        """
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.pkl")
+
+    @staticmethod
+    def _remove(path):
+        """항목 파일 삭제 (이미 지워졌으면 무시)"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def get(self, key):
+        """저장된 결과 (없으면 None)"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # 잘린 파일, 옮겨진 클래스 등 읽을 수 없는 항목은 지우고 미스로 처리
+            self._remove(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # LRU 순서 갱신
+        except FileNotFoundError:
+            pass  # 그 사이 다른 프로세스가 정리함
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        # 임시 파일에 쓴 뒤 교체 (쓰기 도중 읽기 보호)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        """[(수정 시각, 크기, 경로), ...] (오래된 순)"""
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래된 항목 삭제"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self._remove(path)
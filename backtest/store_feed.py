@@ -0,0 +1,202 @@
+import os
+import sys
+import array
+from datetime import datetime
+from functools import lru_cache
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+# src 디렉토리 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from history_store import HistoryStore, to_millis
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+DAY_MS = 24 * 60 * 60 * 1000
+
+# bt.date2num은 0001-01-01 기준 일수(+1) -> 1970-01-01 = 719163.0
+EPOCH_NUM = bt.date2num(datetime(1970, 1, 1))
+
+# 시간 단위 -> (Backtrader TimeFrame, compression)
+BT_TIMEFRAMES = {
+    '1m': (bt.TimeFrame.Minutes, 1),
+    '5m': (bt.TimeFrame.Minutes, 5),
+    '15m': (bt.TimeFrame.Minutes, 15),
+    '1h': (bt.TimeFrame.Minutes, 60),
+    '4h': (bt.TimeFrame.Minutes, 240),
+    '1d': (bt.TimeFrame.Days, 1),
+    '1w': (bt.TimeFrame.Weeks, 1),
+}
+
+
+def timestamps_to_num(timestamps):
+    """
+    UTC ms timestamp 배열을 Backtrader 날짜 숫자로 (초 단위 시각은 bt.date2num과 비트 단위 일치)
+
+    date2num은 일수 + 시/분/초/마이크로초 비율을 math.fsum으로 한 번에 반올림하므로
+    같은 항을 확장 정밀도(longdouble)로 더한 뒤 float64로 반올림한다.
+    """
+    ts = np.asarray(timestamps, dtype=np.int64)
+    days, rest = np.divmod(ts, DAY_MS)
+    hours, rest = np.divmod(rest, 3_600_000)
+    minutes, rest = np.divmod(rest, 60_000)
+    seconds, millis = np.divmod(rest, 1000)
+    ld = np.longdouble
+    total = ((EPOCH_NUM + days).astype(ld) + (hours / 24.0).astype(ld) + (minutes / 1440.0).astype(ld)
+             + (seconds / 86400.0).astype(ld) + (millis * 1000 / 86_400_000_000.0).astype(ld))
+    return total.astype(np.float64)
+
+
+def load_arrays(store_root, symbol, timeframe, start=None, end=None):
+    """
+    저장소 캔들 컬럼 배열 (같은 인자, 같은 저장소 버전은 프로세스 안에서 한 번만 읽음)
+
+    :param start: 시작 시각 (포함)
+    :param end: 종료 시각 (미포함)
+    :return: {'timestamp', 'open', ..., 'volume', 'datetime'(Backtrader 날짜 숫자)} 읽기 전용 배열
+    """
+    revision = HistoryStore(store_root).revision(symbol, timeframe, start, end)
+    return _load_arrays(store_root, symbol, timeframe, start, end, revision)
+
+
+@lru_cache(maxsize=8)
+def _load_arrays(store_root, symbol, timeframe, start, end, revision):
+    """load_arrays 본체 (revision이 캐시 키에 들어가 백필/저장 뒤에는 다시 읽음)"""
+    arrays = HistoryStore(store_root).read_arrays(symbol, timeframe, start, end)
+    arrays = {col: np.array(values) for col, values in arrays.items()}  # mmap 해제 후에도 유지
+    arrays['datetime'] = timestamps_to_num(arrays['timestamp'])
+    for values in arrays.values():
+        values.setflags(write=False)
+    return arrays
+
+
+def config_window(cfg):
+    """config의 (start_date, end_date)를 (시작 ms, 종료 ms 미포함)로 (end_date는 그 날 마지막 봉까지 포함)"""
+    start = to_millis(cfg.get('start_date'))
+    end = to_millis(cfg.get('end_date'))
+    return start, end + DAY_MS if end is not None else None
+
+
+def load_config_arrays(cfg):
+    """backtest/config.py 설정의 심볼/시간 단위/기간 캔들 배열"""
+    data_cfg = cfg['data']
+    store_root = os.path.normpath(os.path.join(ROOT_DIR, data_cfg['store']))
+    start, end = config_window(cfg)
+    return load_arrays(store_root, data_cfg['symbol'], data_cfg['timeframe'], start, end)
+
+
+class StoreData(bt.feeds.DataBase):
+    """
+    로컬 캔들 저장소 배열 피드
+
+    preload 시 컬럼 배열을 라인 버퍼에 한 번에 복사하므로 행 단위 파싱이 없다.
+    배열은 load_arrays 캐시를 공유하므로 여러 Cerebro 실행에서 다시 읽지 않는다
+    (피드 객체는 실행마다 새로 만든다). 필터나 입력 시간대가 지정되면 Backtrader
+    기본 경로(_load 반복)를 사용한다.
+
+    사용 예:
+        data = StoreData(arrays=load_config_arrays(config), timeframe=bt.TimeFrame.Minutes, compression=60)
+    """
+    params = (
+        ('arrays', None),  # load_arrays 결과
+    )
+
+    # 라인 이름 -> 배열 키
+    _columns = (('datetime', 'datetime'), ('open', 'open'), ('high', 'high'), ('low', 'low'),
+                ('close', 'close'), ('volume', 'volume'))
+
+    def start(self):
+        super().start()
+        self._index = None
+
+    def _window(self):
+        """fromdate/todate 적용 구간 (_start_finish 이후에 확정되므로 처음 읽을 때 계산)"""
+        num = self.p.arrays['datetime']
+        self._index = int(np.searchsorted(num, self.fromdate, side='left'))
+        self._hi = int(np.searchsorted(num, self.todate, side='right'))
+
+    def preload(self):
+        if self._filters or self._ffilters or self._tzinput:
+            return super().preload()
+        self._window()
+        lo, hi = self._index, self._hi
+        for line_name, key in self._columns:
+            line = getattr(self.lines, line_name)
+            line.array = array.array('d', np.ascontiguousarray(self.p.arrays[key][lo:hi]).tobytes())
+        self.lines.openinterest.array = array.array('d', bytes(8 * (hi - lo)))
+        self._index = hi
+        self.home()
+
+    def _load(self):
+        if self._index is None:
+            self._window()
+        if self._index >= self._hi:
+            return False
+        i = self._index
+        for line_name, key in self._columns:
+            getattr(self.lines, line_name)[0] = self.p.arrays[key][i]
+        self.lines.openinterest[0] = 0.0
+        self._index += 1
+        return True
+
+
+def config_feed(cfg, **kwargs):
+    """backtest/config.py 설정으로 StoreData 생성 (캔들이 없으면 ValueError)"""
+    data_cfg = cfg['data']
+    arrays = load_config_arrays(cfg)
+    if len(arrays['timestamp']) == 0:
+        raise ValueError(f"No {data_cfg['timeframe']} candles for {data_cfg['symbol']} between "
+                         f"{cfg.get('start_date')} and {cfg.get('end_date')} in {data_cfg['store']} "
+                         f"(run python -m src.backfill first)")
+    timeframe, compression = BT_TIMEFRAMES[data_cfg['timeframe']]
+    return StoreData(arrays=arrays, timeframe=timeframe, compression=compression,
+                     name=data_cfg['symbol'], **kwargs)
+
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+    from strategies.obv_strategy import OBVStrategy
+
+    # bt.date2num 기준일/변환 일치 확인
+    sample = pd.date_range('1999-12-31', periods=100_000, freq='37min13s')
+    expected = np.array([bt.date2num(ts.to_pydatetime()) for ts in sample])
+    converted = timestamps_to_num(sample.as_unit('ms').asi8)
+    roundtrip = all(bt.num2date(x) == ts.to_pydatetime() for x, ts in zip(converted, sample))
+    print(f"EPOCH_NUM={EPOCH_NUM}, matches date2num={np.array_equal(converted, expected)}, round trip={roundtrip}")
+
+    # 1분봉 3년치 저장 후 피드 적재 시간, PandasData와 결과 비교
+    n = 3 * 365 * 24 * 60
+    rng = np.random.default_rng(0)
+    ts = to_millis('2022-01-01') + np.arange(n, dtype=np.int64) * 60_000
+    close = 30000 * np.exp(np.cumsum(rng.standard_normal(n) * 0.001))
+    candles = np.column_stack([ts, close, close * 1.001, close * 0.999, close, rng.exponential(10, n)])
+    with tempfile.TemporaryDirectory() as tmp:
+        HistoryStore(tmp).append('BTC/USDT', '1m', candles)
+        cfg = {'data': {'store': tmp, 'symbol': 'BTC/USDT', 'timeframe': '1m'},
+               'start_date': '2022-01-01', 'end_date': '2024-12-30'}
+        for attempt in ('first', 'cached'):
+            started = time.perf_counter()
+            feed = config_feed(cfg)
+            bt.Cerebro().adddata(feed)  # Cerebro.run()의 적재 단계만 실행
+            feed._start()
+            feed.preload()
+            print(f"{attempt} load: {feed.buflen():,} bars in {time.perf_counter() - started:.2f}s")
+
+        # 최근 10일 구간: StoreData와 PandasData 실행 결과 비교
+        cfg['start_date'] = '2024-12-20'
+        arrays = load_config_arrays(cfg)
+        df = pd.DataFrame({col: arrays[col] for col in ('open', 'high', 'low', 'close', 'volume')},
+                          index=pd.DatetimeIndex(arrays['timestamp'].astype('datetime64[ms]')))
+        values = {}
+        for name, feed in (('store', lambda: config_feed(cfg)), ('pandas', lambda: bt.feeds.PandasData(dataname=df))):
+            for runonce in (True, False):
+                cerebro = bt.Cerebro(runonce=runonce, stdstats=False)
+                cerebro.adddata(feed())
+                cerebro.addstrategy(OBVStrategy)
+                cerebro.broker.setcash(1_000_000)
+                started = time.perf_counter()
+                cerebro.run()
+                values[name, runonce] = round(cerebro.broker.getvalue(), 4)
+                print(f"{name} runonce={runonce}: {time.perf_counter() - started:.2f}s")
+        print(f"Final values: {values}")
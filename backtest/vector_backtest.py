@@ -0,0 +1,326 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# src 디렉토리 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from candle_view import as_candle_view
+
+# 청산 사유 코드
+EXIT_STOP = 1     # 손절가 도달
+EXIT_TAKE = 2     # 익절가 도달
+EXIT_SIGNAL = 3   # 매도 신호 (다음 봉 시가)
+EXIT_END = 4      # 데이터 끝 (마지막 종가)
+
+EXIT_NAMES = {EXIT_STOP: 'stop', EXIT_TAKE: 'take', EXIT_SIGNAL: 'signal', EXIT_END: 'end'}
+
+# simulate 결과 거래 컬럼
+TRADE_FIELDS = ('entry_bar', 'exit_bar', 'entry_price', 'exit_price', 'qty', 'pnl', 'fees', 'reason')
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def risk_settings(cfg):
+    """backtest/config.py 설정에서 simulate 위험 관리 인자 추출 (비율은 % 단위 그대로)"""
+    return {
+        'risk_per_trade': cfg['risk_per_trade'],
+        'stop_loss': cfg['stop_loss'],
+        'take_profit': cfg['take_profit'],
+        'fee': cfg.get('fee', 0.0),
+        'initial_cash': cfg['initial_cash'],
+    }
+
+
+def _next_index(mask):
+    """각 위치 이후(자기 포함) 처음으로 mask가 True인 인덱스 (없으면 len(mask))"""
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(idx[::-1])[::-1]
+
+
+def _first_hit(high, low, sl, tp, start, stop, chunk=16):
+    """
+    [start, stop) 구간에서 처음 손절/익절가에 닿는 봉 (점점 커지는 구간 단위로 탐색)
+
+    대부분의 거래는 몇 봉 안에 청산되므로 매도 신호까지 전체 구간을 한 번에
+    비교하지 않고 chunk, chunk*4, ... 봉씩 잘라 첫 도달에서 멈춘다.
+
+    :return: (봉 인덱스, 손절 여부) (닿지 않으면 (None, False))
+    """
+    lo = start
+    while lo < stop:
+        hi = min(lo + chunk, stop)
+        stop_hit = low[lo:hi] <= sl
+        hit = stop_hit | (high[lo:hi] >= tp)
+        j = int(hit.argmax())
+        if hit[j]:
+            return lo + j, bool(stop_hit[j])
+        lo = hi
+        chunk *= 4
+    return None, False
+
+
+def _position_size(equity, price, risk_per_trade, stop_loss, max_leverage):
+    """위험 기반 수량 (손절 시 자산의 risk_per_trade% 손실, 명목 가치는 자산 * max_leverage 이하)"""
+    qty = equity * max_leverage / price
+    if stop_loss:
+        qty = min(qty, equity * risk_per_trade / 100 / (price * stop_loss / 100))
+    return qty
+
+
+def _close_trade(qty, entry_price, exit_price, fee):
+    """(손익, 수수료) (진입/청산 명목 가치에 fee% 부과)"""
+    fees = qty * entry_price * fee / 100 + qty * exit_price * fee / 100
+    return qty * (exit_price - entry_price) - fees, fees
+
+
+def simulate(open_, high, low, close, signal, risk_per_trade=1.0, stop_loss=2.0, take_profit=5.0,
+             fee=0.0, initial_cash=10000.0, max_leverage=1.0):
+    """
+    롱 전용 신호 백테스트 (거래 단위 반복 + 봉 구간 numpy 탐색, 손절/익절은 _first_hit)
+
+    규칙 (simulate_events와 동일):
+    - i번째 봉 종가에서 신호 1이면 i+1번째 봉 시가에 진입, 포지션 중 -1이면 i+1번째 봉 시가에 청산
+    - 진입 봉부터 봉 안에서 손절/익절 확인. 한 봉에서 둘 다 닿으면 손절로 처리 (보수적)
+    - 손절 체결가는 min(시가, 손절가) (갭 하락 반영), 익절 체결가는 익절가
+    - 청산된 봉의 종가 신호부터 다시 진입 가능, 데이터 끝에서는 마지막 종가로 청산
+    - 수량은 진입 시점 자산 기준 위험 비율로 계산 (복리)
+
+    :param signal: 봉별 신호 (1 매수, -1 매도, 그 외 0)
+    :param risk_per_trade: 거래당 위험 (%)
+    :param stop_loss: 손절 비율 (%, 0/None이면 사용 안 함)
+    :param take_profit: 익절 비율 (%, 0/None이면 사용 안 함)
+    :param fee: 체결 수수료 (%, 진입/청산 각각)
+    :param max_leverage: 최대 명목 가치 / 자산
+    :return: (거래 {TRADE_FIELDS: 배열}, 봉별 자산 배열)
+    """
+    open_, high, low, close = (np.asarray(a, dtype=np.float64) for a in (open_, high, low, close))
+    signal = np.nan_to_num(np.asarray(signal, dtype=np.float64))
+    n = len(close)
+    next_entry = _next_index(signal == 1)
+    next_exit = _next_index(signal == -1)
+
+    rows = []
+    equity = float(initial_cash)
+    k = next_entry[0] if n else 0
+    while k < n - 1:
+        e = k + 1
+        entry_price = open_[e]
+        qty = _position_size(equity, entry_price, risk_per_trade, stop_loss, max_leverage)
+        sl = entry_price * (1 - stop_loss / 100) if stop_loss else -np.inf
+        tp = entry_price * (1 + take_profit / 100) if take_profit else np.inf
+
+        s = next_exit[e]  # 매도 신호 봉 (다음 봉 시가 청산)
+        x, stopped = _first_hit(high, low, sl, tp, e, min(s, n - 1) + 1)
+        if x is not None:
+            if stopped:
+                exit_price, reason = min(open_[x], sl), EXIT_STOP
+            else:
+                exit_price, reason = tp, EXIT_TAKE
+        elif s < n - 1:
+            x, exit_price, reason = s + 1, open_[s + 1], EXIT_SIGNAL
+        else:
+            x, exit_price, reason = n - 1, close[n - 1], EXIT_END
+
+        pnl, fees = _close_trade(qty, entry_price, exit_price, fee)
+        rows.append((e, x, entry_price, exit_price, qty, pnl, fees, reason))
+        equity += pnl
+        k = next_entry[x]
+
+    trades = _trade_arrays(rows)
+    return trades, equity_curve(close, trades, initial_cash, fee)
+
+
+def _trade_arrays(rows):
+    columns = list(zip(*rows)) if rows else [()] * len(TRADE_FIELDS)
+    trades = {field: np.asarray(col, dtype=np.float64) for field, col in zip(TRADE_FIELDS, columns)}
+    for field in ('entry_bar', 'exit_bar', 'reason'):
+        trades[field] = trades[field].astype(np.int64)
+    return trades
+
+
+def equity_curve(close, trades, initial_cash, fee=0.0):
+    """
+    봉별 자산 (실현 손익 + 보유 포지션 평가 손익, 진입 수수료는 진입 봉부터 반영)
+
+    청산 봉에는 청산 후 자산을 기록한다.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    realized = np.bincount(trades['exit_bar'], weights=trades['pnl'], minlength=n)[:n]
+    curve = initial_cash + np.cumsum(realized)
+    held = trades['exit_bar'] - trades['entry_bar']
+    if held.sum():
+        # 보유 중인 봉 (진입 봉 ~ 청산 직전 봉)과 거래 번호
+        tid = np.repeat(np.arange(len(held)), held)
+        offsets = np.arange(held.sum()) - np.repeat(np.cumsum(held) - held, held)
+        bars = trades['entry_bar'][tid] + offsets
+        entry_fee = trades['qty'] * trades['entry_price'] * fee / 100
+        curve[bars] += trades['qty'][tid] * (close[bars] - trades['entry_price'][tid]) - entry_fee[tid]
+    return curve
+
+
+def simulate_events(open_, high, low, close, signal, risk_per_trade=1.0, stop_loss=2.0, take_profit=5.0,
+                    fee=0.0, initial_cash=10000.0, max_leverage=1.0):
+    """
+    봉 단위 이벤트 방식 참조 구현 (simulate와 같은 규칙, 검증용)
+
+    :return: 거래 {TRADE_FIELDS: 배열}
+    """
+    signal = np.nan_to_num(np.asarray(signal, dtype=np.float64))
+    n = len(close)
+    rows = []
+    equity = float(initial_cash)
+    position = None  # [진입 봉, 진입가, 수량, 손절가, 익절가]
+    pending = 0  # 다음 봉 시가 주문 (1 진입, -1 청산)
+
+    def exit_position(bar, price, reason):
+        nonlocal equity, position
+        e, entry_price, qty = position[:3]
+        pnl, fees = _close_trade(qty, entry_price, price, fee)
+        rows.append((e, bar, entry_price, price, qty, pnl, fees, reason))
+        equity += pnl
+        position = None
+
+    for i in range(n):
+        if pending == -1:
+            exit_position(i, open_[i], EXIT_SIGNAL)
+        elif pending == 1:
+            entry_price = open_[i]
+            qty = _position_size(equity, entry_price, risk_per_trade, stop_loss, max_leverage)
+            sl = entry_price * (1 - stop_loss / 100) if stop_loss else -np.inf
+            tp = entry_price * (1 + take_profit / 100) if take_profit else np.inf
+            position = [i, entry_price, qty, sl, tp]
+        pending = 0
+
+        if position is not None:
+            sl, tp = position[3], position[4]
+            if low[i] <= sl:
+                exit_position(i, min(open_[i], sl), EXIT_STOP)
+            elif high[i] >= tp:
+                exit_position(i, tp, EXIT_TAKE)
+
+        if position is None and signal[i] == 1 and i < n - 1:
+            pending = 1
+        elif position is not None and signal[i] == -1 and i < n - 1:
+            pending = -1
+
+    if position is not None:
+        exit_position(n - 1, close[n - 1], EXIT_END)
+    return _trade_arrays(rows)
+
+
+def performance(equity, trades, initial_cash, periods_per_year):
+    """
+    성과 지표
+
+    :param periods_per_year: 연간 봉 개수 (샤프 비율 연율화)
+    """
+    returns = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.zeros(0)
+    std = returns.std() if len(returns) else 0.0
+    peak = np.maximum.accumulate(equity) if len(equity) else equity
+    drawdown = (peak - equity) / peak if len(equity) else equity
+    pnl = trades['pnl']
+    gross_loss = -pnl[pnl < 0].sum()
+    return {
+        'final_equity': float(equity[-1]) if len(equity) else float(initial_cash),
+        'total_return': float(equity[-1] / initial_cash - 1) * 100 if len(equity) else 0.0,
+        'max_drawdown': float(drawdown.max()) * 100 if len(equity) else 0.0,
+        'sharpe': float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+        'trades': int(len(pnl)),
+        'win_rate': float((pnl > 0).mean()) * 100 if len(pnl) else 0.0,
+        'profit_factor': float(pnl[pnl > 0].sum() / gross_loss) if gross_loss > 0 else np.inf,
+        'fees': float(trades['fees'].sum()),
+    }
+
+
+def periods_per_year(timestamps):
+    """timestamp(ms) 간격 중앙값 기준 연간 봉 개수"""
+    if len(timestamps) < 2:
+        return 1.0
+    step = float(np.median(np.diff(timestamps)))
+    return 365 * DAY_MS / step if step > 0 else 1.0
+
+
+def trades_frame(trades, index=None):
+    """거래 배열을 DataFrame으로 (index를 주면 진입/청산 시각 추가)"""
+    df = pd.DataFrame(trades)
+    df['reason'] = df['reason'].map(EXIT_NAMES)
+    if index is not None:
+        df.insert(0, 'entry_time', np.asarray(index)[df['entry_bar']])
+        df.insert(1, 'exit_time', np.asarray(index)[df['exit_bar']])
+    return df
+
+
+def backtest(data, signals, **settings):
+    """
+    전략 신호 백테스트
+
+    사용 예:
+        strategy = StrategyLoader.get_strategy(data)
+        result = backtest(data, strategy.generate_signals(), **risk_settings(config))
+
+    :param data: DataFrame, CandleView 또는 (N, 6) OHLCV 배열
+    :param signals: generate_signals() 결과 (data와 같은 길이)
+    :param settings: simulate 인자 (risk_settings(config) 등)
+    :return: {'trades': 거래 배열, 'equity': 봉별 자산, 'metrics': 성과 지표}
+    """
+    view = as_candle_view(data)
+    signal = signals.to_numpy() if isinstance(signals, pd.Series) else np.asarray(signals)
+    if len(signal) != len(view):
+        raise ValueError(f"Signal length {len(signal)} != candle count {len(view)}")
+    trades, equity = simulate(view['open'], view['high'], view['low'], view['close'], signal, **settings)
+    periods = periods_per_year(view['timestamp']) if 'timestamp' in view else 365.0
+    metrics = performance(equity, trades, settings.get('initial_cash', 10000.0), periods)
+    return {'trades': trades, 'equity': equity, 'metrics': metrics}
+
+
+if __name__ == "__main__":
+    import time
+    from config import config
+    from strategies.obv_strategy import OBVSignalStrategy
+
+    # 1분봉 1년치 합성 데이터: OBV 교차 신호 백테스트 + 이벤트 방식 결과 비교
+    n = 365 * 24 * 60
+    rng = np.random.default_rng(0)
+    close = 30000 * np.exp(np.cumsum(rng.standard_normal(n) * 0.001))
+    open_ = np.r_[close[0], close[:-1]]
+    df = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.random(n) * 0.002),
+        'low': np.minimum(open_, close) * (1 - rng.random(n) * 0.002),
+        'close': close,
+        'volume': rng.exponential(10, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='min'))
+    signals = OBVSignalStrategy(df).generate_signals()
+    settings = risk_settings(config)
+
+    started = time.perf_counter()
+    result = backtest(df, signals, **settings)
+    elapsed = time.perf_counter() - started
+    print(f"Vectorized: {n:,} bars in {elapsed:.3f}s")
+    print({k: round(v, 2) for k, v in result['metrics'].items()})
+
+    started = time.perf_counter()
+    reference = simulate_events(df['open'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(),
+                                df['close'].to_numpy(), signals.to_numpy(), **settings)
+    elapsed = time.perf_counter() - started
+    same = all(np.array_equal(result['trades'][f], reference[f]) for f in TRADE_FIELDS)
+    print(f"Event-driven: {elapsed:.2f}s, same trades={same}")
+    print(trades_frame(result['trades'], df.index).tail())
+
+    # 매도 신호가 드물고 손절/익절 폭이 좁은 경우: 거래가 많고 각 거래가 신호 전에 청산됨
+    many = np.zeros(n)
+    many[::20] = 1
+    tight = {**settings, 'stop_loss': 0.3, 'take_profit': 0.5}
+    arrays = [df[col].to_numpy() for col in ('open', 'high', 'low', 'close')]
+    started = time.perf_counter()
+    trades, _ = simulate(*arrays, many, **tight)
+    elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    reference = simulate_events(*arrays, many, **tight)
+    events_elapsed = time.perf_counter() - started
+    same = all(np.array_equal(trades[f], reference[f]) for f in TRADE_FIELDS)
+    print(f"Many trades ({len(trades['pnl']):,}): vectorized {elapsed:.3f}s, "
+          f"event-driven {events_elapsed:.2f}s, same trades={same}")
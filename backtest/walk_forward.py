@@ -0,0 +1,228 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# src 디렉토리 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from strategy_loader import load_strategy
+from vector_backtest import TRADE_FIELDS, backtest, performance, periods_per_year
+from optimizer import Optimizer, split_params, _worker
+
+
+def make_folds(n, train, test, step=None, anchored=False):
+    """
+    학습/검증 구간 분할 (봉 인덱스)
+
+    :param n: 전체 봉 수
+    :param train: 학습 구간 봉 수 (anchored=True면 첫 학습 구간 길이)
+    :param test: 검증 구간 봉 수
+    :param step: 다음 폴드까지 이동 봉 수 (None이면 test, 검증 구간이 이어짐)
+    :param anchored: True면 학습 구간 시작을 0에 고정 (확장 윈도우)
+    :return: [(학습 시작, 학습 끝, 검증 시작, 검증 끝), ...] (끝은 미포함)
+    """
+    step = step or test
+    folds = []
+    start = 0
+    while start + train + test <= n:
+        folds.append((0 if anchored else start, start + train, start + train, start + train + test))
+        start += step
+    return folds
+
+
+def _signals(strategy, view, strategy_params):
+    return load_strategy(strategy, view, **strategy_params).generate_signals().to_numpy()
+
+
+def prefix_signals(strategy, view, strategy_params, ends, causal=None):
+    """
+    구간 끝마다 그 끝까지의 데이터만으로 계산한 신호
+
+    인과적인 전략(i번째 신호가 i번째 봉까지만 사용)은 전체 구간 신호 하나를 잘라 재사용하고,
+    아니면 끝마다 앞부분 데이터로 다시 계산한다.
+
+    :param ends: 구간 끝 인덱스 목록 (미포함)
+    :param causal: None이면 가장 짧은 앞부분 신호와 전체 신호의 앞부분을 비교해 판단
+    :return: ends 순서의 신호 배열 목록 (k번째 배열 길이는 ends[k])
+    """
+    full = _signals(strategy, view, strategy_params)
+    if causal is None:
+        first = min(ends)
+        causal = np.array_equal(_signals(strategy, view.slice(0, first), strategy_params), full[:first])
+    if causal:
+        return [full[:end] for end in ends]
+    return [_signals(strategy, view.slice(0, end), strategy_params) for end in ends]
+
+
+def _run_fold_batch(batch, folds, causal):
+    """조합마다 폴드별 학습 구간 끝까지의 신호로 학습 구간 성과 계산"""
+    view = _worker['view']
+    results = []
+    for i, params in batch:
+        try:
+            strategy_params, risk = split_params(params, _worker['settings'])
+            signals = prefix_signals(_worker['strategy'], view, strategy_params, [b for _, b, _, _ in folds], causal)
+            metrics = [backtest(view.slice(a, b), signal[a:b], **risk)['metrics']
+                       for (a, b, _, _), signal in zip(folds, signals)]
+        except Exception as e:
+            metrics = [{'error': str(e)}] * len(folds)
+        results.append((i, params, metrics))
+    return results
+
+
+class WalkForward(Optimizer):
+    def __init__(self, data, strategy='obv', settings=None, train=24 * 90, test=24 * 30, step=None,
+                 anchored=False, metric='sharpe', maximize=True, workers=None, batch_size=16, causal=None):
+        """
+        워크 포워드 최적화 (폴드별 학습 구간 최적화 -> 다음 검증 구간 평가)
+
+        학습/검증 구간 신호는 그 구간 끝까지의 데이터로만 계산한다. 인과적인 전략은 조합마다
+        전체 구간 신호를 한 번만 계산해 모든 폴드가 잘라 재사용하고 (겹치는 학습 구간의 지표
+        재계산 없음), 그렇지 않은 전략(전체 데이터로 정하는 파라미터 등)은 폴드마다 다시 계산한다.
+        작업 단위는 조합이므로 모든 폴드의 학습 구간이 프로세스 풀에서 함께 평가된다.
+        검증 구간은 각각 포지션 없이 시작하고, 앞 검증 구간의 최종 자산을 이어받아
+        하나의 표본 외(out-of-sample) 자산 곡선으로 이어 붙인다.
+
+        사용 예:
+            with WalkForward(df, 'obv', risk_settings(config), train=24 * 90, test=24 * 30) as wf:
+                report = wf.run(grid({'ma_period': range(5, 100, 5)}))
+                report['equity'], report['folds'], report['stability']
+
+        :param train: 학습 구간 봉 수
+        :param test: 검증 구간 봉 수
+        :param step: 폴드 이동 봉 수 (None이면 test)
+        :param anchored: True면 학습 구간 시작 고정 (확장 윈도우)
+        :param causal: 전략 신호가 인과적인지 (None이면 조합마다 앞부분 신호를 비교해 판단,
+                       False면 항상 폴드별 계산)
+        나머지 인자는 Optimizer와 같다.
+        """
+        super().__init__(data, strategy, settings, metric, maximize, workers, batch_size)
+        self.folds = make_folds(len(self.data), train, test, step, anchored)
+        if not self.folds:
+            raise ValueError(f"Not enough bars ({len(self.data)}) for train={train}, test={test}")
+        self.causal = causal
+        self._signals = {}
+
+    def _signal(self, params, fold):
+        """선택된 조합의 폴드 검증 구간 끝까지의 신호 (조합별로 모든 폴드를 한 번에 계산해 재사용)"""
+        key = tuple(sorted(params.items()))
+        signals = self._signals.get(key)
+        if signals is None:
+            strategy_params, _ = split_params(params, self.settings)
+            signals = prefix_signals(self.strategy, self.data, strategy_params,
+                                     [d for _, _, _, d in self.folds], self.causal)
+            self._signals[key] = signals
+        return signals[fold]
+
+    def _best(self, train_results, fold):
+        """폴드 하나의 학습 구간 최적 조합 (동점이면 앞 순번)"""
+        scores = np.array([metrics[fold].get(self.metric, np.nan) for _, _, metrics in train_results], dtype=float)
+        scores = np.where(np.isfinite(scores), scores, np.nan)
+        if np.isnan(scores).all():
+            return None, np.nan
+        best = int(np.nanargmax(scores) if self.maximize else np.nanargmin(scores))
+        return train_results[best][1], scores[best]
+
+    def run(self, combos, on_result=None):
+        """
+        워크 포워드 실행
+
+        :param combos: 파라미터 딕셔너리 목록 (grid, random_search 결과 등)
+        :param on_result: 조합 하나의 학습 구간 평가가 끝날 때마다 (순번, 파라미터, 폴드별 지표)로 호출
+        :return: {'folds': 폴드별 최적 파라미터/학습/검증 성과, 'stability': 파라미터 안정성,
+                  'equity': 표본 외 자산 Series, 'trades': 표본 외 거래, 'metrics': 표본 외 성과}
+        """
+        train_results = []
+        for result in self._stream(combos, _run_fold_batch, self.folds, self.causal):
+            train_results.append(result)
+            if on_result is not None:
+                on_result(*result)
+        train_results.sort(key=lambda r: r[0])
+
+        cash = self.settings.get('initial_cash', 10000.0)
+        index = self.data.index
+        rows, curves, trades = [], [], []
+        for k, (a, b, c, d) in enumerate(self.folds):
+            params, score = self._best(train_results, k)
+            row = {'fold': k, 'train_start': index[a], 'train_end': index[b - 1],
+                   'test_start': index[c], 'test_end': index[d - 1], f'train_{self.metric}': score}
+            if params is None:
+                rows.append(row)
+                continue
+            _, risk = split_params(params, self.settings)
+            result = backtest(self.data.slice(c, d), self._signal(params, k)[c:d], **{**risk, 'initial_cash': cash})
+            cash = result['equity'][-1]
+            curves.append(pd.Series(result['equity'], index=index[c:d]))
+            fold_trades = dict(result['trades'])
+            fold_trades['entry_bar'] = fold_trades['entry_bar'] + c
+            fold_trades['exit_bar'] = fold_trades['exit_bar'] + c
+            trades.append(fold_trades)
+            row.update(params)
+            row.update({f'test_{name}': value for name, value in result['metrics'].items()})
+            rows.append(row)
+
+        folds = pd.DataFrame(rows)
+        equity = pd.concat(curves) if curves else pd.Series(dtype=float)
+        trades = {f: np.concatenate([t[f] for t in trades]) for f in TRADE_FIELDS} if trades else \
+            {f: np.empty(0) for f in TRADE_FIELDS}
+        timestamps = self.data['timestamp'] if 'timestamp' in self.data else np.arange(len(self.data))
+        metrics = performance(equity.to_numpy(), trades, self.settings.get('initial_cash', 10000.0),
+                              periods_per_year(timestamps))
+        names = list(combos[0]) if combos else []
+        return {'folds': folds, 'stability': parameter_stability(folds, names),
+                'equity': equity, 'trades': trades, 'metrics': metrics}
+
+
+def parameter_stability(folds, names):
+    """
+    폴드별 최적 파라미터 안정성
+
+    :return: 파라미터별 평균, 표준편차, 변동계수(표준편차/|평균|), 최소/최대, 고유값 수,
+             이전 폴드 대비 바뀐 횟수 (숫자가 아닌 파라미터는 고유값 수와 바뀐 횟수만)
+    """
+    rows = []
+    for name in names:
+        if name not in folds:
+            continue
+        values = folds[name].dropna()
+        row = {'param': name, 'unique': values.nunique(),
+               'changes': int((values != values.shift()).iloc[1:].sum())}
+        if pd.api.types.is_numeric_dtype(values) and len(values):
+            mean, std = float(values.mean()), float(values.std(ddof=0))
+            row.update({'mean': mean, 'std': std, 'cv': std / abs(mean) if mean else np.nan,
+                        'min': values.min(), 'max': values.max()})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    from config import config
+    from vector_backtest import risk_settings
+    from optimizer import grid
+
+    # 1시간봉 2년치 합성 데이터: 학습 90일 / 검증 30일 롤링 워크 포워드
+    n = 2 * 365 * 24
+    rng = np.random.default_rng(1)
+    close = 30000 * np.exp(np.cumsum(rng.standard_normal(n) * 0.006))
+    open_ = np.r_[close[0], close[:-1]]
+    df = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.random(n) * 0.004),
+        'low': np.minimum(open_, close) * (1 - rng.random(n) * 0.004),
+        'close': close,
+        'volume': rng.exponential(100, n),
+    }, index=pd.date_range('2023-01-01', periods=n, freq='h'))
+
+    combos = grid({'ma_period': list(range(5, 105, 5)), 'stop_loss': [1, 2, 3], 'take_profit': [3, 6, 9]})
+    for anchored in (False, True):
+        started = time.perf_counter()
+        with WalkForward(df, 'obv', risk_settings(config), train=24 * 90, test=24 * 30, anchored=anchored) as wf:
+            report = wf.run(combos)
+        elapsed = time.perf_counter() - started
+        print(f"\n{'Anchored' if anchored else 'Rolling'}: {len(wf.folds)} folds x {len(combos)} combinations "
+              f"in {elapsed:.1f}s")
+        print(report['folds'][['fold', 'test_start', 'ma_period', 'stop_loss', 'take_profit',
+                               'train_sharpe', 'test_sharpe', 'test_total_return']].to_string(index=False))
+        print(report['stability'].to_string(index=False))
+        print({k: round(v, 2) for k, v in report['metrics'].items()})
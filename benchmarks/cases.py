@@ -0,0 +1,126 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# src, backtest 디렉토리 경로 추가
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'backtest'))
+
+MINUTE_MS = 60_000
+START_MS = 1_704_067_200_000  # 2024-01-01 UTC
+
+
+def synthetic_candles(n, seed=0):
+    """
+    1분봉 합성 캔들 (N, 6) 배열 (timestamp, open, high, low, close, volume)
+
+    같은 (n, seed)면 항상 같은 데이터이므로 실행 간 결과를 비교할 수 있다.
+    """
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.standard_normal(n) * 0.001))
+    open_ = np.r_[close[0], close[:-1]]
+    return np.column_stack([
+        START_MS + np.arange(n, dtype=np.float64) * MINUTE_MS,
+        open_,
+        np.maximum(open_, close) * (1 + rng.random(n) * 0.002),
+        np.minimum(open_, close) * (1 - rng.random(n) * 0.002),
+        close,
+        rng.exponential(10, n),
+    ])
+
+
+def candle_frame(candles):
+    """합성 캔들 배열을 timestamp 인덱스 DataFrame으로"""
+    return pd.DataFrame(candles[:, 1:], columns=['open', 'high', 'low', 'close', 'volume'],
+                        index=pd.DatetimeIndex(candles[:, 0].astype('datetime64[ms]'), name='timestamp'))
+
+
+class SyntheticExchange:
+    """fetch_ohlcv/milliseconds만 제공하는 ccxt 대용 (합성 1분봉을 ccxt 응답 형식으로 반환)"""
+
+    id = 'synthetic'
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.timestamps = candles[:, 0].astype(np.int64)
+        self.options = {'defaultType': 'future'}
+
+    def milliseconds(self):
+        return int(self.timestamps[-1]) + MINUTE_MS
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        start = 0 if since is None else int(np.searchsorted(self.timestamps, since))
+        # ccxt 응답과 같은 리스트의 리스트 (요청한 페이지만 변환해 큰 입력도 메모리 일정)
+        return self.candles[start:start + (limit or len(self.candles))].tolist()
+
+
+# 벤치마크 케이스: setup(candles) -> 측정할 인자 없는 함수
+# (setup 시간은 측정하지 않음, 함수는 반복 실행해도 같은 작업을 해야 함)
+
+def setup_ingest(candles):
+    from exchange_pool import exchange_pool
+    from data_collection import DataCollector
+
+    exchange = SyntheticExchange(candles)
+    exchange_pool.set_exchange(exchange)
+    minutes = len(candles)
+
+    def run():
+        collector = DataCollector(symbol='BTC/USDT')
+        collector.refresh_base(history_minutes=minutes)
+    return run
+
+
+def setup_basic_signals(candles):
+    from strategy import TradingStrategy
+
+    df = candle_frame(candles)
+    return lambda: TradingStrategy(df, strategy_name='basic')._generate_basic_signals()
+
+
+def setup_obv_signals(candles):
+    from strategies.obv_strategy import OBVSignalStrategy
+
+    df = candle_frame(candles)
+    return lambda: OBVSignalStrategy(df).generate_signals()
+
+
+def setup_volume_profile(candles):
+    from strategies.volume_profile_strategy import VolumeProfileStrategy
+
+    df = candle_frame(candles)
+    return lambda: VolumeProfileStrategy(df).generate_signals()
+
+
+def setup_atr(candles):
+    from risk_management import RiskManager
+
+    risk = RiskManager(exchange=SyntheticExchange(candles[:1]), symbol='BTC/USDT')
+    highs, lows, closes = candles[:, 2], candles[:, 3], candles[:, 4]
+    return lambda: risk.calculate_atr(highs, lows, closes)
+
+
+def setup_backtrader(candles):
+    from backtrader_strategy import run_backtest
+    from store_feed import StoreData, timestamps_to_num
+    from strategies.obv_strategy import OBVStrategy
+    from config import config
+    import backtrader as bt
+
+    arrays = {col: candles[:, i] for i, col in enumerate(('timestamp', 'open', 'high', 'low', 'close', 'volume'))}
+    arrays['datetime'] = timestamps_to_num(arrays['timestamp'])
+    cfg = {**config, 'data': {**config['data'], 'compression': 1}, 'initial_cash': 1_000_000}
+    return lambda: run_backtest(cfg, OBVStrategy, data=StoreData(arrays=arrays, timeframe=bt.TimeFrame.Minutes))
+
+
+# 이름 -> (setup, 최대 봉 수 (None이면 제한 없음), 설명)
+CASES = {
+    'ingest': (setup_ingest, None, 'DataCollector.refresh_base (ccxt 응답 변환/검증 + 1m 리샘플러 적재)'),
+    'basic_signals': (setup_basic_signals, None, 'TradingStrategy._generate_basic_signals'),
+    'obv_signals': (setup_obv_signals, None, 'OBVSignalStrategy.generate_signals'),
+    'volume_profile': (setup_volume_profile, None, 'VolumeProfileStrategy 생성(프로파일 계산) + generate_signals'),
+    'atr': (setup_atr, None, 'RiskManager.calculate_atr'),
+    'backtrader': (setup_backtrader, 1_000_000, 'Backtrader OBVStrategy 전체 실행 (StoreData 피드)'),
+}
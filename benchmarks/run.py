@@ -0,0 +1,171 @@
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+from cases import CASES, synthetic_candles
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_THRESHOLD = 20.0  # 허용 시간 증가율 (%)
+DEFAULT_MEMORY_THRESHOLD = 20.0  # 허용 최대 메모리 증가율 (%)
+NOISE_FLOOR = 0.005  # 이보다 짧은 측정 시간(초)은 타이머 잡음이 커서 시간 비교 생략
+SLOW_RUN = 2.0  # 워밍업이 이보다 오래 걸리면(초) 한 번만 측정
+
+
+def measure(run, n, repeat=3):
+    """
+    함수 하나의 실행 시간과 최대 메모리
+
+    시간은 repeat회 중 최솟값(다른 프로세스 간섭이 가장 적은 값)이고, 최대 메모리는
+    tracemalloc 추적 중 한 번 더 실행해 측정한다 (추적 오버헤드가 시간에 섞이지 않도록 분리).
+    워밍업이 SLOW_RUN초보다 오래 걸리는 큰 입력은 한 번만 측정한다.
+
+    :param n: 처리 봉 수 (처리량 계산)
+    :return: {'seconds', 'bars_per_sec', 'peak_mib'}
+    """
+    started = time.perf_counter()
+    run()  # 워밍업 (임포트, 캐시 생성)
+    if time.perf_counter() - started > SLOW_RUN:
+        repeat = 1
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    seconds = min(times)
+    return {'seconds': seconds, 'bars_per_sec': n / seconds if seconds > 0 else float('inf'),
+            'peak_mib': peak / 2**20}
+
+
+def run_suite(sizes=DEFAULT_SIZES, names=None, repeat=3, seed=0, on_result=None):
+    """
+    벤치마크 실행
+
+    :param sizes: 합성 1분봉 개수 목록
+    :param names: 실행할 케이스 이름 (None이면 전체)
+    :param on_result: 측정 하나마다 (케이스, 봉 수, 결과)로 호출
+    :return: {케이스: {봉 수(문자열): measure 결과}}
+    """
+    results = {}
+    for n in sizes:
+        candles = synthetic_candles(n, seed)
+        for name in names or CASES:
+            setup, max_bars, _ = CASES[name]
+            if max_bars is not None and n > max_bars:
+                continue
+            result = measure(setup(candles), n, repeat)
+            results.setdefault(name, {})[str(n)] = result
+            if on_result is not None:
+                on_result(name, n, result)
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, memory_threshold=DEFAULT_MEMORY_THRESHOLD):
+    """
+    기준 결과 대비 성능 저하 목록
+
+    :return: [(케이스, 봉 수, 항목, 기준값, 현재값, 증가율 %), ...]
+    """
+    regressions = []
+    for name, by_size in results.items():
+        for n, current in by_size.items():
+            base = baseline.get(name, {}).get(n)
+            if base is None:
+                continue
+            checks = [('peak_mib', memory_threshold)]
+            if base['seconds'] >= NOISE_FLOOR:
+                checks.append(('seconds', threshold))
+            for key, limit in checks:
+                if base[key] > 0:
+                    change = (current[key] / base[key] - 1) * 100
+                    if change > limit:
+                        regressions.append((name, n, key, base[key], current[key], change))
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results, sizes):
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'sizes': list(sizes), 'results': results}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='지표/전략/적재/백테스트 성능 벤치마크')
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES),
+                        help='합성 1분봉 개수 (예: 1000 100000 10000000)')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=None)
+    parser.add_argument('--list', action='store_true', help='케이스 목록 출력')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='기준 결과 JSON 경로')
+    parser.add_argument('--save', action='store_true', help='이번 결과를 기준으로 저장')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='허용 시간 증가율 (%%)')
+    parser.add_argument('--memory-threshold', type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                        help='허용 최대 메모리 증가율 (%%)')
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, max_bars, description) in CASES.items():
+            print(f"{name:<16}{description}" + (f" (최대 {max_bars:,}봉)" if max_bars else ''))
+        return 0
+
+    print(f"{'case':<16}{'bars':>12}{'seconds':>12}{'bars/s':>16}{'peak MiB':>12}")
+
+    def report(name, n, result):
+        print(f"{name:<16}{n:>12,}{result['seconds']:>12.4f}{result['bars_per_sec']:>16,.0f}"
+              f"{result['peak_mib']:>12.1f}", flush=True)
+
+    results = run_suite(args.sizes, args.cases, args.repeat, args.seed, on_result=report)
+
+    if args.save:
+        save_baseline(args.baseline, results, args.sizes)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} (run with --save first)")
+        return 0
+
+    regressions = compare(results, load_baseline(args.baseline)['results'], args.threshold, args.memory_threshold)
+    for name, n, key, base, current, change in regressions:
+        print(f"REGRESSION {name} {int(n):,} bars {key}: {base:.4f} -> {current:.4f} (+{change:.1f}%)")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0f}% time / {args.memory_threshold:.0f}% memory")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
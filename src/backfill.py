@@ -0,0 +1,233 @@
+import os
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import ccxt
+import numpy as np
+from dotenv import load_dotenv
+try:
+    from .custom_logger import logger  # 패키지 내부에서 임포트
+    from .history_store import HistoryStore, to_millis
+    from .exchange_pool import get_exchange
+    from .ingest import clean_ohlcv
+except ImportError:
+    from custom_logger import logger  # 직접 실행 시 절대 경로 임포트
+    from history_store import HistoryStore, to_millis
+    from exchange_pool import get_exchange
+    from ingest import clean_ohlcv
+
+# 환경 변수 로드
+load_dotenv(os.path.join(os.path.dirname(__file__), '../config/.env'))
+
+# Bybit kline 요청 1회 최대 캔들 수
+BYBIT_KLINE_LIMIT = 1000
+
+# Bybit 공개 API 한도: IP당 5초에 600회 (초당 120회)
+# 실거래 세션과 예산을 나눠 쓰도록 초당 50회로 운용 (--rate로 한도 안에서 조정)
+DEFAULT_RATE = 50
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """
+        스레드 안전 토큰 버킷 (모든 워커가 하나의 요청 예산을 공유)
+
+        :param rate: 초당 토큰 충전 수
+        :param capacity: 버킷 최대 크기 (기본값: rate, 즉 1초 분량 버스트)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """토큰을 얻을 때까지 대기"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = max(self.paused_until - now, (tokens - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def set_rate(self, rate, capacity=None):
+        """초당 충전 수 변경 (공용 버킷을 쓰는 모든 호출자에 적용)"""
+        with self.lock:
+            self.rate = float(rate)
+            self.capacity = float(capacity or rate)
+            self.tokens = min(self.tokens, self.capacity)
+
+    def pause(self, seconds):
+        """한도 초과 응답 시 모든 워커를 함께 일시 정지 (개별 백오프 폭주 방지)"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+# 프로세스 공용 REST 요청 예산 (Backfiller, TradingEngine이 같은 인스턴스 사용)
+request_bucket = TokenBucket(DEFAULT_RATE)
+
+
+def limit_requests(exchange, bucket=request_bucket):
+    """
+    ccxt HTTP 요청마다 bucket 토큰을 쓰도록 설정 (ccxt 자체 요청 간격 제한 대체)
+
+    ccxt는 요청마다 엔드포인트 비용(cost)으로 throttle()을 호출하므로, 메서드 하나가
+    여러 페이지를 조회해도 요청 수만큼 예산이 차감된다.
+    """
+    exchange.enableRateLimit = True
+    exchange.throttle = lambda cost=None: bucket.acquire(1 if cost is None else cost)
+    return exchange
+
+
+class Backfiller:
+    def __init__(self, exchange=None, store=None, rate=None, workers=8,
+                 page_limit=BYBIT_KLINE_LIMIT, max_retries=5):
+        """
+        기간 분할 병렬 과거 캔들 수집기
+
+        :param exchange: ccxt 거래소 객체 (None이면 ccxt 요청 간격 제한을 끈 공용 세션,
+                         요청 속도는 rate 토큰 버킷 하나로만 제한)
+        :param store: 저장 대상 HistoryStore
+        :param rate: 초당 요청 수 (프로세스 공용 request_bucket에 적용, None이면 현재 값 유지)
+        :param workers: 동시 요청 스레드 수
+        :param page_limit: 페이지당 캔들 수
+        :param max_retries: 페이지별 재시도 횟수
+        """
+        self.exchange = exchange or get_exchange(rate_limit=False)
+        self.store = store or HistoryStore()
+        self.bucket = request_bucket
+        if rate is not None:
+            self.bucket.set_rate(rate)
+        self.workers = workers
+        self.page_limit = page_limit
+        self.max_retries = max_retries
+
+    def plan_pages(self, symbol, timeframe, start, end, skip_existing=True):
+        """
+        [start, end) 구간을 페이지 단위 (since, until) 목록으로 분할
+
+        저장소에 이미 빠짐없이 있는 페이지는 제외하므로, 같은 명령을 다시
+        실행하면 실패했거나 비어 있는 페이지만 이어서 받는다.
+        """
+        tf_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        start_ms = to_millis(start) // tf_ms * tf_ms
+        end_ms = to_millis(end)
+        page_ms = tf_ms * self.page_limit
+        pages = [(since, min(since + page_ms, end_ms)) for since in range(start_ms, end_ms, page_ms)]
+        if not skip_existing or not pages:
+            return pages
+
+        stored = self.store.read_arrays(symbol, timeframe, start_ms, end_ms)['timestamp']
+        bounds = np.array(pages, dtype=np.int64)
+        counts = np.searchsorted(stored, bounds[:, 1]) - np.searchsorted(stored, bounds[:, 0])
+        expected = -(-(bounds[:, 1] - bounds[:, 0]) // tf_ms)
+        return [page for page, n, e in zip(pages, counts, expected) if n < e]
+
+    def fetch_page(self, symbol, timeframe, since, until):
+        """단일 페이지 조회 (페이지 단위 재시도)"""
+        retry = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=self.page_limit,
+                                                  params={'until': until - 1})
+                arr, report = clean_ohlcv(ohlcv)
+                if report['invalid']:
+                    logger.warning(f"Filtered {report['invalid']} invalid candles on {symbol} page {since}")
+                return arr[(arr[:, 0] >= since) & (arr[:, 0] < until)]
+            except ccxt.RateLimitExceeded:
+                wait = 2 ** retry
+                logger.warning(f"Rate limit exceeded on {symbol} page {since}. Pausing all workers {wait}s")
+                self.bucket.pause(wait)
+            except ccxt.NetworkError as e:
+                logger.warning(f"Network error on {symbol} page {since}: {e}")
+                time.sleep(2 ** retry)
+            retry += 1
+            if retry > self.max_retries:
+                raise RuntimeError(f"{symbol} {timeframe} page {since} failed after {self.max_retries} retries")
+
+    def backfill(self, symbols, timeframe, start, end):
+        """
+        여러 심볼의 [start, end) 구간을 병렬 수집하여 저장소에 시간 순서대로 저장
+
+        :return: {symbol: {'added': 저장된 캔들 수, 'failed': 실패한 페이지 since 목록}}
+        """
+        if self.exchange.markets is None:
+            self.exchange.load_markets()  # 스레드 시작 전 한 번만 로드
+
+        plans = {s: self.plan_pages(s, timeframe, start, end) for s in symbols}
+        results = {s: {'added': 0, 'failed': []} for s in symbols}
+        ready = {s: {} for s in symbols}  # 완료되었지만 아직 저장되지 않은 페이지
+        next_page = {s: 0 for s in symbols}
+        total = sum(len(p) for p in plans.values())
+        logger.info(f"Backfill {timeframe} {start} ~ {end}: {len(symbols)} symbols, {total} pages")
+
+        started = time.monotonic()
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self.fetch_page, symbol, timeframe, since, until): (symbol, idx)
+                for symbol, pages in plans.items()
+                for idx, (since, until) in enumerate(pages)
+            }
+            for future in as_completed(futures):
+                symbol, idx = futures[future]
+                try:
+                    ready[symbol][idx] = future.result()
+                except Exception as e:
+                    logger.error(f"Backfill page failed: {e}")
+                    ready[symbol][idx] = None
+                    results[symbol]['failed'].append(plans[symbol][idx][0])
+                # 앞 페이지부터 연속으로 완료된 구간만 저장
+                results[symbol]['added'] += self._flush(symbol, timeframe, ready[symbol], next_page)
+                done += 1
+                if done % 100 == 0:
+                    logger.info(f"Backfill progress {done}/{total} pages ({time.monotonic() - started:.1f}s)")
+
+        for symbol in symbols:
+            results[symbol]['failed'].sort()
+            logger.info(f"Backfill {symbol}: {results[symbol]['added']} candles, "
+                        f"{len(results[symbol]['failed'])} failed pages")
+        return results
+
+    def _flush(self, symbol, timeframe, ready, next_page):
+        """연속 완료 페이지를 합쳐서 저장"""
+        pages = []
+        while next_page[symbol] in ready:
+            page = ready.pop(next_page[symbol])
+            if page is not None and len(page):
+                pages.append(page)
+            next_page[symbol] += 1
+        if not pages:
+            return 0
+        return self.store.append(symbol, timeframe, np.concatenate(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bybit 과거 캔들 병렬 수집')
+    parser.add_argument('--symbols', nargs='+', default=[os.getenv('TRADE_SYMBOL', 'BTC/USDT')])
+    parser.add_argument('--timeframe', default='1m')
+    parser.add_argument('--start', required=True, help='시작 일자 (예: 2024-01-01)')
+    parser.add_argument('--end', required=True, help='종료 일자 (미포함, 예: 2025-01-01)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='초당 요청 수')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--store', default=None, help='저장소 경로')
+    args = parser.parse_args()
+
+    store = HistoryStore(args.store) if args.store else HistoryStore()
+    backfiller = Backfiller(store=store, rate=args.rate, workers=args.workers)
+    results = backfiller.backfill(args.symbols, args.timeframe, args.start, args.end)
+    failed = sum(len(r['failed']) for r in results.values())
+    if failed:
+        logger.warning(f"{failed} pages failed. Re-run the same command to resume.")
+
+
+if __name__ == "__main__":
+    main()
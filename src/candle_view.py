@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+try:
+    from .ingest import OHLCV_COLUMNS
+except ImportError:
+    from ingest import OHLCV_COLUMNS
+
+
+def _readonly(values):
+    """복사 없이 읽기 전용 뷰 반환 (원본 배열의 쓰기 가능 여부는 그대로)"""
+    view = values.view()
+    view.setflags(write=False)
+    return view
+
+
+class CandleView:
+    def __init__(self, columns, index=None):
+        """
+        연속 numpy 배열 위의 읽기 전용 캔들 뷰
+
+        전략은 DataFrame을 복사해 컬럼을 덧붙이는 대신 이 뷰에서 원본 배열을 읽고,
+        계산한 파생 시계열은 전략별 scratch 딕셔너리에 따로 저장한다. 원본은 공유 저장소(mmap)나
+        DataFrame의 배열을 그대로 가리키므로 전략 수만큼 데이터가 복제되지 않는다.
+
+        :param columns: {컬럼 이름: 1차원 배열} ('timestamp'는 ms 정수)
+        :param index: 신호 Series에 쓸 pandas 인덱스 (None이면 timestamp로 생성)
+        """
+        self._columns = {name: _readonly(np.asarray(values)) for name, values in columns.items()}
+        lengths = {len(values) for values in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Column lengths differ: {lengths}")
+        self._length = lengths.pop() if lengths else 0
+        self._index = index
+
+    @classmethod
+    def from_frame(cls, df):
+        """DataFrame 컬럼 배열을 복사 없이 감싼 뷰 (DatetimeIndex면 timestamp는 필요할 때 계산)"""
+        columns = {col: df[col].to_numpy() for col in df.columns}
+        view = cls(columns, index=df.index)
+        return view
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """HistoryStore.read_arrays 결과 등 {컬럼: 배열} (mmap 구간도 복사 없음)"""
+        return cls(arrays)
+
+    @classmethod
+    def from_ohlcv(cls, arr):
+        """(N, 6) OHLCV 배열의 컬럼 뷰 (행 우선 배열이므로 각 컬럼은 간격이 있는 뷰)"""
+        return cls({name: arr[:, i] for i, name in enumerate(OHLCV_COLUMNS)})
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, name):
+        return name in self._columns or name == 'timestamp' and self._has_datetime_index()
+
+    def __getitem__(self, name):
+        values = self._columns.get(name)
+        if values is not None:
+            return values
+        if name == 'timestamp' and self._has_datetime_index():
+            values = _readonly(self._index.as_unit('ms').asi8)
+            self._columns['timestamp'] = values
+            return values
+        raise KeyError(name)
+
+    @property
+    def columns(self):
+        names = list(self._columns)
+        if 'timestamp' not in names and self._has_datetime_index():
+            names.insert(0, 'timestamp')
+        return names
+
+    def _has_datetime_index(self):
+        return isinstance(self._index, pd.DatetimeIndex)
+
+    @property
+    def index(self):
+        """신호 Series용 인덱스 (DataFrame 원본 인덱스 또는 timestamp에서 생성)"""
+        if self._index is None:
+            if 'timestamp' in self._columns:
+                ts = self._columns['timestamp'].astype(np.int64)
+                self._index = pd.DatetimeIndex(ts.astype('datetime64[ms]'), name='timestamp')
+            else:
+                self._index = pd.RangeIndex(self._length)
+        return self._index
+
+    def slice(self, start=None, stop=None):
+        """구간 뷰 (복사 없음)"""
+        columns = {name: values[start:stop] for name, values in self._columns.items()}
+        index = self._index[start:stop] if self._index is not None else None
+        return CandleView(columns, index)
+
+    def tail(self, n):
+        return self.slice(max(len(self) - n, 0), None)
+
+    def series(self, values, name=None):
+        """배열을 뷰 인덱스의 pandas Series로 (신호 반환용)"""
+        return pd.Series(values, index=self.index, name=name)
+
+    def to_frame(self, scratch=None):
+        """
+        원본 + 파생 시계열 DataFrame (복사, 디버깅/출력용)
+
+        :param scratch: 함께 넣을 {이름: 배열} (전략의 scratch)
+        """
+        data = {name: self[name] for name in self.columns if name != 'timestamp'}
+        data.update(scratch or {})
+        return pd.DataFrame(data, index=self.index)
+
+
+def as_candle_view(data):
+    """DataFrame, {컬럼: 배열}, (N, 6) 배열, CandleView를 CandleView로"""
+    if isinstance(data, CandleView):
+        return data
+    if isinstance(data, pd.DataFrame):
+        return CandleView.from_frame(data)
+    if isinstance(data, dict):
+        return CandleView.from_arrays(data)
+    return CandleView.from_ohlcv(np.asarray(data, dtype=np.float64))
+
+
+if __name__ == "__main__":
+    import tracemalloc
+
+    # 1분봉 3년치: DataFrame 복사 + 컬럼 추가 방식과 뷰 + scratch 방식의 최대 메모리 비교
+    n = 3 * 365 * 24 * 60
+    rng = np.random.default_rng(0)
+    close = 30000 + np.cumsum(rng.standard_normal(n) * 5)
+    df = pd.DataFrame({'open': close, 'high': close + 5, 'low': close - 5, 'close': close,
+                       'volume': rng.random(n) * 10},
+                      index=pd.date_range('2021-01-01', periods=n, freq='min'))
+
+    def copied(frame, strategies=3):
+        for _ in range(strategies):
+            copy = frame.copy()
+            copy['vwap'] = (copy['high'] + copy['low'] + copy['close']) / 3
+            copy['volume_ma'] = copy['volume'].rolling(20).mean()
+        return copy
+
+    def viewed(frame, strategies=3):
+        view = as_candle_view(frame)
+        for _ in range(strategies):
+            scratch = {'vwap': (view['high'] + view['low'] + view['close']) / 3,
+                       'volume_ma': pd.Series(view['volume']).rolling(20).mean().to_numpy()}
+        return scratch
+
+    for name, func in (('DataFrame copy', copied), ('CandleView', viewed)):
+        tracemalloc.start()
+        derived = func(df)  # 마지막 전략의 파생 시계열은 측정 끝까지 유지
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name}: peak {peak / 2**20:,.0f} MiB ({len(derived['vwap']):,} bars)")
@@ -2,29 +2,48 @@ import os
 import time
 import ccxt
 from dotenv import load_dotenv
+import numpy as np
 import pandas as pd
+import asyncio
 try:
     from .custom_logger import logger  # 패키지 내부에서 임포트
+    from .market_stream import MarketDataStream, build_topics, BYBIT_PUBLIC_WS_URL
+    from .history_store import HistoryStore
+    from .exchange_pool import get_exchange, reconnect_exchange
+    from .ingest import clean_ohlcv, to_frame, OHLCV_COLUMNS
+    from .resampler import CandleResampler, MINUTE_MS, TIMEFRAME_MS, bucket_start
+    from .backfill import BYBIT_KLINE_LIMIT
+    from .tick_aggregator import TickAggregator, FLOW_COLUMNS, append_flow_columns, rebucket_bars
 except ImportError:
     from custom_logger import logger  # 직접 실행 시 절대 경로 임포트
+    from market_stream import MarketDataStream, build_topics, BYBIT_PUBLIC_WS_URL
+    from history_store import HistoryStore
+    from exchange_pool import get_exchange, reconnect_exchange
+    from ingest import clean_ohlcv, to_frame, OHLCV_COLUMNS
+    from resampler import CandleResampler, MINUTE_MS, TIMEFRAME_MS, bucket_start
+    from backfill import BYBIT_KLINE_LIMIT
+    from tick_aggregator import TickAggregator, FLOW_COLUMNS, append_flow_columns, rebucket_bars
 
 # 환경 변수 로드
 load_dotenv(os.path.join(os.path.dirname(__file__), '../config/.env'))
 
+# 1m 기준 시계열 최초 적재 기간 (분, 주봉 하나 분량)
+BASE_HISTORY_MINUTES = 7 * 24 * 60
+
 class DataCollector:
-    def __init__(self):
+    def __init__(self, store=None, symbol=None):
         self.api_key = os.getenv('BYBIT_API_KEY')
         self.api_secret = os.getenv('BYBIT_API_SECRET')
-        self.symbol = os.getenv('TRADE_SYMBOL', 'BTC/USDT')
+        self.symbol = symbol or os.getenv('TRADE_SYMBOL', 'BTC/USDT')
         
-        # Bybit 연결 초기화
-        self.exchange = ccxt.bybit({
-            'apiKey': self.api_key,
-            'secret': self.api_secret,
-            'enableRateLimit': True,
-            'options': {'defaultType': 'future'}
-        })
+        # Bybit 연결 (프로세스 공용 세션)
+        self.exchange = get_exchange(self.api_key, self.api_secret)
         self.ws_connected = False
+        self.stream = None
+        self.store = store  # 캔들 저장소 (HistoryStore, 최초 저장 시 생성)
+        self.candle_cache = {}  # (symbol, timeframe) -> 캔들 DataFrame
+        self.resampler = CandleResampler()  # 1m 기준 다중 시간 단위 캐시 (get_candles)
+        self.trade_flow = TickAggregator(MINUTE_MS)  # publicTrade 체결 -> 1m 주문 흐름 봉 (get_flow_candles)
         
     def validate_candle(self, candle):
         """캔들 데이터 무결성 검증"""
@@ -57,81 +76,216 @@ class DataCollector:
     def reconnect(self):
         """거래소 연결 재설정"""
         try:
-            self.exchange = ccxt.bybit({
-                'apiKey': self.api_key,
-                'secret': self.api_secret,
-                'enableRateLimit': True,
-                'options': {'defaultType': 'future'}
-            })
-            logger.info("Exchange connection reestablished")
+            self.exchange = reconnect_exchange(self.exchange)
             return True
         except Exception as e:
             logger.error(f"Reconnection failed: {e}")
             return False
         
-    def fetch_historical_data(self, timeframe='1h', limit=100):
-        """과거 캔들 데이터 조회"""
+    def _fetch_valid_ohlcv(self, timeframe, limit, since=None):
+        """캔들 조회 후 무결성 검사를 통과한 캔들만 (N, 6) 배열로 반환"""
         def _fetch():
-            ohlcv = self.exchange.fetch_ohlcv(self.symbol, timeframe, limit=limit)
+            ohlcv, report = clean_ohlcv(self.exchange.fetch_ohlcv(self.symbol, timeframe, since=since, limit=limit))
             # 데이터 무결성 검사
-            valid_ohlcv = [c for c in ohlcv if self.validate_candle(c)]
-            if len(valid_ohlcv) != len(ohlcv):
-                logger.warning(f"Filtered {len(ohlcv) - len(valid_ohlcv)} invalid candles")
-            return valid_ohlcv
-            
-        ohlcv = self.fetch_with_retry(_fetch)
-        if ohlcv:
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            return df
+            if report['invalid']:
+                logger.warning(f"Filtered {report['invalid']} invalid candles: {report}")
+            return ohlcv
+
+        return self.fetch_with_retry(_fetch)
+
+    def fetch_historical_data(self, timeframe='1h', limit=100):
+        """과거 캔들 데이터 조회"""
+        ohlcv = self._fetch_valid_ohlcv(timeframe, limit)
+        if ohlcv is not None and len(ohlcv):
+            return to_frame(ohlcv)
         return None
-        
-    def stream_realtime_data(self, on_message, max_retries=3):
-        """실시간 거래 데이터 스트리밍 (WebSocket) - 기본 구현"""
-        retry = 0
-        while retry < max_retries:
-            try:
-                logger.info("Starting WebSocket connection...")
-                # 실제 WebSocket 연결 코드는 여기에 구현
-                # 연결 성공 시 루프 실행
-                self.ws_connected = True
-                while self.ws_connected:
-                    # 메시지 수신 및 on_message 콜백 호출
-                    # 예시: message = receive_websocket_message()
-                    # on_message(message)
-                    pass
-            except Exception as e:
-                logger.error(f"WebSocket error: {e}. Reconnecting...")
-                retry += 1
-                time.sleep(2 ** retry)
-        logger.error("WebSocket connection failed after retries")
-        
+
+    def fetch_latest_data(self, timeframe='1h', limit=100):
+        """
+        캔들 캐시를 증분 갱신한 뒤 최근 limit개 캔들 반환
+
+        첫 호출에서만 전체 구간을 조회하고, 이후에는 캐시의 마지막 캔들
+        시각부터(since) 새 캔들만 조회한다. 마지막 캔들은 아직 진행 중인
+        봉이므로 같은 timestamp로 다시 받아 덮어쓴다(upsert).
+
+        :param timeframe: 캔들 시간 단위
+        :param limit: 전략에 넘겨줄 캔들 개수 (캐시 보관 개수)
+        :return: 최근 limit개 캔들 DataFrame (조회 실패 시 캐시 또는 None)
+        """
+        key = (self.symbol, timeframe)
+        cached = self.candle_cache.get(key)
+        if cached is None or cached.empty:
+            df = self.fetch_historical_data(timeframe, limit)
+            if df is not None:
+                self.candle_cache[key] = df
+            return df
+
+        # 마지막(진행 중) 캔들부터 다시 조회
+        since = cached.index[-1].value // 10**6
+        ohlcv = self._fetch_valid_ohlcv(timeframe, limit, since=since)
+        if ohlcv is None or not len(ohlcv):
+            return cached
+
+        if len(ohlcv) >= limit:
+            # 공백이 캐시 창보다 길면 since 조회는 공백 앞쪽만 받으므로 최신 창을 다시 조회해 교체
+            merged = self.fetch_historical_data(timeframe, limit)
+            if merged is None:
+                return cached
+        else:
+            delta = to_frame(ohlcv)
+            merged = pd.concat([cached[cached.index < delta.index[0]], delta])
+        merged = merged.iloc[-limit:]
+        self.candle_cache[key] = merged
+        logger.debug(f"Candle cache {self.symbol} {timeframe}: +{len(ohlcv)} candles (delta fetch)")
+        return merged
+
+    def refresh_base(self, history_minutes=BASE_HISTORY_MINUTES):
+        """
+        1m 기준 캔들 증분 갱신 (상위 시간 단위는 resampler가 파생)
+
+        첫 호출에서는 저장소의 1m 캔들(store 지정 시)로 시작해 나머지 구간을
+        페이지 단위로 조회하고, 이후에는 마지막 마감 캔들 다음부터 한 번만 조회한다.
+        최초 적재 시작은 가장 긴 파생 시간 단위의 봉 경계(주봉이면 월요일 00:00 UTC)로
+        내려 맞추므로 첫 파생 봉도 일부 구간만으로 만들어지지 않는다.
+
+        :param history_minutes: 최초 적재 기간 (분, 봉 경계 정렬로 더 길어질 수 있음)
+        :return: 새로 마감된 1m 캔들 수
+        """
+        resampler = self.resampler
+        if resampler.last_closed is None:
+            since = self.exchange.milliseconds() - history_minutes * MINUTE_MS
+            if resampler.timeframes:
+                longest = max(resampler.timeframes, key=TIMEFRAME_MS.get)
+                since = int(bucket_start(since, longest))
+            if self.store is not None:
+                stored = self.store.read_arrays(self.symbol, '1m', start=since)
+                # 저장소가 시작 경계부터 있어야 첫 파생 봉이 완전함 (아니면 거래소에서 전부 조회)
+                if len(stored['timestamp']) and stored['timestamp'][0] <= since:
+                    resampler.seed(np.column_stack([stored[col] for col in OHLCV_COLUMNS]).astype(np.float64))
+        if resampler.last_closed is not None:
+            since = int(resampler.last_closed) + MINUTE_MS
+
+        added = 0
+        while True:
+            ohlcv = self._fetch_valid_ohlcv('1m', BYBIT_KLINE_LIMIT, since=since)
+            if ohlcv is None or not len(ohlcv):
+                break
+            # 페이지 마지막 캔들은 진행 중으로 취급하고 다음 페이지 첫 캔들로 다시 받는다
+            added += resampler.update(ohlcv, last_partial=True)
+            if len(ohlcv) < BYBIT_KLINE_LIMIT:
+                break
+            since = int(ohlcv[-1, 0])
+        return added
+
+    def get_candles(self, timeframe='5m', limit=100, refresh=True):
+        """
+        1m 기준 시계열에서 파생한 캔들 (시간 단위와 무관하게 네트워크 조회는 1m 증분 한 번)
+
+        :param timeframe: '1m', '5m', '15m', '1h', '4h', '1d', '1w'
+        :param limit: 최근 캔들 개수 (마지막은 진행 중인 봉)
+        :param refresh: False이면 네트워크 호출 없이 캐시만 사용
+        :return: timestamp 인덱스 DataFrame (데이터가 없으면 None)
+        """
+        if refresh:
+            self.refresh_base()
+        bars = self.resampler.get(timeframe, limit)
+        return to_frame(bars) if len(bars) else None
+
+    def on_trade_message(self, message):
+        """
+        Bybit publicTrade 스트림 메시지 반영 (다른 토픽은 무시, MarketDataStream 콜백으로 사용)
+
+        :return: 이번 메시지로 완성된 1m 체결 봉 배열 (publicTrade가 아니면 None)
+        """
+        if not message.get('topic', '').startswith('publicTrade.'):
+            return None
+        return self.trade_flow.on_message(message)
+
+    def trade_bars(self, timeframe='1m'):
+        """스트림으로 집계한 체결 봉 (진행 중 봉 포함, BAR_COLUMNS 순서 배열)"""
+        bars = self.trade_flow.snapshot()
+        if timeframe == '1m' or len(bars) == 0:
+            return bars
+        return rebucket_bars(bars, bucket_start(bars[:, 0], timeframe))
+
+    def get_flow_candles(self, timeframe='5m', limit=100, refresh=True):
+        """
+        get_candles 결과 뒤에 체결 스트림의 주문 흐름 컬럼(cvd, delta, buy_volume, sell_volume) 추가
+
+        CVD는 스트림 구독 시점부터 누적하며, 체결을 받기 전 캔들은 0이다.
+        """
+        data = self.get_candles(timeframe, limit, refresh)
+        if data is None:
+            return None
+        candles = np.column_stack([data.index.asi8 // 1_000_000, data.to_numpy()])
+        flow = append_flow_columns(candles, self.trade_bars(timeframe))[:, len(OHLCV_COLUMNS):]
+        data = data.copy()
+        data[list(FLOW_COLUMNS)] = flow
+        return data
+
+    def save_to_store(self, data, timeframe='1h'):
+        """
+        캔들을 로컬 컬럼형 저장소에 저장 (겹치는 구간은 덮어씀)
+
+        :param data: fetch_historical_data가 반환한 DataFrame
+        :return: 새로 추가된 캔들 수
+        """
+        if self.store is None:
+            self.store = HistoryStore()
+        return self.store.append(self.symbol, timeframe, data)
+
+    def clear_candle_cache(self, timeframe=None):
+        """캔들 캐시 초기화 (timeframe 지정 시 해당 시간 단위만)"""
+        if timeframe is None:
+            self.candle_cache.clear()
+        else:
+            self.candle_cache.pop((self.symbol, timeframe), None)
+
+    def create_stream(self, on_message, topics=None, timeframe='5m', url=BYBIT_PUBLIC_WS_URL, max_retries=3):
+        """
+        실시간 시장 데이터 스트림 생성 (kline, trade, orderbook)
+
+        :param on_message: 토픽 메시지 콜백 (일반 함수 또는 코루틴 함수)
+        :param topics: 구독 토픽 목록 (None이면 심볼 기본 토픽)
+        :param timeframe: 기본 kline 시간 단위
+        :param url: WebSocket 엔드포인트
+        :param max_retries: 연속 재연결 실패 허용 횟수
+        """
+        if topics is None:
+            topics = build_topics(self.symbol, timeframe)
+        self.stream = MarketDataStream(on_message, topics, url=url, max_retries=max_retries)
+        return self.stream
+
+    async def astream_realtime_data(self, on_message, max_retries=3, topics=None, timeframe='5m',
+                                    url=BYBIT_PUBLIC_WS_URL):
+        """실시간 데이터 스트리밍 (실행 중인 이벤트 루프용)"""
+        stream = self.create_stream(on_message, topics, timeframe, url, max_retries)
+        self.ws_connected = True
+        try:
+            await stream.run()
+        finally:
+            self.ws_connected = False
+
+    def stream_realtime_data(self, on_message, max_retries=3, topics=None, timeframe='5m',
+                             url=BYBIT_PUBLIC_WS_URL):
+        """실시간 거래 데이터 스트리밍 (WebSocket) - close_websocket() 호출 시까지 블로킹"""
+        asyncio.run(self.astream_realtime_data(on_message, max_retries, topics, timeframe, url))
+
     def close_websocket(self):
         """WebSocket 연결 종료"""
         self.ws_connected = False
+        if self.stream is not None:
+            self.stream.stop()
         logger.info("WebSocket connection closed")
-        
+
 if __name__ == "__main__":
-    import os
-    import datetime
-    
     collector = DataCollector()
     print("Fetching historical data...")
     data = collector.fetch_historical_data(limit=500)  # 500개 데이터 가져오기
-    
+
     if data is not None:
         print(data.head())
-        
-        # 데이터 저장 디렉토리 생성
-        data_dir = os.path.join(os.path.dirname(__file__), '../backtest/data')
-        os.makedirs(data_dir, exist_ok=True)
-        
-        # 파일 이름 생성 (예: bybit_btcusdt_1h_20250810.csv)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d")
-        filename = f"bybit_{collector.symbol.replace('/', '')}_1h_{timestamp}.csv"
-        filepath = os.path.join(data_dir, filename)
-        
-        # CSV로 저장
-        data.to_csv(filepath)
-        print(f"Data saved to {filepath}")
\ No newline at end of file
+
+        # 로컬 저장소에 저장 (backtest/data/store/<symbol>/1h/<YYYY-MM>/)
+        added = collector.save_to_store(data, timeframe='1h')
+        print(f"Saved {added} new candles to {collector.store.root}")
@@ -0,0 +1,260 @@
+from collections import deque
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 다이버전스 종류 코드
+REGULAR_BULLISH = 1   # 가격 저점 하락 + 지표 저점 상승 (하락 추세 약화)
+HIDDEN_BULLISH = 2    # 가격 저점 상승 + 지표 저점 하락 (상승 추세 지속)
+REGULAR_BEARISH = -1  # 가격 고점 상승 + 지표 고점 하락 (상승 추세 약화)
+HIDDEN_BEARISH = -2   # 가격 고점 하락 + 지표 고점 상승 (하락 추세 지속)
+
+DIVERGENCE_NAMES = {
+    REGULAR_BULLISH: 'regular_bullish',
+    HIDDEN_BULLISH: 'hidden_bullish',
+    REGULAR_BEARISH: 'regular_bearish',
+    HIDDEN_BEARISH: 'hidden_bearish',
+}
+
+# detect_divergences 결과 컬럼
+DIVERGENCE_FIELDS = ('kind', 'price_pivot1', 'price_pivot2', 'ind_pivot1', 'ind_pivot2', 'confirmed')
+
+
+def find_pivots(values, left=5, right=5, kind='low'):
+    """
+    스윙 저점/고점 인덱스 (벡터화)
+
+    i번째 값이 [i - left, i + right] 구간의 최솟값(고점은 최댓값)이면 피벗이다.
+    같은 값이 여럿이면 가장 앞의 것을 피벗으로 본다. 피벗은 right개 봉 뒤에 확정된다.
+
+    :param kind: 'low' 또는 'high'
+    :return: 피벗 인덱스 배열 (오름차순)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    width = left + right + 1
+    if len(values) < width:
+        return np.empty(0, dtype=np.int64)
+    windows = sliding_window_view(values, width)
+    pos = windows.argmin(axis=1) if kind == 'low' else windows.argmax(axis=1)
+    return np.flatnonzero(pos == left) + left
+
+
+def match_pivots(price_pivots, ind_pivots, tolerance):
+    """
+    가격 피벗마다 ±tolerance 봉 안에서 가장 가까운 지표 피벗 인덱스 (동일 거리면 앞쪽, 없으면 -1)
+    """
+    price_pivots = np.asarray(price_pivots, dtype=np.int64)
+    ind_pivots = np.asarray(ind_pivots, dtype=np.int64)
+    matched = np.full(len(price_pivots), -1, dtype=np.int64)
+    if len(ind_pivots) == 0 or len(price_pivots) == 0:
+        return matched
+    j = np.searchsorted(ind_pivots, price_pivots)  # 가격 피벗 이후(같은 봉 포함) 첫 지표 피벗
+    before = ind_pivots[np.maximum(j - 1, 0)]
+    after = ind_pivots[np.minimum(j, len(ind_pivots) - 1)]
+    d_before = np.where(j > 0, price_pivots - before, tolerance + 1)
+    d_after = np.where(j < len(ind_pivots), after - price_pivots, tolerance + 1)
+    use_before = d_before <= d_after
+    best = np.where(use_before, before, after)
+    dist = np.where(use_before, d_before, d_after)
+    matched[dist <= tolerance] = best[dist <= tolerance]
+    return matched
+
+
+def _classify(p1, p2, price1, price2, ind1, ind2, kind):
+    """연속한 두 피벗 쌍의 다이버전스 종류 (없으면 0)"""
+    if kind == 'low':
+        regular = (price2 < price1) & (ind2 > ind1)
+        hidden = (price2 > price1) & (ind2 < ind1)
+        return np.where(regular, REGULAR_BULLISH, np.where(hidden, HIDDEN_BULLISH, 0))
+    regular = (price2 > price1) & (ind2 < ind1)
+    hidden = (price2 < price1) & (ind2 > ind1)
+    return np.where(regular, REGULAR_BEARISH, np.where(hidden, HIDDEN_BEARISH, 0))
+
+
+def detect_divergences(high, low, indicator, left=5, right=5, tolerance=2,
+                       min_distance=5, max_distance=60):
+    """
+    가격과 지표(OBV, CVD 등)의 다이버전스 검출 (전체 이력 한 번에)
+
+    가격 스윙 저점(고점)마다 ±tolerance 봉 안의 지표 스윙 저점(고점)을 짝지은 뒤,
+    연속한 두 가격 피벗의 간격이 [min_distance, max_distance] 봉이면 가격과 지표의
+    방향을 비교한다. 확정 시점은 두 번째 가격 피벗 + tolerance + right 봉으로,
+    그 시점까지의 데이터만 사용하므로 미래 데이터가 섞이지 않는다
+    (DivergenceDetector와 같은 결과).
+
+    :param left: 피벗 왼쪽 비교 봉 수
+    :param right: 피벗 오른쪽 비교 봉 수 (확정 지연)
+    :param tolerance: 가격/지표 피벗 허용 간격 (봉)
+    :return: {DIVERGENCE_FIELDS: 배열} (확정 시점 순)
+    """
+    high, low, indicator = (np.asarray(a, dtype=np.float64) for a in (high, low, indicator))
+    parts = []
+    for kind, price in (('low', low), ('high', high)):
+        price_piv = find_pivots(price, left, right, kind)
+        ind_piv = find_pivots(indicator, left, right, kind)
+        matched = match_pivots(price_piv, ind_piv, tolerance)
+        if len(price_piv) < 2:
+            continue
+        p1, p2 = price_piv[:-1], price_piv[1:]
+        m1, m2 = matched[:-1], matched[1:]
+        gap = p2 - p1
+        ok = (m1 >= 0) & (m2 >= 0) & (m1 != m2) & (gap >= min_distance) & (gap <= max_distance)
+        p1, p2, m1, m2 = p1[ok], p2[ok], m1[ok], m2[ok]
+        codes = _classify(p1, p2, price[p1], price[p2], indicator[m1], indicator[m2], kind)
+        hit = codes != 0
+        parts.append(np.column_stack([codes[hit], p1[hit], p2[hit], m1[hit], m2[hit],
+                                      p2[hit] + tolerance + right]))
+    if not parts:
+        return {field: np.empty(0, dtype=np.int64) for field in DIVERGENCE_FIELDS}
+    rows = np.concatenate(parts).astype(np.int64)
+    rows = rows[rows[:, 5] < len(low)]  # 아직 확정되지 않은 다이버전스 제외
+    rows = rows[np.lexsort((rows[:, 0], rows[:, 5]))]
+    return {field: rows[:, i] for i, field in enumerate(DIVERGENCE_FIELDS)}
+
+
+def divergence_signals(length, divergences, kinds=None):
+    """
+    봉별 다이버전스 신호 배열 (확정 봉에 종류 코드, 그 외 0)
+
+    :param length: 전체 봉 수
+    :param kinds: 포함할 종류 코드 목록 (None이면 전부)
+    """
+    signal = np.zeros(length, dtype=np.int8)
+    keep = divergences['confirmed'] < length
+    if kinds is not None:
+        keep &= np.isin(divergences['kind'], list(kinds))
+    signal[divergences['confirmed'][keep]] = divergences['kind'][keep]
+    return signal
+
+
+class _PivotTracker:
+    def __init__(self, left, right, kind):
+        """봉 단위 피벗 확정 (find_pivots와 같은 규칙)"""
+        self.left = left
+        self.kind = kind
+        self.window = deque(maxlen=left + right + 1)
+        self.pivots = deque(maxlen=64)  # (인덱스, 값)
+
+    def update(self, index, value):
+        """index번째 값 추가, 이번에 확정된 피벗 (인덱스, 값) 또는 None"""
+        self.window.append(value)
+        if len(self.window) < self.window.maxlen:
+            return None
+        values = np.fromiter(self.window, dtype=np.float64, count=len(self.window))
+        pos = values.argmin() if self.kind == 'low' else values.argmax()
+        if pos != self.left:
+            return None
+        pivot = (index - (len(self.window) - 1 - self.left), values[self.left])
+        self.pivots.append(pivot)
+        return pivot
+
+
+class DivergenceDetector:
+    def __init__(self, left=5, right=5, tolerance=2, min_distance=5, max_distance=60):
+        """
+        봉 단위 다이버전스 검출기 (실시간용, detect_divergences와 같은 결과)
+
+        사용 예:
+            detector = DivergenceDetector()
+            detector.seed(high, low, obv_values)          # 과거 데이터
+            found = detector.update(h, l, obv_value)      # 새 봉마다, 확정된 다이버전스 목록
+        """
+        self.left = left
+        self.right = right
+        self.tolerance = tolerance
+        self.min_distance = min_distance
+        self.max_distance = max_distance
+        self.index = -1
+        self.sides = {}
+        for kind in ('low', 'high'):
+            self.sides[kind] = {
+                'price': _PivotTracker(left, right, kind),
+                'ind': _PivotTracker(left, right, kind),
+                'waiting': deque(),  # 지표 피벗 대기 중인 가격 피벗 (인덱스, 값)
+                'last': None,  # 직전 가격 피벗 (인덱스, 값, 지표 피벗 인덱스, 지표 값)
+            }
+
+    def seed(self, high, low, indicator):
+        """
+        과거 데이터로 상태 초기화
+
+        이후 결과에 영향을 주는 최근 구간만 다시 처리한다.
+        """
+        keep = self.max_distance + self.left + self.right + 2 * self.tolerance + 1
+        start = max(len(low) - keep, 0)
+        self.index = start - 1
+        for h, l, v in zip(high[start:], low[start:], indicator[start:]):
+            self.update(h, l, v)
+
+    def update(self, high, low, indicator):
+        """
+        새 봉 반영
+
+        :return: 이번 봉에서 확정된 다이버전스 딕셔너리 목록 (DIVERGENCE_FIELDS 키)
+        """
+        self.index += 1
+        found = []
+        for kind, price in (('low', low), ('high', high)):
+            side = self.sides[kind]
+            pivot = side['price'].update(self.index, price)
+            if pivot is not None:
+                side['waiting'].append(pivot)
+            side['ind'].update(self.index, indicator)
+            # 지표 피벗이 확정될 수 있는 시점(가격 피벗 + tolerance + right)이 지난 가격 피벗 평가
+            while side['waiting'] and side['waiting'][0][0] + self.tolerance + self.right <= self.index:
+                result = self._evaluate(side, kind, *side['waiting'].popleft())
+                if result is not None:
+                    found.append(result)
+        found.sort(key=lambda d: d['kind'])
+        return found
+
+    def _evaluate(self, side, kind, p2, price2):
+        match = None
+        for idx, value in side['ind'].pivots:
+            dist = abs(idx - p2)
+            if dist <= self.tolerance and (match is None or dist < abs(match[0] - p2)):
+                match = (idx, value)
+        prev, current = side['last'], (p2, price2) + (match if match else (-1, np.nan))
+        side['last'] = current
+        if prev is None or match is None or prev[2] < 0 or prev[2] == match[0]:
+            return None
+        gap = p2 - prev[0]
+        if gap < self.min_distance or gap > self.max_distance:
+            return None
+        code = int(_classify(prev[0], p2, prev[1], price2, prev[3], match[1], kind))
+        if code == 0:
+            return None
+        return dict(zip(DIVERGENCE_FIELDS, (code, prev[0], p2, prev[2], match[0], self.index)))
+
+
+if __name__ == "__main__":
+    import time
+    try:
+        from .indicators import obv
+    except ImportError:
+        from indicators import obv
+
+    # 1분봉 5년치 합성 데이터 전체 검출
+    n = 5 * 365 * 24 * 60
+    rng = np.random.default_rng(0)
+    close = 30000 + np.cumsum(rng.standard_normal(n) * 5)
+    high = close + rng.random(n) * 5
+    low = close - rng.random(n) * 5
+    volume = rng.exponential(10, n)
+    ind = obv(close, volume)
+
+    started = time.perf_counter()
+    found = detect_divergences(high, low, ind)
+    elapsed = time.perf_counter() - started
+    counts = {name: int((found['kind'] == code).sum()) for code, name in DIVERGENCE_NAMES.items()}
+    print(f"Scanned {n:,} bars in {elapsed:.2f}s: {counts}")
+
+    # 증분 검출 결과 비교 (앞 20만 봉)
+    m = 200_000
+    detector = DivergenceDetector()
+    started = time.perf_counter()
+    live = [tuple(d[f] for f in DIVERGENCE_FIELDS)
+            for i in range(m) for d in detector.update(high[i], low[i], ind[i])]
+    elapsed = time.perf_counter() - started
+    batch = detect_divergences(high[:m], low[:m], ind[:m])
+    batch = list(zip(*(batch[f].tolist() for f in DIVERGENCE_FIELDS)))
+    print(f"Incremental: {m / elapsed:,.0f} bars/s, matches batch={live == batch}")
@@ -0,0 +1,263 @@
+import os
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from dotenv import load_dotenv
+try:
+    from .custom_logger import logger  # 패키지 내부에서 임포트
+    from .data_collection import DataCollector
+    from .execution import OrderExecutor
+    from .risk_management import RiskManager
+    from .strategy_loader import StrategyRunner
+    from .backfill import request_bucket, limit_requests
+    from .market_stream import MarketDataStream, build_topics
+    from .order_book import OrderBookManager
+except ImportError:
+    from custom_logger import logger  # 직접 실행 시 절대 경로 임포트
+    from data_collection import DataCollector
+    from execution import OrderExecutor
+    from risk_management import RiskManager
+    from strategy_loader import StrategyRunner
+    from backfill import request_bucket, limit_requests
+    from market_stream import MarketDataStream, build_topics
+    from order_book import OrderBookManager
+
+# 환경 변수 로드
+load_dotenv(os.path.join(os.path.dirname(__file__), '../config/.env'))
+
+
+def trade_symbols():
+    """거래 심볼 목록 (TRADE_SYMBOLS="BTC/USDT,ETH/USDT", 없으면 TRADE_SYMBOL 하나)"""
+    value = os.getenv('TRADE_SYMBOLS') or os.getenv('TRADE_SYMBOL', 'BTC/USDT')
+    return [s.strip() for s in value.split(',') if s.strip()]
+
+
+class LatencyStats:
+    def __init__(self, maxlen=1000):
+        """최근 maxlen개 구간 소요 시간 통계 (초 단위 기록, ms 단위 보고)"""
+        self.samples = deque(maxlen=maxlen)
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.skipped = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        report = {'count': self.count, 'errors': self.errors, 'timeouts': self.timeouts, 'skipped': self.skipped}
+        if self.samples:
+            ms = np.asarray(self.samples) * 1000
+            report.update({
+                'last_ms': round(float(ms[-1]), 1),
+                'mean_ms': round(float(ms.mean()), 1),
+                'p95_ms': round(float(np.percentile(ms, 95)), 1),
+                'max_ms': round(float(ms.max()), 1),
+            })
+        return report
+
+
+class SymbolWorker:
+    def __init__(self, symbol, store=None, order_books=None):
+        """심볼 하나의 데이터 수집/전략/주문 상태 (거래소 세션과 로컬 호가창은 프로세스 공용)"""
+        self.symbol = symbol
+        self.collector = DataCollector(store, symbol=symbol)
+        self.executor = OrderExecutor(order_books=order_books, symbol=symbol)
+        self.risk_manager = RiskManager(self.executor.exchange, symbol, order_books=order_books,
+                                        resampler=self.collector.resampler)
+        self.runner = None  # 첫 데이터 수신 시 생성
+        self.fetch_task = None  # 진행 중인 조회 (시간 초과 후에도 스레드는 계속 실행됨)
+        self.order_lock = asyncio.Lock()  # 같은 심볼 주문 순서 보장
+        self.loop_latency = LatencyStats()
+        self.order_latency = LatencyStats()
+        self.last_signal = 0
+
+
+class TradingEngine:
+    def __init__(self, symbols=None, timeframe='5m', limit=100, interval=60, strategies=None,
+                 rate=None, max_concurrency=16, fetch_timeout=20, order_workers=4,
+                 report_interval=300, store=None, orderbook_depth=50):
+        """
+        asyncio 기반 다중 심볼 거래 엔진
+
+        심볼마다 독립된 루프(조회 -> 전략 -> 주문 요청)를 돌리므로 느린 심볼이 다른
+        심볼의 신호를 지연시키지 않는다. 블로킹 REST 호출은 공용 스레드 풀에서
+        실행하고, 모든 심볼이 하나의 거래소 세션과 프로세스 공용 요청 예산(토큰 버킷)을
+        공유한다. 예산은 HTTP 요청마다 차감된다 (캔들 조회가 여러 페이지여도 페이지 수만큼).
+        주문은 공용 큐를 거쳐 주문 워커가 실행한다. 전체 심볼의 orderbook 토픽을 하나의
+        WebSocket 스트림으로 받아 로컬 호가창을 유지하므로 주문 시 REST 호가 조회를 하지 않는다.
+
+        :param symbols: 거래 심볼 목록 (None일 경우 환경변수)
+        :param timeframe: 캔들 시간 단위
+        :param limit: 전략에 넘겨줄 캔들 개수
+        :param interval: 심볼별 루프 주기 (초)
+        :param strategies: 전략 이름 목록 (None일 경우 환경변수)
+        :param rate: 초당 REST 요청 한도 (backfill.request_bucket에 적용, None이면 현재 값 유지)
+        :param max_concurrency: 동시 REST 호출 수 (스레드 풀 크기)
+        :param fetch_timeout: 조회 대기 한도 (초, 초과 시 이번 주기 건너뜀)
+        :param order_workers: 주문 큐 소비 워커 수
+        :param report_interval: 지연 통계 로그 주기 (초, None이면 기록 안 함)
+        :param orderbook_depth: 로컬 호가창 구독 깊이 (None이면 구독 안 함, 주문마다 REST 조회)
+        """
+        self.symbols = list(symbols or trade_symbols())
+        self.timeframe = timeframe
+        self.limit = limit
+        self.interval = interval
+        self.strategies = strategies
+        self.fetch_timeout = fetch_timeout
+        self.order_workers = order_workers
+        self.report_interval = report_interval
+        self.bucket = request_bucket
+        if rate is not None:
+            self.bucket.set_rate(rate)
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='engine')
+        self.order_books = None
+        self.stream = None
+        if orderbook_depth:
+            self.order_books = OrderBookManager()
+            topics = [t for symbol in self.symbols
+                      for t in build_topics(symbol, kline=False, trades=False, orderbook_depth=orderbook_depth)]
+            self.stream = MarketDataStream(self.order_books.on_message, topics)
+            self.order_books.attach(self.stream)
+        self.workers = {symbol: SymbolWorker(symbol, store, self.order_books) for symbol in self.symbols}
+        for exchange in {id(e): e for w in self.workers.values()
+                         for e in (w.collector.exchange, w.executor.exchange)}.values():
+            limit_requests(exchange, self.bucket)
+        self.orders = None  # asyncio.Queue (run()에서 생성)
+        self.loop = None
+        self.stopping = None
+
+    async def _call(self, func, *args):
+        """블로킹 REST 호출을 스레드 풀에서 실행 (요청 예산은 거래소 세션이 HTTP 요청마다 차감)"""
+        return await self.loop.run_in_executor(self.pool, func, *args)
+
+    def _evaluate(self, worker, data):
+        """새로 마감된 봉으로 전략 갱신 후 주 전략 신호 반환"""
+        if worker.runner is None:
+            worker.runner = StrategyRunner(data.iloc[:-1], self.strategies)
+            return 0
+        signals = worker.runner.feed(data)
+        return signals[worker.runner.primary] if signals else 0
+
+    async def _symbol_loop(self, worker):
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            if worker.fetch_task is not None and not worker.fetch_task.done():
+                # 이전 조회가 아직 끝나지 않음: 같은 캐시에 동시 조회하지 않고 이번 주기 건너뜀
+                worker.loop_latency.skipped += 1
+            else:
+                worker.fetch_task = asyncio.ensure_future(
+                    self._call(worker.collector.get_candles, self.timeframe, self.limit))
+                try:
+                    data = await asyncio.wait_for(asyncio.shield(worker.fetch_task), self.fetch_timeout)
+                    if data is not None:
+                        signal = self._evaluate(worker, data)
+                        worker.last_signal = signal
+                        if signal:
+                            await self.orders.put({
+                                'symbol': worker.symbol, 'signal': signal,
+                                'price': float(data['close'].iloc[-1]), 'queued': time.monotonic(),
+                            })
+                    worker.loop_latency.record(time.monotonic() - started)
+                except asyncio.TimeoutError:
+                    worker.loop_latency.timeouts += 1
+                    logger.warning(f"{worker.symbol}: fetch exceeded {self.fetch_timeout}s, skipping cycle")
+                except Exception as e:
+                    worker.loop_latency.errors += 1
+                    logger.error(f"{worker.symbol}: loop error: {e}")
+            await self._sleep(self.interval - (time.monotonic() - started))
+
+    async def _order_loop(self):
+        while True:
+            order = await self.orders.get()
+            worker = self.workers[order['symbol']]
+            try:
+                async with worker.order_lock:
+                    await self._execute(worker, order)
+                worker.order_latency.record(time.monotonic() - order['queued'])
+            except Exception as e:
+                worker.order_latency.errors += 1
+                logger.error(f"{order['symbol']}: order error: {e}")
+            finally:
+                self.orders.task_done()
+
+    async def _execute(self, worker, order):
+        """주문 요청 실행 (매수: 위험 기반 수량 시장가, 매도: 포지션 청산)"""
+        if order['signal'] == 1:
+            logger.info(f"{worker.symbol}: BUY signal detected")
+            size = await self._call(worker.risk_manager.calculate_position_size, order['price'])
+            if size:
+                await self._call(worker.executor.place_market_order, 'buy', size)
+        elif order['signal'] == -1:
+            logger.info(f"{worker.symbol}: SELL signal detected")
+            await self._call(worker.executor.close_all_positions)
+
+    async def _report_loop(self):
+        while not self.stopping.is_set():
+            await self._sleep(self.report_interval)
+            for symbol, stats in self.latency_report().items():
+                logger.info(f"{symbol} latency: loop={stats['loop']} order={stats['order']}")
+
+    async def _sleep(self, seconds):
+        """stop() 호출 시 즉시 깨어나는 대기"""
+        if seconds <= 0:
+            return
+        try:
+            await asyncio.wait_for(self.stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def latency_report(self):
+        """심볼별 루프/주문 지연 통계"""
+        return {symbol: {'loop': w.loop_latency.summary(), 'order': w.order_latency.summary(),
+                         'signal': w.last_signal}
+                for symbol, w in self.workers.items()}
+
+    async def run(self, duration=None):
+        """
+        엔진 실행 (stop() 호출 또는 duration 초 경과 시 종료)
+
+        :return: 심볼별 지연 통계
+        """
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        self.orders = asyncio.Queue()
+        logger.info(f"Trading engine started: {len(self.symbols)} symbols, {self.timeframe}")
+
+        tasks = [asyncio.create_task(self._symbol_loop(w)) for w in self.workers.values()]
+        order_tasks = [asyncio.create_task(self._order_loop()) for _ in range(self.order_workers)]
+        if self.report_interval:
+            tasks.append(asyncio.create_task(self._report_loop()))
+        stream_task = asyncio.create_task(self.stream.run()) if self.stream is not None else None
+        if duration is not None:
+            self.loop.call_later(duration, self.stopping.set)
+        try:
+            await asyncio.gather(*tasks)
+            await self.orders.join()  # 남은 주문 처리
+        finally:
+            for task in tasks + order_tasks:
+                task.cancel()
+            if stream_task is not None:
+                self.stream.stop()
+                await asyncio.gather(stream_task, return_exceptions=True)
+            self.pool.shutdown(wait=False)
+        logger.info("Trading engine stopped")
+        return self.latency_report()
+
+    def stop(self):
+        """엔진 종료 요청 (다른 스레드에서도 호출 가능)"""
+        if self.loop is not None and self.stopping is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # 사용 예: python src/engine.py BTC/USDT ETH/USDT SOL/USDT
+    engine = TradingEngine(sys.argv[1:] or None, interval=10, report_interval=None)
+    report = asyncio.run(engine.run(duration=30))
+    for symbol, stats in report.items():
+        print(f"{symbol}: {stats}")
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import threading
+import ccxt
+import requests
+from dotenv import load_dotenv
+try:
+    from .custom_logger import logger  # 패키지 내부에서 임포트
+except ImportError:
+    from custom_logger import logger  # 직접 실행 시 절대 경로 임포트
+
+# 환경 변수 로드
+load_dotenv(os.path.join(os.path.dirname(__file__), '../config/.env'))
+
+# 마켓 메타데이터 디스크 캐시
+MARKETS_CACHE_DIR = os.path.join(os.path.dirname(__file__), '../cache')
+MARKETS_CACHE_TTL = 24 * 60 * 60  # 초
+
+
+class ExchangePool:
+    def __init__(self, cache_dir=MARKETS_CACHE_DIR, cache_ttl=MARKETS_CACHE_TTL):
+        """
+        프로세스 공용 거래소 세션 관리자
+
+        같은 인증 정보/마켓 타입 조합에는 하나의 ccxt 인스턴스만 만들어
+        DataCollector, OrderExecutor, RiskManager가 공유한다. 따라서 rate limit,
+        HTTP keep-alive 세션, 마켓 메타데이터가 프로세스 전체에서 하나로 유지된다.
+
+        :param cache_dir: 마켓 메타데이터 캐시 디렉토리
+        :param cache_ttl: 캐시 유효 시간 (초)
+        """
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.exchanges = {}
+        self.lock = threading.RLock()  # 세션 목록/마켓 반영 보호 (네트워크 I/O 중에는 잡지 않음)
+        self._loading = {}  # id(exchange) -> 마켓 로드 잠금
+
+    def get(self, api_key=None, api_secret=None, default_type='future', rate_limit=True):
+        """
+        공유 거래소 인스턴스 반환 (없으면 생성 후 마켓 로드)
+
+        :param rate_limit: False면 ccxt 자체 요청 간격 제한을 끈 별도 세션
+                           (호출하는 쪽이 자체 제한기로 요청 속도를 관리할 때, 예: Backfiller)
+        """
+        if api_key is None:
+            api_key = os.getenv('BYBIT_API_KEY')
+        if api_secret is None:
+            api_secret = os.getenv('BYBIT_API_SECRET')
+        key = (api_key, api_secret, default_type, rate_limit)
+        with self.lock:
+            exchange = self.exchanges.get(key)
+            if exchange is not None:
+                return exchange
+            exchange = ccxt.bybit({
+                'apiKey': api_key,
+                'secret': api_secret,
+                'enableRateLimit': rate_limit,
+                'options': {'defaultType': default_type}
+            })
+            self.exchanges[key] = exchange
+        # 마켓 로드는 풀 잠금 밖에서 (느린 조회가 다른 세션 조회/재연결을 막지 않도록)
+        try:
+            self.load_markets(exchange)
+        except Exception as e:
+            # 오프라인 등으로 실패하면 첫 요청 시 ccxt가 다시 로드
+            logger.warning(f"Market preload failed: {e}")
+        return exchange
+
+    def set_exchange(self, exchange, api_key=None, api_secret=None, default_type='future'):
+        """외부에서 만든 거래소 객체를 공유 인스턴스로 등록 (모의 거래소 등)"""
+        if api_key is None:
+            api_key = os.getenv('BYBIT_API_KEY')
+        if api_secret is None:
+            api_secret = os.getenv('BYBIT_API_SECRET')
+        with self.lock:
+            for rate_limit in (True, False):
+                self.exchanges[(api_key, api_secret, default_type, rate_limit)] = exchange
+        return exchange
+
+    def _cache_path(self, exchange):
+        default_type = exchange.options.get('defaultType', 'spot')
+        return os.path.join(self.cache_dir, f"markets_{exchange.id}_{default_type}.json")
+
+    def load_markets(self, exchange, reload=False):
+        """
+        마켓 메타데이터 로드 (디스크 캐시 우선, 만료 시 거래소 조회 후 캐시 갱신)
+
+        :param reload: True면 캐시를 무시하고 거래소에서 다시 조회
+        """
+        with self._loading_lock(exchange):
+            if exchange.markets and not reload:
+                return exchange.markets
+
+            path = self._cache_path(exchange)
+            if not reload and os.path.exists(path) and time.time() - os.path.getmtime(path) < self.cache_ttl:
+                try:
+                    with open(path) as f:
+                        cached = json.load(f)
+                    with self.lock:
+                        exchange.set_markets(cached['markets'], cached.get('currencies'))
+                    logger.info(f"Loaded {len(exchange.markets)} markets from cache")
+                    return exchange.markets
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Market cache read failed: {e}")
+
+            # 네트워크 조회는 풀 잠금 없이, 결과 반영만 잠금 안에서
+            currencies = None
+            if exchange.has.get('fetchCurrencies') is True:
+                currencies = exchange.fetch_currencies()
+                exchange.options['cachedCurrencies'] = currencies  # ccxt load_markets와 같은 처리
+            try:
+                fetched = exchange.fetch_markets()
+            finally:
+                exchange.options.pop('cachedCurrencies', None)
+            with self.lock:
+                markets = exchange.set_markets(fetched, currencies)
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump({'markets': exchange.markets, 'currencies': exchange.currencies}, f)
+                os.replace(tmp_path, path)
+            except (OSError, TypeError) as e:
+                logger.warning(f"Market cache write failed: {e}")
+            logger.info(f"Loaded {len(markets)} markets from exchange")
+            return markets
+
+    def _loading_lock(self, exchange):
+        """거래소 인스턴스별 마켓 로드 잠금 (같은 인스턴스의 중복 조회 방지, 다른 세션은 막지 않음)"""
+        with self.lock:
+            lock = self._loading.get(id(exchange))
+            if lock is None:
+                lock = self._loading[id(exchange)] = threading.Lock()
+            return lock
+
+    def reconnect(self, exchange):
+        """
+        소프트 재연결: HTTP 세션만 새로 만들고 마켓 메타데이터는 유지
+
+        공유 인스턴스를 그대로 고치므로 이를 참조하는 모든 모듈에 반영된다.
+        """
+        with self.lock:
+            session = getattr(exchange, 'session', None)
+            if session is not None:
+                session.close()
+                # ccxt Exchange.__init__과 같은 방식으로 생성 (프록시 환경 변수 무시 설정 유지)
+                exchange.session = requests.Session()
+                exchange.session.trust_env = exchange.requests_trust_env
+            logger.info("Exchange connection reestablished (markets kept)")
+            return exchange
+
+
+# 프로세스 전역 인스턴스
+exchange_pool = ExchangePool()
+
+
+def get_exchange(api_key=None, api_secret=None, default_type='future', rate_limit=True):
+    """공유 거래소 인스턴스 반환"""
+    return exchange_pool.get(api_key, api_secret, default_type, rate_limit)
+
+
+def reconnect_exchange(exchange):
+    """공유 거래소 인스턴스 소프트 재연결"""
+    return exchange_pool.reconnect(exchange)
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    exchange = get_exchange()
+    print(f"First get: {(time.perf_counter() - started) * 1000:.1f} ms, markets: {len(exchange.markets or {})}")
+
+    started = time.perf_counter()
+    same = get_exchange()
+    print(f"Second get: {(time.perf_counter() - started) * 1000:.3f} ms, shared: {same is exchange}")
+
+    reconnect_exchange(exchange)
+    print(f"Markets kept after reconnect: {len(exchange.markets or {})}")
@@ -2,28 +2,33 @@ import os
 import time
 import ccxt
 from dotenv import load_dotenv
-from .custom_logger import logger  # 로깅 모듈에서 logger 가져오기
+try:
+    from .custom_logger import logger  # 로깅 모듈에서 logger 가져오기
+    from .exchange_pool import get_exchange, reconnect_exchange
+except ImportError:
+    from custom_logger import logger  # 직접 실행 시 절대 경로 임포트
+    from exchange_pool import get_exchange, reconnect_exchange
 
 # 환경 변수 로드
 load_dotenv(os.path.join(os.path.dirname(__file__), '../config/.env'))
 
 class OrderExecutor:
-    def __init__(self):
+    def __init__(self, order_books=None, symbol=None):
+        """
+        주문 실행 클래스
+
+        :param order_books: 로컬 호가창 (OrderBookManager, None이면 주문마다 REST 조회)
+        :param symbol: 거래 심볼 (None일 경우 TRADE_SYMBOL)
+        """
         self.api_key = os.getenv('BYBIT_API_KEY')
         self.api_secret = os.getenv('BYBIT_API_SECRET')
-        self.symbol = os.getenv('TRADE_SYMBOL', 'BTC/USDT')
+        self.symbol = symbol or os.getenv('TRADE_SYMBOL', 'BTC/USDT')
         self.trade_amount = float(os.getenv('TRADE_AMOUNT', 100))
         
-        # Bybit 연결 초기화 (선물 거래)
-        self.exchange = ccxt.bybit({
-            'apiKey': self.api_key,
-            'secret': self.api_secret,
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'future'
-            }
-        })
+        # Bybit 연결 (선물 거래, 프로세스 공용 세션)
+        self.exchange = get_exchange(self.api_key, self.api_secret)
         self.local_order_state = {}  # 로컬 주문 상태 추적
+        self.order_books = order_books
         
     def execute_with_retry(self, func, max_retries=5, *args, **kwargs):
         """지수 백오프 재시도 로직"""
@@ -55,13 +60,7 @@ class OrderExecutor:
     def reconnect(self):
         """거래소 연결 재설정"""
         try:
-            self.exchange = ccxt.bybit({
-                'apiKey': self.api_key,
-                'secret': self.api_secret,
-                'enableRateLimit': True,
-                'options': {'defaultType': 'future'}
-            })
-            logger.info("Exchange connection reestablished")
+            self.exchange = reconnect_exchange(self.exchange)
             self.sync_order_state()  # 재연결 후 주문 상태 동기화
             return True
         except Exception as e:
@@ -143,31 +142,40 @@ class OrderExecutor:
             
         return self.execute_with_retry(_place_order)
         
-    def safe_market_order(self, side, amount=None, max_slippage=0.5):
+    def safe_market_order(self, side, amount=None, max_slippage=0.5, reduce_only=False):
         """
         슬리피지 보호가 적용된 안전한 시장가 주문
         :param max_slippage: 허용 최대 슬리피지 (%)
+        :param reduce_only: 포지션 청산 전용 주문 (기본값: False)
         """
         if amount is None:
             amount = self.trade_amount
             
-        # 현재 호가창 가격 조회
-        order_book = self.exchange.fetch_order_book(self.symbol)
-        best_bid = order_book['bids'][0][0] if order_book['bids'] else None
-        best_ask = order_book['asks'][0][0] if order_book['asks'] else None
+        # 현재 호가창 가격 조회 (로컬 호가창이 유효하면 네트워크 호출 없음)
+        book = self.order_books.get_fresh(self.symbol) if self.order_books else None
+        if book is not None:
+            best_bid, best_ask = book.best_bid, book.best_ask
+            _, slippage, filled = book.estimate_fill(side, amount)
+            if slippage is not None and (slippage > max_slippage or filled < amount):
+                logger.warning(f"Estimated slippage {slippage:.3f}% (fillable {filled}/{amount}) "
+                               f"exceeds protection {max_slippage}%")
+        else:
+            order_book = self.exchange.fetch_order_book(self.symbol)
+            best_bid = order_book['bids'][0][0] if order_book['bids'] else None
+            best_ask = order_book['asks'][0][0] if order_book['asks'] else None
         
         if not best_bid or not best_ask:
             logger.warning("Failed to get order book. Using regular market order")
-            return self.place_market_order(side, amount)
+            return self.place_market_order(side, amount, reduce_only=reduce_only)
             
         # 매수 주문 시: best_ask * (1 + max_slippage/100)
         # 매도 주문 시: best_bid * (1 - max_slippage/100)
         if side == 'buy':
             limit_price = best_ask * (1 + max_slippage/100)
-            return self.place_limit_order(side, limit_price, amount)
+            return self.place_limit_order(side, limit_price, amount, reduce_only=reduce_only)
         else:
             limit_price = best_bid * (1 - max_slippage/100)
-            return self.place_limit_order(side, limit_price, amount)
+            return self.place_limit_order(side, limit_price, amount, reduce_only=reduce_only)
             
     def close_all_positions(self, use_safe_order=False):
         """모든 포지션 청산 (안전 주문 옵션 포함)"""
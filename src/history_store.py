@@ -0,0 +1,272 @@
+import os
+import json
+import shutil
+import uuid
+import numpy as np
+import pandas as pd
+try:
+    from .custom_logger import logger  # 패키지 내부에서 임포트
+except ImportError:
+    from custom_logger import logger  # 직접 실행 시 절대 경로 임포트
+
+# 기본 저장 경로 (backtest/data/store/<symbol>/<timeframe>/<YYYY-MM>/<segment>/<column>.npy)
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(__file__), '../backtest/data/store')
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+DTYPES = {'timestamp': np.int64, 'open': np.float64, 'high': np.float64,
+          'low': np.float64, 'close': np.float64, 'volume': np.float64}
+
+MANIFEST = 'manifest.json'  # 월 파티션의 세그먼트 목록 (교체 한 번으로 파티션 전체 갱신)
+MAX_SEGMENTS = 16  # 세그먼트가 이만큼 쌓이면 하나로 합침
+
+
+def to_millis(value):
+    """시각(문자열, datetime, Timestamp, ms 정수)을 UTC ms 정수로 변환"""
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return pd.Timestamp(value).value // 10**6
+
+
+def storage_key(symbol):
+    """심볼을 디렉토리 이름으로 변환 (예: 'BTC/USDT:USDT' -> 'BTCUSDT')"""
+    return symbol.split(':')[0].replace('/', '').replace('-', '')
+
+
+class HistoryStore:
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        """
+        심볼/시간 단위/월 단위로 분할 저장하는 컬럼형 캔들 저장소
+
+        각 월 파티션은 세그먼트(컬럼별 .npy 파일 묶음) 목록을 담은 manifest로
+        관리한다. 추가할 때는 새 세그먼트만 쓰고 manifest를 원자적으로 교체하므로
+        기존 데이터를 다시 쓰지 않고, 동시에 읽는 쪽이나 쓰기 도중 중단된 경우에도
+        항상 컬럼 길이가 맞는 이전 또는 새 파티션만 보인다. 세그먼트가 MAX_SEGMENTS개
+        쌓이면 하나로 합친다. 읽기는 memory-map으로 필요한 구간만 잘라서 반환하며,
+        같은 timestamp는 나중에 쓴 값으로 덮어쓰므로 겹치는 구간을 다시 받아도
+        중복 저장되지 않는다.
+
+        :param root: 저장소 루트 디렉토리
+        """
+        self.root = os.path.abspath(root)
+
+    def _series_dir(self, symbol, timeframe):
+        return os.path.join(self.root, storage_key(symbol), timeframe)
+
+    def months(self, symbol, timeframe):
+        """저장된 월 파티션 목록 (정렬됨, 'YYYY-MM')"""
+        series_dir = self._series_dir(symbol, timeframe)
+        if not os.path.isdir(series_dir):
+            return []
+        return sorted(m for m in os.listdir(series_dir)
+                      if os.path.exists(os.path.join(series_dir, m, MANIFEST)))
+
+    @staticmethod
+    def _segments(part_dir):
+        """파티션 세그먼트 목록 (오래된 순, 없으면 [])"""
+        try:
+            with open(os.path.join(part_dir, MANIFEST)) as f:
+                return json.load(f)['segments']
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _load_segment(part_dir, segment, mmap=True, columns=COLUMNS):
+        mode = 'r' if mmap else None
+        return {col: np.load(os.path.join(part_dir, segment, f"{col}.npy"), mmap_mode=mode) for col in columns}
+
+    def _load_partition(self, symbol, timeframe, month, mmap=True):
+        """
+        월 파티션 전체 (세그먼트가 하나면 memory-map 그대로, 여러 개면 합친 뒤 정렬/중복 제거)
+        """
+        part_dir = os.path.join(self._series_dir(symbol, timeframe), month)
+        segments = [self._load_segment(part_dir, seg, mmap) for seg in self._segments(part_dir)]
+        if len(segments) == 1:
+            return segments[0]
+        part = {col: np.concatenate([seg[col] for seg in segments]) for col in COLUMNS}
+        if len(part['timestamp']) > 1 and not (np.diff(part['timestamp']) > 0).all():
+            part = self._sort_dedup(part)
+        return part
+
+    def _write_segment(self, part_dir, arrays):
+        """새 세그먼트 쓰기 (manifest에 올리기 전까지 읽는 쪽에 보이지 않음)"""
+        segment = uuid.uuid4().hex[:16]
+        seg_dir = os.path.join(part_dir, segment)
+        os.makedirs(seg_dir)
+        for col in COLUMNS:
+            np.save(os.path.join(seg_dir, f"{col}.npy"), np.ascontiguousarray(arrays[col], dtype=DTYPES[col]))
+        return segment
+
+    def _publish(self, part_dir, segments, previous):
+        """
+        manifest 원자적 교체 후 더 이상 쓰지 않는 세그먼트 정리
+
+        직전 manifest의 세그먼트는 교체 직전에 목록을 읽은 쪽을 위해 한 세대 남겨 둔다.
+        """
+        path = os.path.join(part_dir, MANIFEST)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'segments': segments}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        keep = set(segments) | set(previous)
+        for name in os.listdir(part_dir):
+            seg_dir = os.path.join(part_dir, name)
+            if name not in keep and os.path.isdir(seg_dir):
+                shutil.rmtree(seg_dir, ignore_errors=True)
+
+    @staticmethod
+    def _to_columns(candles):
+        """DataFrame(timestamp 인덱스/컬럼) 또는 (N, 6) 배열을 컬럼 딕셔너리로 변환"""
+        if isinstance(candles, pd.DataFrame):
+            if 'timestamp' in candles.columns:
+                ts = candles['timestamp']
+            else:
+                ts = candles.index
+            if np.issubdtype(np.asarray(ts).dtype, np.datetime64):
+                ts = pd.DatetimeIndex(ts).as_unit('ms').asi8
+            columns = {'timestamp': np.asarray(ts, dtype=np.int64)}
+            for col in COLUMNS[1:]:
+                columns[col] = candles[col].to_numpy(dtype=np.float64)
+            return columns
+        arr = np.asarray(candles, dtype=np.float64)
+        columns = {'timestamp': arr[:, 0].astype(np.int64)}
+        for i, col in enumerate(COLUMNS[1:], start=1):
+            columns[col] = arr[:, i]
+        return columns
+
+    def append(self, symbol, timeframe, candles):
+        """
+        캔들 추가 (같은 timestamp는 새 값으로 교체)
+
+        :param candles: timestamp 인덱스 DataFrame 또는 [timestamp, o, h, l, c, v] 배열
+        :return: 새로 추가된 캔들 수
+        """
+        new = self._to_columns(candles)
+        if len(new['timestamp']) == 0:
+            return 0
+        month_keys = new['timestamp'].astype('datetime64[ms]').astype('datetime64[M]').astype(str)
+        added = 0
+        for month in np.unique(month_keys):
+            mask = month_keys == month
+            part = self._sort_dedup({col: new[col][mask] for col in COLUMNS})
+            part_dir = os.path.join(self._series_dir(symbol, timeframe), month)
+            os.makedirs(part_dir, exist_ok=True)
+            segments = self._segments(part_dir)
+            count = len(part['timestamp'])
+            if segments:
+                # 기존 timestamp와 겹치는 캔들은 새로 추가된 것이 아님 (읽을 때 새 값으로 교체)
+                old_ts = np.concatenate([self._load_segment(part_dir, seg, columns=('timestamp',))['timestamp']
+                                         for seg in segments])
+                if part['timestamp'][0] <= old_ts.max():
+                    count -= int(np.isin(part['timestamp'], old_ts).sum())
+            if len(segments) + 1 >= MAX_SEGMENTS:
+                # 세그먼트가 많으면 파티션 전체를 세그먼트 하나로 합침
+                old = self._load_partition(symbol, timeframe, month, mmap=False)
+                merged = self._sort_dedup({col: np.concatenate([old[col], part[col]]) for col in COLUMNS})
+                self._publish(part_dir, [self._write_segment(part_dir, merged)], segments)
+            else:
+                self._publish(part_dir, segments + [self._write_segment(part_dir, part)], segments)
+            added += count
+        logger.debug(f"HistoryStore {symbol} {timeframe}: +{added} candles")
+        return added
+
+    @staticmethod
+    def _sort_dedup(part):
+        """timestamp 정렬 후 중복 시 마지막(새) 값 유지"""
+        order = np.argsort(part['timestamp'], kind='stable')
+        ts = part['timestamp'][order]
+        keep = np.ones(len(ts), dtype=bool)
+        keep[:-1] = ts[:-1] != ts[1:]
+        idx = order[keep]
+        return {col: part[col][idx] for col in COLUMNS}
+
+    def _months_between(self, symbol, timeframe, start_ms, end_ms):
+        """[start_ms, end_ms] 구간과 겹치는 월 파티션 목록"""
+        months = self.months(symbol, timeframe)
+        if start_ms is not None:
+            first = str(np.datetime64(start_ms, 'ms').astype('datetime64[M]'))
+            months = [m for m in months if m >= first]
+        if end_ms is not None:
+            last = str(np.datetime64(end_ms, 'ms').astype('datetime64[M]'))
+            months = [m for m in months if m <= last]
+        return months
+
+    def revision(self, symbol, timeframe, start=None, end=None):
+        """
+        구간 데이터 버전 (겹치는 월 파티션의 세그먼트 목록, manifest만 읽음)
+
+        append마다 새 세그먼트가 생기므로 구간 데이터가 바뀌면 값이 바뀐다 (읽기 결과 캐시 키용).
+        """
+        series_dir = self._series_dir(symbol, timeframe)
+        return tuple((month, tuple(self._segments(os.path.join(series_dir, month))))
+                     for month in self._months_between(symbol, timeframe, to_millis(start), to_millis(end)))
+
+    def read_arrays(self, symbol, timeframe, start=None, end=None):
+        """
+        기간 내 캔들을 컬럼 배열로 조회 (end 미포함)
+
+        단일 파티션 구간이면 memory-map 슬라이스를 그대로(복사 없이) 반환한다.
+
+        :return: {'timestamp': int64 ms, 'open': ..., 'volume': ...}
+        """
+        start_ms, end_ms = to_millis(start), to_millis(end)
+        months = self._months_between(symbol, timeframe, start_ms, end_ms)
+
+        chunks = []
+        for month in months:
+            part = self._load_partition(symbol, timeframe, month)
+            ts = part['timestamp']
+            lo = 0 if start_ms is None else np.searchsorted(ts, start_ms, side='left')
+            hi = len(ts) if end_ms is None else np.searchsorted(ts, end_ms, side='left')
+            if hi > lo:
+                chunks.append({col: part[col][lo:hi] for col in COLUMNS})
+
+        if not chunks:
+            return {col: np.empty(0, dtype=DTYPES[col]) for col in COLUMNS}
+        if len(chunks) == 1:
+            return chunks[0]
+        return {col: np.concatenate([c[col] for c in chunks]) for col in COLUMNS}
+
+    def read(self, symbol, timeframe, start=None, end=None):
+        """기간 내 캔들을 timestamp 인덱스 DataFrame으로 조회 (end 미포함)"""
+        arrays = self.read_arrays(symbol, timeframe, start, end)
+        index = pd.DatetimeIndex(arrays['timestamp'].astype('datetime64[ms]'), name='timestamp')
+        return pd.DataFrame({col: arrays[col] for col in COLUMNS[1:]}, index=index)
+
+    def first_timestamp(self, symbol, timeframe):
+        """가장 오래된 캔들 timestamp (ms, 없으면 None)"""
+        months = self.months(symbol, timeframe)
+        if not months:
+            return None
+        return int(self._load_partition(symbol, timeframe, months[0])['timestamp'][0])
+
+    def last_timestamp(self, symbol, timeframe):
+        """가장 최근 캔들 timestamp (ms, 없으면 None)"""
+        months = self.months(symbol, timeframe)
+        if not months:
+            return None
+        return int(self._load_partition(symbol, timeframe, months[-1])['timestamp'][-1])
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    # 1분봉 1년치 합성 데이터로 쓰기/읽기 확인
+    n = 525600
+    ts = np.int64(pd.Timestamp('2024-01-01').value // 10**6) + np.arange(n, dtype=np.int64) * 60000
+    close = 50000 + np.cumsum(np.random.randn(n))
+    candles = np.column_stack([ts, close, close + 5, close - 5, close, np.random.rand(n) * 10])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(tmp)
+        print(f"Appended {store.append('BTC/USDT', '1m', candles)} candles")
+        print(f"Re-appended overlap: {store.append('BTC/USDT', '1m', candles[-1000:])} new candles")
+
+        started = time.perf_counter()
+        df = store.read('BTC/USDT', '1m', '2024-03-01', '2024-09-01')
+        print(f"Read {len(df)} candles in {(time.perf_counter() - started) * 1000:.1f} ms")
+        print(df.head())
@@ -0,0 +1,306 @@
+from collections import deque
+import numpy as np
+
+# 기본 세션 길이 (UTC 일 단위)
+SESSION_MS = 24 * 60 * 60 * 1000
+
+# ---------------------------------------------------------------------------
+# 배치 계산 (전체 배열)
+#
+# 누적합은 np.cumsum(순차 덧셈)으로, 이동 합계는 누적합의 차이로 계산한다.
+# 아래 증분 클래스도 같은 순서로 같은 연산을 하므로 결과가 비트 단위로 같다.
+# ---------------------------------------------------------------------------
+
+
+def typical_price(high, low, close):
+    """대표 가격 (고가 + 저가 + 종가) / 3"""
+    return (np.asarray(high, dtype=np.float64) + low + close) / 3
+
+
+def obv(close, volume):
+    """On-Balance Volume (첫 값은 첫 봉 거래량)"""
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    if len(close) == 0:
+        return np.empty(0)
+    flow = np.empty(len(close))
+    flow[0] = volume[0]
+    flow[1:] = np.sign(np.diff(close)) * volume[1:]
+    return np.cumsum(flow)
+
+
+def volume_delta(high, low, close, volume):
+    """
+    봉 단위 매수-매도 거래량 추정 (체결 데이터가 없을 때, close location value 방식)
+
+    종가가 고가에 붙으면 +volume, 저가에 붙으면 -volume, 고가 == 저가이면 0
+    """
+    high, low, close, volume = (np.asarray(a, dtype=np.float64) for a in (high, low, close, volume))
+    rng = high - low
+    return np.where(rng > 0, volume * ((close - low) - (high - close)) / np.where(rng > 0, rng, 1.0), 0.0)
+
+
+def true_range(high, low, close):
+    """True Range (첫 봉은 고가 - 저가)"""
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    prev_close = np.r_[close[:1], close[:-1]]
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def rolling_sum(values, period):
+    """이동 합계 (처음 period - 1개는 NaN)"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        cum = np.concatenate([[0.0], np.cumsum(values)])
+        out[period - 1:] = cum[period:] - cum[:-period]
+    return out
+
+
+def rolling_mean(values, period):
+    """단순 이동평균 (SMA)"""
+    return rolling_sum(values, period) / period
+
+
+def vwap(high, low, close, volume):
+    """누적 VWAP (데이터 시작부터)"""
+    pv = typical_price(high, low, close) * volume
+    return np.cumsum(pv) / np.cumsum(np.asarray(volume, dtype=np.float64))
+
+
+def session_vwap(timestamps, high, low, close, volume, session_ms=SESSION_MS):
+    """
+    세션 VWAP (세션 시작마다 누적 초기화)
+
+    :param timestamps: ms 단위 timestamp 배열
+    :param session_ms: 세션 길이 (기본 UTC 1일)
+    """
+    pv = typical_price(high, low, close) * volume
+    volume = np.asarray(volume, dtype=np.float64)
+    sessions = np.asarray(timestamps, dtype=np.int64) // session_ms
+    out = np.empty(len(pv))
+    bounds = np.flatnonzero(np.r_[True, sessions[1:] != sessions[:-1], True])
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        out[start:end] = np.cumsum(pv[start:end]) / np.cumsum(volume[start:end])
+    return out
+
+
+def rolling_vwap(high, low, close, volume, period):
+    """이동 VWAP (최근 period개 봉)"""
+    pv = typical_price(high, low, close) * volume
+    return rolling_sum(pv, period) / rolling_sum(volume, period)
+
+
+# ---------------------------------------------------------------------------
+# 증분 계산 (봉 하나당 O(1))
+# ---------------------------------------------------------------------------
+
+
+class RollingSum:
+    def __init__(self, period):
+        """이동 합계 (누적합 차이 방식, rolling_sum과 동일 결과)"""
+        self.period = period
+        self.total = 0.0
+        self.history = deque([0.0], maxlen=period + 1)  # 최근 period + 1개의 누적합
+
+    def update(self, value):
+        self.total = self.total + value
+        self.history.append(self.total)
+        if len(self.history) <= self.period:
+            return np.nan
+        return self.history[-1] - self.history[0]
+
+    def seed(self, values):
+        """배치 배열로 상태 초기화 (마지막 값 반환)"""
+        cum = np.concatenate([[0.0], np.cumsum(np.asarray(values, dtype=np.float64))])
+        self.total = float(cum[-1])
+        self.history = deque(cum[-(self.period + 1):].tolist(), maxlen=self.period + 1)
+        if len(self.history) <= self.period:
+            return np.nan
+        return self.history[-1] - self.history[0]
+
+
+class SMA:
+    def __init__(self, period):
+        """단순 이동평균 (rolling_mean과 동일 결과)"""
+        self.period = period
+        self.sum = RollingSum(period)
+
+    def update(self, value):
+        return self.sum.update(value) / self.period
+
+    def seed(self, values):
+        return self.sum.seed(values) / self.period
+
+
+class OBV:
+    def __init__(self):
+        """On-Balance Volume (obv와 동일 결과)"""
+        self.value = None
+        self.prev_close = None
+
+    def update(self, close, volume):
+        if self.value is None:
+            self.value = float(volume)
+        else:
+            self.value = self.value + np.sign(close - self.prev_close) * volume
+        self.prev_close = close
+        return self.value
+
+    def seed(self, close, volume):
+        if len(close) == 0:
+            return None
+        self.value = float(obv(close, volume)[-1])
+        self.prev_close = float(close[-1])
+        return self.value
+
+
+class VWAP:
+    def __init__(self, session_ms=None):
+        """
+        누적/세션 VWAP (vwap, session_vwap과 동일 결과)
+
+        :param session_ms: 세션 길이 (None이면 초기화 없이 누적)
+        """
+        self.session_ms = session_ms
+        self.session = None
+        self.cum_pv = 0.0
+        self.cum_v = 0.0
+
+    def update(self, timestamp, high, low, close, volume):
+        if self.session_ms is not None:
+            session = int(timestamp) // self.session_ms
+            if session != self.session:
+                self.session = session
+                self.cum_pv = 0.0
+                self.cum_v = 0.0
+        tp = (high + low + close) / 3
+        self.cum_pv = self.cum_pv + tp * volume
+        self.cum_v = self.cum_v + volume
+        return self.cum_pv / self.cum_v
+
+    def seed(self, timestamps, high, low, close, volume):
+        high, low, close, volume = (np.asarray(a, dtype=np.float64) for a in (high, low, close, volume))
+        if len(close) == 0:
+            return None
+        start = 0
+        if self.session_ms is not None:
+            sessions = np.asarray(timestamps, dtype=np.int64) // self.session_ms
+            self.session = int(sessions[-1])
+            start = int(np.searchsorted(sessions, sessions[-1]))
+        pv = typical_price(high[start:], low[start:], close[start:]) * volume[start:]
+        self.cum_pv = float(np.cumsum(pv)[-1])
+        self.cum_v = float(np.cumsum(volume[start:])[-1])
+        return self.cum_pv / self.cum_v
+
+
+class RollingVWAP:
+    def __init__(self, period):
+        """이동 VWAP (rolling_vwap과 동일 결과)"""
+        self.pv = RollingSum(period)
+        self.v = RollingSum(period)
+
+    def update(self, timestamp, high, low, close, volume):
+        tp = (high + low + close) / 3
+        return self.pv.update(tp * volume) / self.v.update(volume)
+
+    def seed(self, timestamps, high, low, close, volume):
+        pv = typical_price(high, low, close) * volume
+        return self.pv.seed(pv) / self.v.seed(volume)
+
+
+class IndicatorEngine:
+    def __init__(self):
+        """
+        봉 단위 증분 지표 엔진
+
+        지표를 이름으로 등록해 두고 새 봉이 들어올 때마다 O(1)로 갱신한다.
+        subscribe()로 등록한 콜백은 갱신 직후 (bar, values)로 호출된다.
+
+        사용 예:
+            engine = IndicatorEngine()
+            engine.add('vwap', VWAP(), inputs=('timestamp', 'high', 'low', 'close', 'volume'))
+            engine.add('volume_ma', SMA(20), inputs=('volume',))
+            engine.seed(df)            # 과거 데이터로 상태 초기화
+            engine.update(bar)         # 새 봉마다 호출
+        """
+        self.indicators = {}  # name -> (indicator, inputs)
+        self.values = {}
+        self.subscribers = []
+
+    def add(self, name, indicator, inputs=('close',)):
+        self.indicators[name] = (indicator, tuple(inputs))
+        return indicator
+
+    def subscribe(self, callback):
+        """갱신 콜백 등록 callback(bar, values)"""
+        self.subscribers.append(callback)
+
+    def seed(self, data):
+        """
+        과거 데이터 배열로 모든 지표 상태 초기화
+
+        :param data: 컬럼 접근이 가능한 객체 (DataFrame 또는 {컬럼: 배열})
+                     'timestamp'는 ms 정수 배열 또는 DataFrame DatetimeIndex
+        """
+        columns = {}
+        for name, (indicator, inputs) in self.indicators.items():
+            args = [columns.setdefault(col, _column(data, col)) for col in inputs]
+            self.values[name] = indicator.seed(*args)
+        return self.values
+
+    def update(self, bar):
+        """
+        새 봉 반영
+
+        :param bar: {'timestamp': ms, 'open', 'high', 'low', 'close', 'volume'} 또는 같은 키의 Series
+        """
+        for name, (indicator, inputs) in self.indicators.items():
+            self.values[name] = indicator.update(*(bar[col] for col in inputs))
+        for callback in self.subscribers:
+            callback(bar, self.values)
+        return self.values
+
+
+def _column(data, col):
+    """DataFrame/딕셔너리에서 컬럼 배열 추출 (timestamp는 ms 정수)"""
+    if col == 'timestamp' and hasattr(data, 'index') and 'timestamp' not in getattr(data, 'columns', ()):
+        return np.asarray(data.index.as_unit('ms').asi8 if data.index.dtype.kind == 'M' else data.index,
+                          dtype=np.int64)
+    values = data[col]
+    if col == 'timestamp' and np.asarray(values).dtype.kind == 'M':
+        return np.asarray(values).astype('datetime64[ms]').astype(np.int64)
+    return np.asarray(values, dtype=np.int64 if col == 'timestamp' else np.float64)
+
+
+if __name__ == "__main__":
+    # 증분 결과와 배치 결과의 비트 단위 일치 확인
+    n = 5000
+    rng = np.random.default_rng(0)
+    ts = 1_700_000_000_000 + np.arange(n, dtype=np.int64) * 60000
+    close = 50000 + np.cumsum(rng.standard_normal(n) * 10)
+    high, low = close + rng.random(n) * 20, close - rng.random(n) * 20
+    volume = rng.random(n) * 100
+
+    batch = {
+        'obv': obv(close, volume),
+        'vwap': vwap(high, low, close, volume),
+        'session_vwap': session_vwap(ts, high, low, close, volume),
+        'rolling_vwap': rolling_vwap(high, low, close, volume, 20),
+        'volume_ma': rolling_mean(volume, 20),
+    }
+    live = {
+        'obv': OBV(), 'vwap': VWAP(), 'session_vwap': VWAP(SESSION_MS),
+        'rolling_vwap': RollingVWAP(20), 'volume_ma': SMA(20),
+    }
+    for name, ind in live.items():
+        out = []
+        for i in range(n):
+            if name == 'obv':
+                out.append(ind.update(close[i], volume[i]))
+            elif name == 'volume_ma':
+                out.append(ind.update(volume[i]))
+            else:
+                out.append(ind.update(ts[i], high[i], low[i], close[i], volume[i]))
+        same = np.array_equal(np.asarray(out), batch[name], equal_nan=True)
+        print(f"{name}: bit-exact={same}")
@@ -1,8 +1,13 @@
 import time
+import threading
 from data_collection import DataCollector
+from market_stream import build_topics
+from order_book import OrderBookManager
 from execution import OrderExecutor
 from risk_management import RiskManager
 from strategy_loader import StrategyLoader
+from engine import TradingEngine
+import asyncio
 from logging import TradingLogger
 import os
 from dotenv import load_dotenv
@@ -15,27 +20,58 @@ def main():
     logger = TradingLogger().get_logger()
     logger.info("Starting cryptocurrency trading system")
     
+    # 다중 심볼: 한 프로세스에서 asyncio 엔진으로 동시 실행
+    if os.getenv('TRADE_SYMBOLS'):
+        engine = TradingEngine(timeframe='5m', limit=100, interval=60)
+        logger.info(f"Loaded strategy: {StrategyLoader.get_strategy_name()}")
+        asyncio.run(engine.run())
+        return
+    
     # 모듈 초기화
     data_collector = DataCollector()
-    order_executor = OrderExecutor()
-    risk_manager = RiskManager(order_executor.exchange)
+    # 로컬 호가창 + 체결 주문 흐름: orderbook/publicTrade 토픽 스트림을 백그라운드 스레드에서 수신
+    # (주문 시 REST 호가 조회 생략, 체결은 수집기의 1m 주문 흐름 봉으로 집계)
+    order_books = OrderBookManager()
+
+    def on_stream_message(message):
+        if message['topic'].startswith('publicTrade.'):
+            data_collector.on_trade_message(message)
+        else:
+            order_books.on_message(message)
+
+    stream = data_collector.create_stream(
+        on_stream_message,
+        topics=build_topics(data_collector.symbol, kline=False),
+        max_retries=None,
+    )
+    order_books.attach(stream)
+    threading.Thread(target=lambda: asyncio.run(stream.run()), name='market-stream', daemon=True).start()
+    order_executor = OrderExecutor(order_books=order_books)
+    # 세 모듈이 같은 거래소 세션 공유, 위험 관리는 수집기의 다중 시간 단위 캐시 사용
+    risk_manager = RiskManager(order_executor.exchange, order_books=order_books,
+                               resampler=data_collector.resampler)
     logger.info("Modules initialized")
     
-    # 전략 로드
+    # 전략 로드 (한 번만 생성하고 이후에는 새로 마감된 봉만 전달)
     strategy_name = StrategyLoader.get_strategy_name()
     logger.info(f"Loaded strategy: {strategy_name}")
+    runner = None
     
     while True:
         try:
-            # 실시간 데이터 수집
+            # 실시간 데이터 수집 (1m 기준 캐시 증분 갱신 후 5m 파생)
             logger.debug("Fetching real-time data...")
-            data = data_collector.fetch_historical_data(timeframe='5m', limit=100)
+            data = data_collector.get_candles(timeframe='5m', limit=100)
             
             if data is not None:
-                # 전략 실행
-                strategy = StrategyLoader.get_strategy(data)
-                signals = strategy.generate_signals()
-                latest_signal = signals.iloc[-1]
+                # 전략 실행 (진행 중인 마지막 봉은 제외)
+                if runner is None:
+                    runner = StrategyLoader.get_runner(data.iloc[:-1])
+                    signals = None
+                else:
+                    signals = runner.feed(data)
+                # 새로 마감된 봉이 없으면 관망
+                latest_signal = signals[runner.primary] if signals else 0
                 
                 # 매매 신호 처리
                 if latest_signal == 1:  # 매수 신호
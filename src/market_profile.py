@@ -0,0 +1,313 @@
+import math
+import string
+from collections import deque
+import numpy as np
+try:
+    from .resampler import MINUTE_MS, DAY_MS, WEEK_MS, TIMEFRAME_MS, bucket_start
+    from .volume_profile import value_area_bounds
+except ImportError:
+    from resampler import MINUTE_MS, DAY_MS, WEEK_MS, TIMEFRAME_MS, bucket_start
+    from volume_profile import value_area_bounds
+
+# TPO 기간별 문자 (52개 이후 반복)
+TPO_LETTERS = string.ascii_uppercase + string.ascii_lowercase
+TPO_PERIOD_MS = 30 * MINUTE_MS
+
+
+def _runs(mask):
+    """True가 연속된 구간의 (시작, 끝) 인덱스 목록 (끝 포함)"""
+    padded = np.zeros(len(mask) + 2, dtype=np.int8)
+    padded[1:-1] = mask
+    edges = np.diff(padded)
+    return list(zip(np.flatnonzero(edges == 1).tolist(), (np.flatnonzero(edges == -1) - 1).tolist()))
+
+
+class SessionProfile:
+    def __init__(self, start, bin_size, period_ms=TPO_PERIOD_MS, ib_periods=2, value_area=0.7, origin=0.0):
+        """
+        세션 하나의 Market Profile (가격 구간별 TPO 개수 + 거래량 히스토그램)
+
+        봉이 들어올 때마다 해당 TPO 기간이 새로 닿은 구간에만 TPO를 더하고, 거래량은
+        봉의 고가~저가 구간에 균등 분배한다. 조회 결과는 다음 갱신까지 캐시한다.
+
+        :param start: 세션 시작 시각 (ms)
+        :param bin_size: 가격 구간 크기
+        :param period_ms: TPO 기간 길이 (ms, 기본 30분)
+        :param ib_periods: Initial Balance를 이루는 TPO 기간 수
+        :param value_area: Value Area 거래량 비율
+        :param origin: 구간 기준 가격
+        """
+        self.start = start
+        self.bin_size = float(bin_size)
+        self.period_ms = period_ms
+        self.ib_periods = ib_periods
+        self.value_area = value_area
+        self.origin = origin
+        self.base = 0  # 히스토그램 0번에 해당하는 구간 번호
+        self.tpo = np.zeros(0, dtype=np.int32)
+        self.volume = np.zeros(0)
+        self.total_volume = 0.0
+        self.periods = []  # [TPO 기간 번호, 최저 구간, 최고 구간]
+        self.high = -np.inf
+        self.low = np.inf
+        self.ib_high = -np.inf
+        self.ib_low = np.inf
+        self.low_bin = self.high_bin = None
+        self._cache = {}
+
+    def _bin(self, price):
+        return int(math.floor((price - self.origin) / self.bin_size))
+
+    def _price(self, b):
+        """구간 하단 가격"""
+        return self.origin + b * self.bin_size
+
+    def _ensure(self, lo, hi):
+        """히스토그램이 [lo, hi] 구간을 담도록 확장"""
+        top = self.base + len(self.tpo) - 1
+        if len(self.tpo) and lo >= self.base and hi <= top:
+            return
+        pad = max(hi - lo + 1, len(self.tpo) // 2, 32)
+        new_base = min(self.base, lo - pad) if len(self.tpo) else lo - pad
+        new_top = max(top, hi + pad) if len(self.tpo) else hi + pad
+        tpo = np.zeros(new_top - new_base + 1, dtype=np.int32)
+        volume = np.zeros(new_top - new_base + 1)
+        offset = self.base - new_base
+        tpo[offset:offset + len(self.tpo)] = self.tpo
+        volume[offset:offset + len(self.volume)] = self.volume
+        self.tpo, self.volume, self.base = tpo, volume, new_base
+
+    def update(self, timestamp, high, low, volume):
+        """봉 하나 반영 (timestamp는 세션 안, 오름차순)"""
+        high, low = float(high), float(low)
+        lo, hi = self._bin(low), self._bin(high)
+        if hi < lo:
+            lo, hi = hi, lo
+        self._ensure(lo, hi)
+        b = self.base
+        self.volume[lo - b:hi - b + 1] += volume / (hi - lo + 1)
+        self.total_volume += volume
+
+        # TPO: 같은 기간에 이미 닿은 구간은 다시 세지 않는다
+        period = int((timestamp - self.start) // self.period_ms)
+        if not self.periods or self.periods[-1][0] != period:
+            self.periods.append([period, lo, hi])
+            self.tpo[lo - b:hi - b + 1] += 1
+        else:
+            current = self.periods[-1]
+            if lo < current[1]:
+                self.tpo[lo - b:current[1] - b] += 1
+                current[1] = lo
+            if hi > current[2]:
+                self.tpo[current[2] - b + 1:hi - b + 1] += 1
+                current[2] = hi
+
+        if period < self.ib_periods:
+            self.ib_high = max(self.ib_high, high)
+            self.ib_low = min(self.ib_low, low)
+        self.high = max(self.high, high)
+        self.low = min(self.low, low)
+        self.low_bin = lo if self.low_bin is None else min(self.low_bin, lo)
+        self.high_bin = hi if self.high_bin is None else max(self.high_bin, hi)
+        self._cache.clear()
+
+    def _range(self):
+        """세션 가격 범위의 (TPO, 거래량) 히스토그램 뷰와 첫 구간 번호"""
+        lo, hi = self.low_bin - self.base, self.high_bin - self.base + 1
+        return self.tpo[lo:hi], self.volume[lo:hi], self.low_bin
+
+    def levels(self):
+        """거래량 기준 (POC, VAH, VAL) 가격 (POC는 구간 중앙, VAH/VAL은 구간 경계)"""
+        cached = self._cache.get('levels')
+        if cached is not None:
+            return cached
+        if self.low_bin is None:
+            return np.nan, np.nan, np.nan
+        _, volume, first = self._range()
+        poc = int(np.argmax(volume))
+        target = self.total_volume * self.value_area * (1 - 1e-9)  # 누적 오차 허용
+        down, up = value_area_bounds(volume, poc, target)
+        levels = (self._price(first + poc + 0.5), self._price(first + up + 1), self._price(first + down))
+        self._cache['levels'] = levels
+        return levels
+
+    def poc(self):
+        return self.levels()[0]
+
+    def initial_balance(self):
+        """(IB 고가, IB 저가) (첫 ib_periods개 TPO 기간의 범위)"""
+        if self.ib_high == -np.inf:
+            return np.nan, np.nan
+        return self.ib_high, self.ib_low
+
+    def poor_high(self, min_tpos=2):
+        """세션 고점 구간에 TPO가 min_tpos개 이상 (꼬리 없이 평평한 고점 = 미완성 경매)"""
+        return self.high_bin is not None and bool(self.tpo[self.high_bin - self.base] >= min_tpos)
+
+    def poor_low(self, min_tpos=2):
+        """세션 저점 구간에 TPO가 min_tpos개 이상"""
+        return self.low_bin is not None and bool(self.tpo[self.low_bin - self.base] >= min_tpos)
+
+    def single_prints(self):
+        """
+        TPO가 하나뿐인 구간이 이어진 영역 [(하단 가격, 상단 가격), ...]
+
+        세션 고점/저점에 붙은 꼬리(excess)는 제외한다.
+        """
+        cached = self._cache.get('single_prints')
+        if cached is not None:
+            return cached
+        zones = []
+        if self.low_bin is not None:
+            tpo, _, first = self._range()
+            for lo, hi in _runs(tpo == 1):
+                if lo > 0 and hi < len(tpo) - 1:
+                    zones.append((self._price(first + lo), self._price(first + hi + 1)))
+        self._cache['single_prints'] = zones
+        return zones
+
+    def volume_nodes(self, hvn_ratio=0.7, lvn_ratio=0.3, smooth=3):
+        """
+        고거래량(HVN)/저거래량(LVN) 영역
+
+        이웃 smooth개 구간 평균 거래량이 최대치의 hvn_ratio 이상이면 HVN, lvn_ratio 이하면 LVN이다.
+        세션 끝에 붙은 LVN은 제외한다.
+
+        :return: {'hvn': [(하단, 상단), ...], 'lvn': [...]}
+        """
+        key = ('nodes', hvn_ratio, lvn_ratio, smooth)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        nodes = {'hvn': [], 'lvn': []}
+        if self.low_bin is not None:
+            _, volume, first = self._range()
+            smoothed = np.convolve(volume, np.ones(smooth) / smooth, mode='same')
+            peak = smoothed.max()
+            if peak > 0:
+                for lo, hi in _runs(smoothed >= hvn_ratio * peak):
+                    nodes['hvn'].append((self._price(first + lo), self._price(first + hi + 1)))
+                for lo, hi in _runs(smoothed <= lvn_ratio * peak):
+                    if lo > 0 and hi < len(volume) - 1:
+                        nodes['lvn'].append((self._price(first + lo), self._price(first + hi + 1)))
+        self._cache[key] = nodes
+        return nodes
+
+    def letters(self):
+        """구간 하단 가격별 TPO 문자열 (출력용, 높은 가격부터)"""
+        rows = {}
+        if self.low_bin is None:
+            return rows
+        for b in range(self.high_bin, self.low_bin - 1, -1):
+            rows[self._price(b)] = ''.join(TPO_LETTERS[period % len(TPO_LETTERS)]
+                                           for period, lo, hi in self.periods if lo <= b <= hi)
+        return rows
+
+
+class MarketProfile:
+    def __init__(self, bin_size, session='1d', period_ms=TPO_PERIOD_MS, ib_periods=2, value_area=0.7,
+                 history=10, origin=0.0):
+        """
+        세션별/주간 Market Profile (봉 단위 증분 갱신)
+
+        진행 중인 세션과 주간 프로파일을 봉마다 갱신하고, 세션이 끝나면 완료 목록으로
+        옮긴다. 주간 프로파일(월요일 00:00 UTC 시작)의 TPO 기간은 하루다.
+
+        사용 예:
+            mp = MarketProfile(bin_size=10)
+            mp.seed(timestamps, high, low, volume)      # 과거 봉
+            mp.update(ts, h, l, v)                      # 새 봉마다
+            mp.previous.poor_high(), mp.previous_week.levels()
+
+        :param bin_size: 가격 구간 크기 (atr_bin_size 결과 등)
+        :param session: 세션 단위 (resampler.TIMEFRAME_MS 키, 기본 UTC 하루)
+        :param history: 보관할 완료 세션 수
+        """
+        self.bin_size = float(bin_size)
+        self.session = session
+        self.period_ms = period_ms
+        self.ib_periods = ib_periods
+        self.value_area = value_area
+        self.origin = origin
+        self.current = None
+        self.sessions = deque(maxlen=history)  # 완료된 세션
+        self.weekly = None
+        self.weeks = deque(maxlen=history)  # 완료된 주간 프로파일
+        self._session_end = self._week_end = None
+
+    def _new(self, start, period_ms, ib_periods):
+        return SessionProfile(start, self.bin_size, period_ms, ib_periods, self.value_area, self.origin)
+
+    def update(self, timestamp, high, low, volume):
+        """
+        봉 하나 반영
+
+        :return: 진행 중인 세션 프로파일
+        """
+        if self.current is None or not self.current.start <= timestamp < self._session_end:
+            if self.current is not None:
+                self.sessions.append(self.current)
+            start = int(bucket_start(timestamp, self.session))
+            self.current = self._new(start, self.period_ms, self.ib_periods)
+            self._session_end = start + TIMEFRAME_MS[self.session]
+        if self.weekly is None or not self.weekly.start <= timestamp < self._week_end:
+            if self.weekly is not None:
+                self.weeks.append(self.weekly)
+            week = int(bucket_start(timestamp, '1w'))
+            self.weekly = self._new(week, DAY_MS, 1)
+            self._week_end = week + WEEK_MS
+        self.current.update(timestamp, high, low, volume)
+        self.weekly.update(timestamp, high, low, volume)
+        return self.current
+
+    def seed(self, timestamps, high, low, volume):
+        """과거 봉 반영 (완료 세션 보관 개수와 이번 주를 채우는 최근 구간만)"""
+        ts = np.asarray(timestamps, dtype=np.int64)
+        if len(ts) == 0:
+            return
+        keep_from = min(int(bucket_start(ts[-1], self.session)) - self.sessions.maxlen * TIMEFRAME_MS[self.session],
+                        int(bucket_start(ts[-1], '1w')) - self.weeks.maxlen * WEEK_MS)
+        start = int(np.searchsorted(ts, keep_from))
+        for t, h, l, v in zip(ts[start:], high[start:], low[start:], volume[start:]):
+            self.update(t, h, l, v)
+
+    @property
+    def previous(self):
+        """직전 완료 세션 (없으면 None)"""
+        return self.sessions[-1] if self.sessions else None
+
+    @property
+    def previous_week(self):
+        """직전 완료 주간 프로파일 (없으면 None)"""
+        return self.weeks[-1] if self.weeks else None
+
+
+if __name__ == "__main__":
+    import time
+
+    # 5분봉 1년치: 봉당 갱신 + 전략 조회 비용
+    n = 365 * 24 * 12
+    rng = np.random.default_rng(0)
+    ts = 1_700_006_400_000 + np.arange(n, dtype=np.int64) * 5 * MINUTE_MS
+    close = 30000 + np.cumsum(rng.standard_normal(n) * 20)
+    high = close + rng.random(n) * 30
+    low = close - rng.random(n) * 30
+    volume = rng.exponential(10, n)
+
+    mp = MarketProfile(bin_size=10)
+    started = time.perf_counter()
+    for i in range(n):
+        session = mp.update(ts[i], high[i], low[i], volume[i])
+        session.levels()
+        session.single_prints()
+        session.volume_nodes()
+    elapsed = time.perf_counter() - started
+    print(f"Updated {n:,} bars: {elapsed / n * 1e6:.1f} us/bar (update + levels + single prints + nodes)")
+
+    prev = mp.previous
+    print(f"Previous session POC/VAH/VAL: {tuple(round(x, 1) for x in prev.levels())}, "
+          f"IB {tuple(round(x, 1) for x in prev.initial_balance())}, "
+          f"poor high={prev.poor_high()}, poor low={prev.poor_low()}, single prints={len(prev.single_prints())}")
+    print(f"Previous week POC/VAH/VAL: {tuple(round(x, 1) for x in mp.previous_week.levels())}")
+    for price, letters in list(prev.letters().items())[:5]:
+        print(f"{price:>10.1f} {letters}")
@@ -0,0 +1,326 @@
+import asyncio
+import json
+import time
+from collections import deque
+import websockets
+try:
+    from .custom_logger import logger  # 패키지 내부에서 임포트
+except ImportError:
+    from custom_logger import logger  # 직접 실행 시 절대 경로 임포트
+
+# Bybit v5 공개 스트림 (USDT 무기한 선물)
+BYBIT_PUBLIC_WS_URL = 'wss://stream.bybit.com/v5/public/linear'
+
+# 구독 요청 1회당 최대 토픽 수 (Bybit 제한)
+MAX_TOPICS_PER_REQUEST = 10
+
+# ccxt 시간 단위 -> Bybit kline interval
+KLINE_INTERVALS = {
+    '1m': '1', '3m': '3', '5m': '5', '15m': '15', '30m': '30',
+    '1h': '60', '2h': '120', '4h': '240', '6h': '360', '12h': '720',
+    '1d': 'D', '1w': 'W', '1M': 'M',
+}
+
+
+def market_id(symbol):
+    """ccxt 심볼을 Bybit 마켓 ID로 변환 (예: 'BTC/USDT:USDT' -> 'BTCUSDT')"""
+    return symbol.split(':')[0].replace('/', '')
+
+
+def build_topics(symbol, timeframe='5m', kline=True, trades=True, orderbook_depth=50):
+    """
+    심볼에 대한 kline/trade/orderbook 구독 토픽 목록 생성
+
+    :param symbol: 거래 심볼 (예: 'BTC/USDT')
+    :param timeframe: kline 시간 단위
+    :param orderbook_depth: 호가창 깊이 (None이면 호가창 구독 안 함)
+    """
+    mid = market_id(symbol)
+    topics = []
+    if kline:
+        topics.append(f"kline.{KLINE_INTERVALS[timeframe]}.{mid}")
+    if trades:
+        topics.append(f"publicTrade.{mid}")
+    if orderbook_depth:
+        topics.append(f"orderbook.{orderbook_depth}.{mid}")
+    return topics
+
+
+class MarketDataStream:
+    def __init__(self, on_message, topics=(), url=BYBIT_PUBLIC_WS_URL,
+                 ping_interval=20, queue_size=10000, max_retries=None):
+        """
+        asyncio 기반 시장 데이터 WebSocket 클라이언트
+
+        수신 루프와 디스패치 루프를 분리하고 그 사이에 크기 제한 큐를 둔다.
+        큐가 가득 차면 수신 루프가 대기하므로 소켓 읽기가 멈추고(backpressure),
+        kline 메시지는 같은 토픽, 같은 봉의 미처리 메시지를 최신 값으로 덮어쓰고(coalesce),
+        마감(confirm)된 봉은 덮어쓰지 않고 다음 봉은 새 슬롯으로 큐에 넣는다.
+        거래/호가 델타는 순서가 중요하므로 버리지 않는다.
+
+        :param on_message: 토픽 메시지 콜백 (일반 함수 또는 코루틴 함수)
+        :param topics: 구독 토픽 목록
+        :param url: WebSocket 엔드포인트
+        :param ping_interval: heartbeat 전송 주기 (초)
+        :param queue_size: 디스패치 큐 최대 크기
+        :param max_retries: 연속 재연결 실패 허용 횟수 (None이면 무제한)
+        """
+        self.on_message = on_message
+        self.topics = list(dict.fromkeys(topics))
+        self.url = url
+        self.ping_interval = ping_interval
+        self.max_retries = max_retries
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.connected = False
+        self.stats = {'received': 0, 'dispatched': 0, 'coalesced': 0, 'reconnects': 0}
+        self.latencies = deque(maxlen=1000)  # 거래소 ts 대비 디스패치 지연 (ms)
+        self._pending_klines = {}  # (topic, 봉 시작 시각) -> 아직 디스패치되지 않은 최신 kline 메시지
+        self._ws = None
+        self._loop = None
+        self._stop = None
+        self._last_recv = 0.0
+
+    async def run(self):
+        """연결 및 자동 재연결 루프 (stop() 호출 또는 재시도 초과 시 종료)"""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        dispatcher = asyncio.create_task(self._dispatch_loop())
+        retry = 0
+        try:
+            while not self._stop.is_set():
+                try:
+                    await self._connect_once()
+                    retry = 0
+                except (OSError, websockets.WebSocketException, asyncio.TimeoutError) as e:
+                    logger.error(f"WebSocket error: {e}. Reconnecting...")
+                    retry += 1
+                if self._stop.is_set():
+                    break
+                if self.max_retries is not None and retry > self.max_retries:
+                    logger.error("WebSocket connection failed after retries")
+                    break
+                self.stats['reconnects'] += 1
+                await self._sleep_or_stop(min(2 ** retry, 30) if retry else 1)
+            # 남은 메시지 처리 후 종료
+            await self.queue.join()
+        finally:
+            dispatcher.cancel()
+            self.connected = False
+
+    async def _connect_once(self):
+        """단일 연결 수명 주기: 연결 -> 재구독 -> 수신/heartbeat"""
+        logger.info(f"Starting WebSocket connection to {self.url}...")
+        async with websockets.connect(self.url, ping_interval=None) as ws:
+            self._ws = ws
+            self.connected = True
+            self._last_recv = time.monotonic()
+            logger.info("WebSocket connected")
+            await self._send_subscribe(ws, self.topics)
+            heartbeat = asyncio.create_task(self._heartbeat(ws))
+            try:
+                async for raw in ws:
+                    self._last_recv = time.monotonic()
+                    await self._handle_raw(raw)
+                    if self._stop.is_set():
+                        break
+            finally:
+                heartbeat.cancel()
+                self.connected = False
+                self._ws = None
+                logger.info("WebSocket disconnected")
+
+    async def _send_subscribe(self, ws, topics, op='subscribe'):
+        """토픽 구독/해지 요청 (요청당 최대 10개씩 분할)"""
+        for i in range(0, len(topics), MAX_TOPICS_PER_REQUEST):
+            args = topics[i:i + MAX_TOPICS_PER_REQUEST]
+            await ws.send(json.dumps({'op': op, 'args': args}))
+        if topics:
+            logger.info(f"WebSocket {op}: {topics}")
+
+    async def _heartbeat(self, ws):
+        """주기적 ping 전송 및 무응답 연결 감지"""
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            if time.monotonic() - self._last_recv > self.ping_interval * 2:
+                logger.warning("WebSocket heartbeat timeout. Closing connection...")
+                await ws.close()
+                return
+            await ws.send(json.dumps({'op': 'ping'}))
+
+    async def _handle_raw(self, raw):
+        """수신 메시지 파싱 및 큐 적재"""
+        message = json.loads(raw)
+        topic = message.get('topic')
+        if topic is None:
+            # 구독 응답/pong 등 제어 메시지
+            if message.get('success') is False:
+                logger.error(f"WebSocket request failed: {message}")
+            return
+
+        self.stats['received'] += 1
+        if topic.startswith('kline.'):
+            data = message.get('data') or [{}]
+            key = (topic, data[0].get('start'))
+            pending = self._pending_klines.get(key)
+            if pending is None:
+                self._pending_klines[key] = message
+                await self.queue.put(key)
+            elif not (pending.get('data') or [{}])[-1].get('confirm'):
+                # 같은 봉의 아직 처리되지 않은 kline은 최신 값으로 교체 (마감된 봉은 교체하지 않음)
+                self._pending_klines[key] = message
+                self.stats['coalesced'] += 1
+            else:
+                await self.queue.put(message)
+        else:
+            await self.queue.put(message)
+
+    async def _dispatch_loop(self):
+        """큐에서 메시지를 꺼내 on_message 콜백 호출"""
+        while True:
+            item = await self.queue.get()
+            try:
+                message = self._pending_klines.pop(item) if isinstance(item, tuple) else item
+                result = self.on_message(message)
+                if asyncio.iscoroutine(result):
+                    await result
+                self.stats['dispatched'] += 1
+                if 'ts' in message:
+                    self.latencies.append(time.time() * 1000 - message['ts'])
+            except Exception as e:
+                logger.error(f"on_message callback error: {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+
+    async def _sleep_or_stop(self, seconds):
+        """재연결 대기 (stop 요청 시 즉시 반환)"""
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def subscribe(self, topics):
+        """토픽 추가 구독 (재연결 시 자동 재구독)"""
+        new = [t for t in topics if t not in self.topics]
+        self.topics.extend(new)
+        if self._ws is not None and new:
+            await self._send_subscribe(self._ws, new)
+
+    async def unsubscribe(self, topics):
+        """토픽 구독 해지"""
+        self.topics = [t for t in self.topics if t not in topics]
+        if self._ws is not None:
+            await self._send_subscribe(self._ws, list(topics), op='unsubscribe')
+
+    def stop(self):
+        """스트림 종료 요청 (다른 스레드에서 호출 가능)"""
+        if self._loop is None or self._stop is None:
+            return
+
+        def _stop():
+            self._stop.set()
+            if self._ws is not None:
+                asyncio.ensure_future(self._ws.close())
+
+        self._loop.call_soon_threadsafe(_stop)
+
+
+class LocalStreamServer:
+    def __init__(self, host='127.0.0.1', port=0):
+        """
+        오프라인 테스트용 Bybit 호환 WebSocket 서버
+
+        subscribe/unsubscribe/ping 요청에 Bybit와 같은 형식으로 응답하고,
+        publish()로 구독 중인 클라이언트에 토픽 메시지를 전송한다.
+        """
+        self.host = host
+        self.port = port
+        self.clients = {}  # websocket -> 구독 토픽 집합
+        self._server = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = list(self._server.sockets)[0].getsockname()[1]
+        logger.info(f"Local stream server listening on {self.url}")
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handler(self, ws, *args):
+        self.clients[ws] = set()
+        try:
+            async for raw in ws:
+                request = json.loads(raw)
+                op = request.get('op')
+                if op == 'ping':
+                    await ws.send(json.dumps({'success': True, 'ret_msg': 'pong', 'op': 'ping'}))
+                elif op in ('subscribe', 'unsubscribe'):
+                    topics = set(request.get('args', []))
+                    if op == 'subscribe':
+                        self.clients[ws] |= topics
+                    else:
+                        self.clients[ws] -= topics
+                    await ws.send(json.dumps({'success': True, 'ret_msg': '', 'op': op}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients.pop(ws, None)
+
+    async def publish(self, topic, data, msg_type='snapshot', ts=None):
+        """구독 중인 클라이언트에 토픽 메시지 전송"""
+        message = json.dumps({
+            'topic': topic,
+            'type': msg_type,
+            'ts': int(time.time() * 1000) if ts is None else ts,
+            'data': data,
+        })
+        for ws, topics in list(self.clients.items()):
+            if topic in topics:
+                try:
+                    await ws.send(message)
+                except websockets.ConnectionClosed:
+                    pass
+
+    async def drop_connections(self):
+        """모든 클라이언트 연결 강제 종료 (재연결 테스트용)"""
+        for ws in list(self.clients):
+            await ws.close()
+
+    def subscribers(self, topic):
+        """토픽 구독 클라이언트 수"""
+        return sum(1 for topics in self.clients.values() if topic in topics)
+
+
+if __name__ == "__main__":
+    # 로컬 서버로 스트림 동작 확인 (오프라인)
+    async def _demo():
+        server = await LocalStreamServer().start()
+        received = []
+        stream = MarketDataStream(received.append, build_topics('BTC/USDT'), url=server.url)
+        task = asyncio.create_task(stream.run())
+
+        while server.subscribers('kline.5.BTCUSDT') == 0:
+            await asyncio.sleep(0.01)
+        await server.publish('publicTrade.BTCUSDT', [{'T': 0, 'S': 'Buy', 'v': '0.1', 'p': '50000'}])
+
+        # 강제 단절 후 자동 재구독 확인
+        await server.drop_connections()
+        while server.subscribers('kline.5.BTCUSDT') == 0:
+            await asyncio.sleep(0.01)
+        await server.publish('kline.5.BTCUSDT', [{'start': 0, 'close': '50100', 'confirm': False}])
+
+        while len(received) < 2:
+            await asyncio.sleep(0.01)
+        stream.stop()
+        await task
+        await server.stop()
+        print(f"Received {len(received)} messages, stats: {stream.stats}")
+
+    asyncio.run(_demo())
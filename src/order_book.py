@@ -0,0 +1,263 @@
+import time
+import asyncio
+import threading
+from bisect import bisect_left, insort
+try:
+    from .custom_logger import logger  # 패키지 내부에서 임포트
+    from .market_stream import market_id
+except ImportError:
+    from custom_logger import logger  # 직접 실행 시 절대 경로 임포트
+    from market_stream import market_id
+
+
+class L2OrderBook:
+    def __init__(self, symbol, max_age=5.0):
+        """
+        스냅샷 + 증분 업데이트로 유지하는 로컬 L2 호가창
+
+        가격 목록을 정렬 상태로 유지하므로 최우선 호가 조회는 O(1)이다.
+
+        :param symbol: 마켓 ID (예: 'BTCUSDT')
+        :param max_age: 마지막 업데이트 후 유효 시간 (초)
+        """
+        self.symbol = symbol
+        self.max_age = max_age
+        self.bids = {}  # 가격 -> 수량
+        self.asks = {}
+        self._bid_prices = []  # 오름차순 (최우선 매수호가 = 마지막)
+        self._ask_prices = []  # 오름차순 (최우선 매도호가 = 처음)
+        self.update_id = None
+        self.synced = False
+        self.updated_at = 0.0
+        self.lock = threading.RLock()  # 스트림 스레드 갱신과 주문 스레드 조회 보호
+
+    def apply_snapshot(self, bids, asks, update_id=None):
+        """스냅샷으로 호가창 전체 교체"""
+        with self.lock:
+            self.bids = {float(p): float(s) for p, s in bids if float(s) > 0}
+            self.asks = {float(p): float(s) for p, s in asks if float(s) > 0}
+            self._bid_prices = sorted(self.bids)
+            self._ask_prices = sorted(self.asks)
+            self.update_id = update_id
+            self.synced = True
+            self.updated_at = time.time()
+
+    def apply_delta(self, bids, asks, update_id=None):
+        """
+        증분 업데이트 반영 (수량 0은 해당 가격 삭제)
+
+        :return: 순서가 맞으면 True, 업데이트 누락(시퀀스 공백)이면 False
+        """
+        with self.lock:
+            if not self.synced:
+                return False
+            if update_id is not None and self.update_id is not None:
+                if update_id <= self.update_id:
+                    return True  # 스냅샷 이전의 오래된 업데이트
+                if update_id != self.update_id + 1:
+                    logger.warning(f"Order book gap on {self.symbol}: {self.update_id} -> {update_id}")
+                    self.synced = False
+                    return False
+            self._apply_side(self.bids, self._bid_prices, bids)
+            self._apply_side(self.asks, self._ask_prices, asks)
+            self.update_id = update_id
+            self.updated_at = time.time()
+            return True
+
+    @staticmethod
+    def _apply_side(levels, prices, updates):
+        for p, s in updates:
+            price, size = float(p), float(s)
+            if size > 0:
+                if price not in levels:
+                    insort(prices, price)
+                levels[price] = size
+            elif price in levels:
+                del levels[price]
+                del prices[bisect_left(prices, price)]
+
+    @property
+    def best_bid(self):
+        return self._bid_prices[-1] if self._bid_prices else None
+
+    @property
+    def best_ask(self):
+        return self._ask_prices[0] if self._ask_prices else None
+
+    @property
+    def mid_price(self):
+        if not self._bid_prices or not self._ask_prices:
+            return None
+        return (self._bid_prices[-1] + self._ask_prices[0]) / 2
+
+    def is_fresh(self):
+        """동기화 상태이며 최근에 갱신되었는지 여부"""
+        return self.synced and time.time() - self.updated_at <= self.max_age
+
+    def estimate_fill(self, side, amount):
+        """
+        시장가 주문의 호가 깊이 가중 체결가 추정
+
+        :param side: 'buy' (매도호가 소진) 또는 'sell' (매수호가 소진)
+        :param amount: 주문 수량
+        :return: (평균 체결가, 최우선 호가 대비 슬리피지 %, 체결 가능 수량)
+        """
+        with self.lock:
+            if side == 'buy':
+                prices, levels = self._ask_prices, self.asks
+                order = range(len(prices))
+            else:
+                prices, levels = self._bid_prices, self.bids
+                order = range(len(prices) - 1, -1, -1)
+            if not prices or amount <= 0:
+                return None, None, 0.0
+
+            remaining, cost = amount, 0.0
+            for i in order:
+                price = prices[i]
+                take = min(remaining, levels[price])
+                cost += take * price
+                remaining -= take
+                if remaining <= 0:
+                    break
+            filled = amount - max(remaining, 0.0)
+            avg_price = cost / filled
+            best = prices[0] if side == 'buy' else prices[-1]
+            slippage = abs(avg_price - best) / best * 100
+            return avg_price, slippage, filled
+
+
+class OrderBookManager:
+    def __init__(self, resync=None, max_age=5.0, stream=None):
+        """
+        심볼별 로컬 호가창 관리 (WebSocket orderbook 토픽 소비)
+
+        시퀀스 공백이 생기면 호가창은 새 스냅샷을 받을 때까지 동기화 해제 상태로 남고
+        (get_fresh는 None), 재동기화는 이벤트 루프를 막지 않도록 비동기로 예약한다.
+        스트림이 연결되어 있으면 토픽을 재구독해 서버 스냅샷을 다시 받고, 없으면 REST
+        스냅샷을 스레드 풀에서 받아 스냅샷의 update id(nonce)부터 시퀀스 검사를 이어간다.
+
+        :param resync: REST 스냅샷 함수 symbol -> ccxt order book (예: exchange.fetch_order_book)
+        :param max_age: 호가창 유효 시간 (초)
+        :param stream: MarketDataStream (attach()로 나중에 연결 가능)
+        """
+        self.resync_fn = resync
+        self.max_age = max_age
+        self.stream = stream
+        self.books = {}
+        self._resyncing = set()  # 재동기화 진행 중인 마켓 ID
+        self._tasks = set()
+
+    def attach(self, stream):
+        """공백 시 재구독할 스트림 연결"""
+        self.stream = stream
+
+    def get(self, symbol):
+        """심볼 호가창 반환 (ccxt 심볼 또는 마켓 ID)"""
+        mid = market_id(symbol)
+        book = self.books.get(mid)
+        if book is None:
+            book = self.books[mid] = L2OrderBook(mid, self.max_age)
+        return book
+
+    def get_fresh(self, symbol):
+        """유효한 호가창만 반환 (없으면 None)"""
+        book = self.books.get(market_id(symbol))
+        return book if book is not None and book.is_fresh() else None
+
+    def on_message(self, message):
+        """Bybit v5 orderbook.{depth}.{symbol} 메시지 반영"""
+        data = message['data']
+        book = self.get(data['s'])
+        update_id = data.get('u')
+        # u == 1은 서버 재시작에 따른 스냅샷
+        if message.get('type') == 'snapshot' or update_id == 1:
+            book.apply_snapshot(data.get('b', []), data.get('a', []), update_id)
+            self._resyncing.discard(book.symbol)
+        elif not book.apply_delta(data.get('b', []), data.get('a', []), update_id):
+            self.resync(book.symbol, message.get('topic'))
+
+    def resync(self, symbol, topic=None):
+        """
+        호가창 재동기화 예약 (이미 진행 중이면 무시)
+
+        :param topic: 공백이 생긴 orderbook 토픽 (스트림 재구독용)
+        :return: 예약한 asyncio Task (실행 중인 루프가 없으면 REST 스냅샷을 바로 반영하고 None)
+        """
+        mid = market_id(symbol)
+        if mid in self._resyncing:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None:
+            if self.resync_fn is not None:
+                self._apply_rest_snapshot(mid, self.resync_fn(symbol))
+            return None
+        if self.stream is not None and topic is not None:
+            coro = self._resubscribe(mid, topic)
+        elif self.resync_fn is not None:
+            coro = self._fetch_snapshot(mid, symbol, loop)
+        else:
+            return None  # 다음 서버 스냅샷 대기
+        self._resyncing.add(mid)
+        task = loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _resubscribe(self, mid, topic):
+        """토픽 재구독 (Bybit는 구독 직후 스냅샷을 보냄)"""
+        try:
+            await self.stream.unsubscribe([topic])
+            await self.stream.subscribe([topic])
+            logger.info(f"Order book resubscribed: {topic}")
+        except Exception as e:
+            self._resyncing.discard(mid)
+            logger.error(f"Order book resubscribe failed for {topic}: {e}")
+
+    async def _fetch_snapshot(self, mid, symbol, loop):
+        """REST 스냅샷을 스레드 풀에서 조회해 반영"""
+        try:
+            snapshot = await loop.run_in_executor(None, self.resync_fn, symbol)
+            self._apply_rest_snapshot(mid, snapshot)
+        except Exception as e:
+            logger.error(f"Order book resync failed for {symbol}: {e}")
+        finally:
+            self._resyncing.discard(mid)
+
+    def _apply_rest_snapshot(self, mid, snapshot):
+        """
+        REST 스냅샷 반영 (update id가 없으면 시퀀스를 이어갈 수 없으므로 반영하지 않음)
+
+        :return: 반영 여부
+        """
+        update_id = snapshot.get('nonce')
+        if update_id is None:
+            update_id = (snapshot.get('info') or {}).get('u')
+        if update_id is None:
+            logger.warning(f"Order book snapshot for {mid} has no update id; waiting for stream snapshot")
+            return False
+        self.get(mid).apply_snapshot(snapshot['bids'], snapshot['asks'], int(update_id))
+        logger.info(f"Order book resynced: {mid} at update {update_id}")
+        return True
+
+
+if __name__ == "__main__":
+    manager = OrderBookManager()
+    manager.on_message({'type': 'snapshot', 'data': {
+        's': 'BTCUSDT', 'u': 100,
+        'b': [['49990', '1.0'], ['49980', '2.0']],
+        'a': [['50010', '0.5'], ['50020', '3.0']],
+    }})
+    manager.on_message({'type': 'delta', 'data': {
+        's': 'BTCUSDT', 'u': 101, 'b': [['49995', '0.2']], 'a': [['50010', '0']],
+    }})
+    book = manager.get('BTC/USDT')
+    print(f"Best bid/ask: {book.best_bid}/{book.best_ask}")
+    print(f"Buy 2.0 estimate: {book.estimate_fill('buy', 2.0)}")
+
+    # 시퀀스 공백 -> 동기화 해제
+    manager.on_message({'type': 'delta', 'data': {'s': 'BTCUSDT', 'u': 105, 'b': [], 'a': []}})
+    print(f"Synced after gap: {book.synced}")
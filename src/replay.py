@@ -0,0 +1,510 @@
+import os
+import time
+import asyncio
+import argparse
+import itertools
+import ccxt
+import numpy as np
+try:
+    from .exchange_pool import exchange_pool
+    from .data_collection import DataCollector, BASE_HISTORY_MINUTES
+    from .execution import OrderExecutor
+    from .risk_management import RiskManager
+    from .strategy_loader import StrategyLoader
+    from .order_book import OrderBookManager
+    from .market_stream import LocalStreamServer, build_topics, market_id
+    from .history_store import HistoryStore, to_millis
+    from .resampler import MINUTE_MS
+except ImportError:
+    from exchange_pool import exchange_pool
+    from data_collection import DataCollector, BASE_HISTORY_MINUTES
+    from execution import OrderExecutor
+    from risk_management import RiskManager
+    from strategy_loader import StrategyLoader
+    from order_book import OrderBookManager
+    from market_stream import LocalStreamServer, build_topics, market_id
+    from history_store import HistoryStore, to_millis
+    from resampler import MINUTE_MS
+
+# 지연 측정 구간
+STAGES = ('fetch', 'strategy', 'risk', 'order', 'signal_to_order', 'bar_to_order', 'cycle', 'stream')
+
+# 히스토그램 버킷 상한 (ms, 로그 간격)
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class ReplayClock:
+    def __init__(self, start_ms, speed=1.0):
+        """
+        재생 시각 (ms)
+
+        :param start_ms: 재생 시작 시각
+        :param speed: 실제 시간 대비 배속 (None이면 advance()로만 진행, 대기 없이 최대 속도)
+        """
+        self.start_ms = int(start_ms)
+        self.speed = speed
+        self._offset_ms = 0
+        self._started = time.monotonic()
+
+    def now(self):
+        if self.speed is None:
+            return self.start_ms + self._offset_ms
+        return self.start_ms + int((time.monotonic() - self._started) * 1000 * self.speed)
+
+    def advance(self, ms):
+        """최대 속도 모드에서 재생 시각을 ms로 이동"""
+        self._offset_ms = max(self._offset_ms, int(ms) - self.start_ms)
+
+    def wall_time(self, ms):
+        """재생 시각 ms에 해당하는 time.monotonic() 값"""
+        if self.speed is None:
+            return time.monotonic()
+        return self._started + (ms - self.start_ms) / 1000 / self.speed
+
+    async def sleep_until(self, ms):
+        if self.speed is None:
+            self.advance(ms)
+            return
+        delay = self.wall_time(ms) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class LatencyHistogram:
+    def __init__(self, bounds_ms=LATENCY_BUCKETS_MS):
+        """구간 지연 히스토그램 (초 단위 기록, ms 단위 보고, 백분위는 전체 표본 기준)"""
+        self.bounds_ms = np.asarray(bounds_ms, dtype=float)
+        self.counts = np.zeros(len(self.bounds_ms) + 1, dtype=np.int64)
+        self.samples = []
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        self.samples.append(ms)
+        self.counts[np.searchsorted(self.bounds_ms, ms)] += 1
+
+    def extend_ms(self, values):
+        for ms in values:
+            self.record(ms / 1000)
+
+    def summary(self):
+        report = {'count': len(self.samples)}
+        if self.samples:
+            ms = np.asarray(self.samples)
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            report.update({
+                'mean_ms': round(float(ms.mean()), 3),
+                'p50_ms': round(float(p50), 3),
+                'p95_ms': round(float(p95), 3),
+                'p99_ms': round(float(p99), 3),
+                'max_ms': round(float(ms.max()), 3),
+            })
+        return report
+
+    def buckets(self):
+        """[(버킷 라벨, 표본 수), ...] (예: '<=5ms', '>5000ms')"""
+        labels = [f"<={b:g}ms" for b in self.bounds_ms] + [f">{self.bounds_ms[-1]:g}ms"]
+        return list(zip(labels, self.counts.tolist()))
+
+
+def synthetic_book(price, depth=50, spread=0.0001, step=0.0001, size=1.0):
+    """현재가 기준 합성 호가 ([[가격, 수량], ...] 매수/매도, 깊어질수록 수량 증가)"""
+    levels = np.arange(depth)
+    bids = price * (1 - spread / 2 - levels * step)
+    asks = price * (1 + spread / 2 + levels * step)
+    sizes = size * (1 + levels)
+    return ([[float(p), float(s)] for p, s in zip(bids, sizes)],
+            [[float(p), float(s)] for p, s in zip(asks, sizes)])
+
+
+class MockExchange:
+    id = 'bybit'
+
+    def __init__(self, candles, clock, symbol='BTC/USDT', balance=10000.0, fee=0.055, books=None,
+                 latency=0.0):
+        """
+        기록된 데이터로 응답하는 ccxt 호환 모의 거래소 (DataCollector/OrderExecutor/RiskManager가 쓰는 메서드만)
+
+        재생 시각 기준으로 마감된 1m 캔들과 방금 열린 진행 중 캔들(시가만)을 돌려주므로
+        미래 데이터가 섞이지 않는다. 시장가 주문은 호가(기록이 없으면 합성 호가)로 즉시 체결한다.
+
+        :param candles: 1m (N, 6) 배열 (timestamp 오름차순)
+        :param clock: ReplayClock
+        :param balance: 초기 USDT 잔고
+        :param fee: 체결 수수료 (%)
+        :param books: 기록된 호가 [(timestamp, bids, asks), ...] (None이면 현재가 기준 합성 호가)
+        :param latency: REST 호출마다 추가할 모의 네트워크 지연 (초)
+        """
+        self.candles = np.asarray(candles, dtype=np.float64)
+        self.timestamps = self.candles[:, 0].astype(np.int64)
+        self.clock = clock
+        self.symbol = symbol
+        self.cash = float(balance)
+        self.fee = fee / 100
+        self.books = books
+        self._book_ts = np.array([b[0] for b in books], dtype=np.int64) if books else None
+        self.latency = latency
+        self.position = 0.0
+        self.entry_price = 0.0
+        self.orders = []
+        self.calls = {}
+        self.options = {'defaultType': 'future'}
+        self.markets = {}
+        self._ids = itertools.count(1)
+
+    def _request(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def milliseconds(self):
+        return self.clock.now()
+
+    def load_markets(self, reload=False):
+        return self.markets
+
+    def _current(self):
+        """재생 시각에 진행 중인 1m 캔들 인덱스 (기록 범위 밖이면 마지막 캔들)"""
+        i = int(np.searchsorted(self.timestamps, self.clock.now(), side='right')) - 1
+        return min(max(i, 0), len(self.candles) - 1)
+
+    def last_price(self):
+        """진행 중인 캔들 시가 (= 직전 마감 캔들 종가 근사)"""
+        return float(self.candles[self._current(), 1])
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        self._request('fetch_ohlcv')
+        if timeframe != '1m':
+            raise ccxt.NotSupported(f"Replay exchange serves 1m candles only (got {timeframe})")
+        current = self._current()
+        start = 0 if since is None else int(np.searchsorted(self.timestamps, since))
+        stop = current + 1 if limit is None else min(current + 1, start + limit)
+        rows = self.candles[start:stop].tolist()
+        if rows and stop == current + 1:
+            ts, open_ = rows[-1][0], rows[-1][1]
+            rows[-1] = [ts, open_, open_, open_, open_, 0.0]  # 방금 열린 봉 (시가만)
+        return rows
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        self._request('fetch_order_book')
+        bids, asks = self.order_book()
+        return {'symbol': symbol, 'bids': bids[:limit], 'asks': asks[:limit], 'timestamp': self.clock.now()}
+
+    def order_book(self):
+        """재생 시각의 ([[가격, 수량]] 매수, 매도) 호가"""
+        if self._book_ts is not None:
+            i = int(np.searchsorted(self._book_ts, self.clock.now(), side='right')) - 1
+            if i >= 0:
+                _, bids, asks = self.books[i]
+                return bids, asks
+        return synthetic_book(self.last_price())
+
+    def fetch_balance(self, params=None):
+        self._request('fetch_balance')
+        used = self.position * self.entry_price
+        usdt = {'free': self.cash, 'used': used, 'total': self.cash + used}
+        return {'USDT': usdt, 'free': {'USDT': usdt['free']}, 'used': {'USDT': used},
+                'total': {'USDT': usdt['total']}}
+
+    def fetch_positions(self, symbols=None, params=None):
+        self._request('fetch_positions')
+        if self.position <= 0:
+            return []
+        return [{'symbol': self.symbol, 'side': 'long', 'contracts': self.position,
+                 'entryPrice': self.entry_price, 'markPrice': self.last_price()}]
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        self._request('fetch_open_orders')
+        return []
+
+    def fetch_order(self, id, symbol=None, params=None):
+        self._request('fetch_order')
+        for order in self.orders:
+            if order['id'] == id:
+                return order
+        raise ccxt.OrderNotFound(id)
+
+    def _fill_price(self, side, amount):
+        bids, asks = self.order_book()
+        levels = asks if side == 'buy' else bids
+        remaining, cost = amount, 0.0
+        for price, size in levels:
+            take = min(remaining, size)
+            cost += take * price
+            remaining -= take
+            if remaining <= 0:
+                break
+        if remaining > 0:  # 호가 부족분은 마지막 가격으로
+            cost += remaining * levels[-1][0]
+        return cost / amount
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        received = time.monotonic()
+        self._request('create_order')
+        params = params or {}
+        if amount is None or amount <= 0:
+            raise ccxt.InvalidOrder(f"Invalid amount {amount}")
+        reduce_only = params.get('reduceOnly', False)
+        if side == 'sell' and (not reduce_only or amount > self.position + 1e-12):
+            raise ccxt.InvalidOrder("Replay exchange supports long positions only")
+        fill = self._fill_price(side, amount)
+        if type == 'limit' and price is not None:
+            if (side == 'buy' and fill > price) or (side == 'sell' and fill < price):
+                raise ccxt.InvalidOrder(f"Limit {price} not marketable (fill {fill:.2f})")
+        notional = amount * fill
+        fee = notional * self.fee
+        if side == 'buy':
+            if notional + fee > self.cash:
+                raise ccxt.InsufficientFunds(f"Need {notional + fee:.2f} USDT, have {self.cash:.2f}")
+            self.entry_price = (self.entry_price * self.position + notional) / (self.position + amount)
+            self.position += amount
+            self.cash -= notional + fee
+        else:
+            self.position -= amount
+            self.cash += self.entry_price * amount + (fill - self.entry_price) * amount - fee
+            if self.position <= 1e-12:
+                self.position, self.entry_price = 0.0, 0.0
+        order = {
+            'id': str(next(self._ids)), 'symbol': symbol, 'type': type, 'side': side,
+            'amount': amount, 'filled': amount, 'remaining': 0.0, 'average': fill, 'price': fill,
+            'cost': notional, 'fee': {'cost': fee, 'currency': 'USDT'}, 'status': 'closed',
+            'timestamp': self.clock.now(), 'received': received, 'reduceOnly': reduce_only,
+        }
+        self.orders.append(order)
+        return order
+
+    def equity(self):
+        return self.cash + self.position * self.last_price()
+
+
+class ReplaySimulator:
+    def __init__(self, candles, symbol='BTC/USDT', start=None, speed=100.0, timeframe='5m', limit=100,
+                 strategies=None, trades=None, books=None, balance=10000.0, fee=0.055, latency=0.0,
+                 stream=True):
+        """
+        기록된 데이터로 src/main.py 실행 경로를 오프라인 재생
+
+        DataCollector -> StrategyLoader(StrategyRunner) -> RiskManager -> OrderExecutor를
+        수정 없이 그대로 만들어 main.py 루프와 같은 순서로 호출한다. 거래소는
+        exchange_pool.set_exchange로 등록한 MockExchange(REST)이고, 스트림은
+        LocalStreamServer(WebSocket)가 kline/publicTrade/orderbook을 재생 시각에 맞춰 보낸다
+        (수신한 호가는 RiskManager/OrderExecutor의 로컬 호가창으로 사용).
+        main.py의 60초 주기 조회는 재생 시각 1분마다 실행되므로 speed=100이면 0.6초마다,
+        speed=None이면 대기 없이 연속으로 실행된다.
+
+        main.py와 다른 점:
+            - 스트림은 orderbook 외에 kline/publicTrade도 구독한다 (스트림 지연 측정용, 전략 입력은 아님)
+            - 주기 오류를 잡아 기록하고 계속하는 대신 예외가 그대로 run() 밖으로 전달된다
+
+        사용 예:
+            sim = ReplaySimulator(candles, speed=100)
+            report = asyncio.run(sim.run(minutes=600))
+            report['latency']['signal_to_order']
+
+        :param candles: 1m (N, 6) 배열 (시작 전 BASE_HISTORY_MINUTES분 이상 포함)
+        :param start: 재생 시작 시각 (None이면 첫 캔들 + BASE_HISTORY_MINUTES)
+        :param speed: 배속 (None이면 최대 속도)
+        :param timeframe: 전략 시간 단위 (main.py와 같은 5m)
+        :param limit: 전략에 넘겨줄 캔들 개수
+        :param strategies: 전략 이름 목록 (None일 경우 환경변수)
+        :param trades: 기록된 체결 (N, 4) 배열 (tick_aggregator.TRADE_COLUMNS, publicTrade로 재생)
+        :param books: 기록된 호가 [(timestamp, bids, asks), ...] (None이면 합성 호가)
+        :param latency: 모의 REST 지연 (초)
+        :param stream: False면 WebSocket 재생 생략 (REST만)
+        """
+        self.candles = np.asarray(candles, dtype=np.float64)
+        self.symbol = symbol
+        first = int(self.candles[0, 0])
+        self.start = to_millis(start) if start is not None else first + BASE_HISTORY_MINUTES * MINUTE_MS
+        self.speed = speed
+        self.timeframe = timeframe
+        self.limit = limit
+        self.strategies = strategies
+        self.trades = trades
+        self.stream_enabled = stream
+        self.clock = ReplayClock(self.start, speed)
+        self.exchange = MockExchange(self.candles, self.clock, symbol, balance, fee, books, latency)
+        self.latency = {stage: LatencyHistogram() for stage in STAGES}
+        self.signals = {1: 0, -1: 0}
+        self.late_cycles = 0
+
+    def _timed(self, stage, func, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.latency[stage].record(time.monotonic() - started)
+
+    def _cycle(self, bar_close_wall):
+        """main.py 루프 한 번 (조회 -> 전략 -> 위험 관리 -> 주문)"""
+        started = time.monotonic()
+        data = self._timed('fetch', self.collector.get_candles, timeframe=self.timeframe, limit=self.limit)
+        if data is not None:
+            if self.runner is None:
+                self.runner = self._timed('strategy', StrategyLoader.get_runner, data.iloc[:-1], self.strategies)
+                signals = None
+            else:
+                signals = self._timed('strategy', self.runner.feed, data)
+            signal = signals[self.runner.primary] if signals else 0
+            signal_at = time.monotonic()
+            orders_before = len(self.exchange.orders)
+
+            if signal == 1:
+                size = self._timed('risk', self.risk_manager.calculate_position_size,
+                                   entry_price=data['close'].iloc[-1])
+                self._timed('order', self.order_executor.place_market_order, 'buy', size)
+            elif signal == -1:
+                self._timed('order', self.order_executor.close_all_positions)
+            if signal:
+                self.signals[signal] += 1
+
+            if len(self.exchange.orders) > orders_before:
+                received = self.exchange.orders[orders_before]['received']
+                self.latency['signal_to_order'].record(received - signal_at)
+                self.latency['bar_to_order'].record(received - bar_close_wall)
+        self.latency['cycle'].record(time.monotonic() - started)
+
+    async def _publish(self, server, minute):
+        """재생 시각 minute에 마감된 1m 캔들/그 사이 체결/호가 스냅샷 전송"""
+        mid = market_id(self.symbol)
+        i = int(np.searchsorted(self.exchange.timestamps, minute - MINUTE_MS))
+        if i < len(self.candles) and self.exchange.timestamps[i] == minute - MINUTE_MS:
+            ts, o, h, low, c, v = self.candles[i]
+            await server.publish(f"kline.1.{mid}", [{
+                'start': int(ts), 'end': int(ts) + MINUTE_MS - 1, 'interval': '1', 'open': str(o),
+                'high': str(h), 'low': str(low), 'close': str(c), 'volume': str(v), 'confirm': True,
+                'timestamp': minute}])
+        if self.trades is not None:
+            lo, hi = np.searchsorted(self.trades[:, 0], [minute - MINUTE_MS, minute])
+            if hi > lo:
+                await server.publish(f"publicTrade.{mid}", [
+                    {'T': int(t), 'p': str(p), 'v': str(s), 'S': 'Buy' if side > 0 else 'Sell', 's': mid}
+                    for t, p, s, side in self.trades[lo:hi]])
+        bids, asks = self.exchange.order_book()
+        self._book_id += 1
+        await server.publish(f"orderbook.50.{mid}", {'s': mid, 'b': bids, 'a': asks, 'u': self._book_id})
+
+    def _on_message(self, message):
+        if message['topic'].startswith('orderbook.'):
+            self.order_books.on_message(message)
+
+    async def run(self, minutes=None):
+        """
+        재생 실행
+
+        :param minutes: 재생할 분 수 (None이면 기록 끝까지)
+        :return: {'latency': 구간별 요약, 'histograms': 구간별 버킷, 'orders', 'signals', 'equity', ...}
+        """
+        last = int(self.exchange.timestamps[-1]) + MINUTE_MS
+        end = last if minutes is None else min(last, self.start + minutes * MINUTE_MS)
+
+        # main.py와 같은 모듈 구성 (거래소 세션 공유, 위험 관리는 수집기의 리샘플러 사용)
+        exchange_pool.set_exchange(self.exchange)
+        self.order_books = OrderBookManager()
+        self.collector = DataCollector(symbol=self.symbol)
+        self.order_executor = OrderExecutor(order_books=self.order_books, symbol=self.symbol)
+        self.risk_manager = RiskManager(self.order_executor.exchange, self.symbol, order_books=self.order_books,
+                                        resampler=self.collector.resampler)
+        self.runner = None
+        self._book_id = 0
+
+        loop = asyncio.get_running_loop()
+        server = stream = stream_task = None
+        if self.stream_enabled:
+            server = await LocalStreamServer().start()
+            stream = self.collector.create_stream(self._on_message, build_topics(self.symbol, '1m'), url=server.url)
+            self.order_books.attach(stream)
+            stream_task = asyncio.create_task(stream.run())
+            book_topic = f"orderbook.50.{market_id(self.symbol)}"
+            while server.subscribers(book_topic) == 0:
+                await asyncio.sleep(0.01)
+
+        self.clock = self.exchange.clock = ReplayClock(self.start, self.speed)
+        wall_started = time.monotonic()
+        cycles = 0
+        try:
+            minute = self.start
+            while minute < end:
+                await self.clock.sleep_until(minute)
+                bar_close_wall = self.clock.wall_time(minute)
+                if server is not None:
+                    await self._publish(server, minute)
+                await loop.run_in_executor(None, self._cycle, bar_close_wall)
+                cycles += 1
+                if self.speed is not None and self.clock.now() > minute + MINUTE_MS:
+                    self.late_cycles += 1  # 다음 주기 시각을 넘김 (배속이 처리량보다 빠름)
+                minute += MINUTE_MS
+        finally:
+            if stream is not None:
+                stream.stop()
+                await stream_task
+                self.latency['stream'].extend_ms(stream.latencies)
+                await server.stop()
+        wall = time.monotonic() - wall_started
+
+        return {
+            'latency': {stage: hist.summary() for stage, hist in self.latency.items()},
+            'histograms': {stage: hist.buckets() for stage, hist in self.latency.items()},
+            'cycles': cycles,
+            'late_cycles': self.late_cycles,
+            'signals': {'buy': self.signals[1], 'sell': self.signals[-1]},
+            'orders': len(self.exchange.orders),
+            'equity': self.exchange.equity(),
+            'rest_calls': dict(self.exchange.calls),
+            'wall_seconds': wall,
+            'speedup': cycles * 60 / wall if wall > 0 else float('inf'),
+        }
+
+
+def synthetic_candles(minutes, start='2024-01-01', seed=0):
+    """합성 1분봉 (N, 6) 배열"""
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.standard_normal(minutes) * 0.001))
+    open_ = np.r_[close[0], close[:-1]]
+    return np.column_stack([
+        to_millis(start) + np.arange(minutes, dtype=np.float64) * MINUTE_MS,
+        open_,
+        np.maximum(open_, close) * (1 + rng.random(minutes) * 0.002),
+        np.minimum(open_, close) * (1 - rng.random(minutes) * 0.002),
+        close,
+        rng.exponential(10, minutes),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='기록된 캔들로 실거래 경로 재생 (모의 거래소)')
+    parser.add_argument('--symbol', default=os.getenv('TRADE_SYMBOL', 'BTC/USDT'))
+    parser.add_argument('--store', default=None, help='캔들 저장소 경로 (없으면 합성 데이터)')
+    parser.add_argument('--start', default=None, help='재생 시작 일시 (저장소 사용 시 필수)')
+    parser.add_argument('--minutes', type=int, default=600, help='재생할 분 수')
+    parser.add_argument('--speed', type=float, default=100.0, help='배속 (0이면 대기 없이 최대 속도)')
+    parser.add_argument('--latency', type=float, default=0.0, help='모의 REST 지연 (초)')
+    parser.add_argument('--no-stream', action='store_true', help='WebSocket 재생 생략')
+    args = parser.parse_args()
+
+    if args.store:
+        if args.start is None:
+            parser.error('--start is required with --store')
+        start = to_millis(args.start)
+        arrays = HistoryStore(args.store).read_arrays(args.symbol, '1m', start - BASE_HISTORY_MINUTES * MINUTE_MS,
+                                                      start + args.minutes * MINUTE_MS)
+        candles = np.column_stack([arrays[col] for col in ('timestamp', 'open', 'high', 'low', 'close', 'volume')])
+    else:
+        start = None
+        candles = synthetic_candles(BASE_HISTORY_MINUTES + args.minutes)
+    if not len(candles):
+        parser.error(f"No 1m candles for {args.symbol} in {args.store}")
+
+    sim = ReplaySimulator(candles.astype(np.float64), args.symbol, start, speed=args.speed or None,
+                          latency=args.latency, stream=not args.no_stream)
+    report = asyncio.run(sim.run(args.minutes))
+    print(f"{report['cycles']} cycles in {report['wall_seconds']:.1f}s ({report['speedup']:.0f}x real time), "
+          f"late cycles: {report['late_cycles']}")
+    print(f"Signals: {report['signals']}, orders: {report['orders']}, equity: {report['equity']:.2f}")
+    print(f"REST calls: {report['rest_calls']}")
+    for stage in STAGES:
+        print(f"{stage:>16}: {report['latency'][stage]}")
+    print("cycle histogram:", [(label, n) for label, n in report['histograms']['cycle'] if n])
+
+
+if __name__ == "__main__":
+    main()
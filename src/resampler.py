@@ -0,0 +1,317 @@
+import numpy as np
+try:
+    from .ingest import OHLCV_COLUMNS, ohlcv_to_array, to_frame
+except ImportError:
+    from ingest import OHLCV_COLUMNS, ohlcv_to_array, to_frame
+
+MINUTE_MS = 60_000
+DAY_MS = 24 * 60 * MINUTE_MS
+WEEK_MS = 7 * DAY_MS
+# 1970-01-01은 목요일 -> 주봉은 월요일 00:00 UTC 기준 (Bybit/ccxt '1w'와 동일)
+WEEK_OFFSET_MS = 4 * DAY_MS
+
+# 1m 기준에서 파생하는 시간 단위
+TIMEFRAME_MS = {
+    '1m': MINUTE_MS,
+    '5m': 5 * MINUTE_MS,
+    '15m': 15 * MINUTE_MS,
+    '1h': 60 * MINUTE_MS,
+    '4h': 240 * MINUTE_MS,
+    '1d': DAY_MS,
+    '1w': WEEK_MS,
+}
+DERIVED_TIMEFRAMES = ('5m', '15m', '1h', '4h', '1d', '1w')
+
+# update()에서 이 개수 이상의 마감 캔들은 벡터화 집계로 한 번에 반영
+BATCH_MIN = 64
+
+
+def bucket_start(timestamps, timeframe):
+    """봉 시작 시각 (ms, 주봉은 월요일 기준)"""
+    size = TIMEFRAME_MS[timeframe]
+    offset = WEEK_OFFSET_MS if timeframe == '1w' else 0
+    ts = np.asarray(timestamps, dtype=np.int64)
+    return (ts - offset) // size * size + offset
+
+
+def resample_ohlcv(arr, timeframe):
+    """
+    (N, 6) OHLCV 배열을 상위 시간 단위로 집계 (캔들이 없는 구간의 봉은 생성하지 않음)
+
+    :param arr: timestamp 오름차순 (N, 6) 배열
+    :return: (M, 6) 배열 (마지막 봉은 미완성일 수 있음)
+    """
+    arr = ohlcv_to_array(arr)
+    if len(arr) == 0:
+        return np.empty((0, len(OHLCV_COLUMNS)))
+    buckets = bucket_start(arr[:, 0], timeframe)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(arr)] - 1
+    out = np.empty((len(starts), len(OHLCV_COLUMNS)))
+    out[:, 0] = buckets[starts]
+    out[:, 1] = arr[starts, 1]
+    out[:, 2] = np.maximum.reduceat(arr[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(arr[:, 3], starts)
+    out[:, 4] = arr[ends, 4]
+    # bincount는 앞에서부터 순차 누적하므로 증분 집계(CandleResampler)와 결과가 같다
+    ids = np.cumsum(np.r_[True, buckets[1:] != buckets[:-1]]) - 1
+    out[:, 5] = np.bincount(ids, weights=arr[:, 5], minlength=len(starts))
+    return out
+
+
+def _merge(bar, candle):
+    """집계 중인 봉(bar)에 다음 캔들 반영 (bar를 제자리에서 갱신)"""
+    bar[2] = max(bar[2], candle[2])
+    bar[3] = min(bar[3], candle[3])
+    bar[4] = candle[4]
+    bar[5] = bar[5] + candle[5]
+
+
+class _BarBuffer:
+    def __init__(self, max_bars):
+        """완성 봉 버퍼 (용량 2배 확장, max_bars 초과분은 압축 시 제거)"""
+        self.max_bars = max_bars
+        self.data = np.empty((max(64, min(max_bars, 1024)), len(OHLCV_COLUMNS)))
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    def append(self, rows):
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+        if self.end + len(rows) > len(self.data):
+            keep = np.concatenate([self.view(), rows])[-self.max_bars:]
+            self.data = np.empty((max(2 * len(keep), 64), len(OHLCV_COLUMNS)))
+            self.data[:len(keep)] = keep
+            self.start, self.end = 0, len(keep)
+            return
+        self.data[self.end:self.end + len(rows)] = rows
+        self.end += len(rows)
+        self.start = max(self.start, self.end - self.max_bars)
+
+    def view(self):
+        return self.data[self.start:self.end]
+
+
+class CandleResampler:
+    def __init__(self, timeframes=DERIVED_TIMEFRAMES, max_bars=5000, base_max_bars=10_080):
+        """
+        1m 기준 시계열에서 상위 시간 단위 봉을 증분 파생하는 캐시
+
+        1m 캔들이 마감될 때마다 시간 단위별 집계 중인 봉에 O(1)로 반영하고,
+        봉 경계를 넘으면 완성 봉으로 옮긴다. 진행 중인 1m 캔들은 조회 시에만
+        집계 중인 봉과 합쳐 미완성 봉으로 돌려주므로, 모든 시간 단위가 같은
+        1m 데이터에서 나와 서로 일관된다.
+
+        :param timeframes: 파생할 시간 단위 (TIMEFRAME_MS 키)
+        :param max_bars: 시간 단위별 보관할 완성 봉 개수
+        :param base_max_bars: 보관할 1m 완성 캔들 개수 (파생 봉은 1m 보관 기간과 무관하게 유지)
+        """
+        unknown = set(timeframes) - set(TIMEFRAME_MS)
+        if unknown:
+            raise ValueError(f"Unsupported timeframes: {sorted(unknown)}")
+        self.timeframes = tuple(tf for tf in timeframes if tf != '1m')
+        self.base = _BarBuffer(base_max_bars)
+        self.closed = {tf: _BarBuffer(max_bars) for tf in self.timeframes}
+        self.pending = {tf: None for tf in self.timeframes}  # 집계 중인 봉 (마감된 1m만 반영)
+        self.partial = None  # 진행 중인 1m 캔들
+        self.last_closed = None  # 마지막으로 반영한 1m 캔들 timestamp
+        self.version = 0  # 갱신 횟수 (조회 결과 캐시 무효화용)
+        self._cache = {}
+
+    def seed(self, candles):
+        """
+        마감된 1m 캔들 배열로 상태 초기화 (벡터화 집계)
+
+        :param candles: (N, 6) 배열 또는 DataFrame 변환 전 ccxt OHLCV 리스트
+        """
+        arr = ohlcv_to_array(candles)
+        if len(arr) == 0:
+            return
+        self.base = _BarBuffer(self.base.max_bars)
+        self.base.append(arr[-self.base.max_bars:])
+        for tf in self.timeframes:
+            bars = resample_ohlcv(arr, tf)
+            self.closed[tf] = _BarBuffer(self.closed[tf].max_bars)
+            self.closed[tf].append(bars[:-1])
+            self.pending[tf] = bars[-1].copy()
+        self.partial = None
+        self.last_closed = arr[-1, 0]
+        self._touch()
+
+    def close_candle(self, candle):
+        """마감된 1m 캔들 하나 반영 (이미 반영한 시각 이전의 캔들은 무시)"""
+        candle = np.asarray(candle, dtype=np.float64)
+        if self.last_closed is not None and candle[0] <= self.last_closed:
+            return False
+        self.base.append(candle)
+        self.last_closed = candle[0]
+        for tf in self.timeframes:
+            start = int(bucket_start(candle[0], tf))
+            bar = self.pending[tf]
+            if bar is not None and bar[0] == start:
+                _merge(bar, candle)
+                continue
+            if bar is not None:
+                self.closed[tf].append(bar)
+            bar = candle.copy()
+            bar[0] = start
+            self.pending[tf] = bar
+        if self.partial is not None and self.partial[0] <= candle[0]:
+            self.partial = None
+        self._touch()
+        return True
+
+    def update(self, candles, last_partial=True):
+        """
+        최근 1m 캔들 묶음 반영 (fetch_ohlcv 결과 그대로)
+
+        :param candles: timestamp 오름차순 (N, 6) 배열
+        :param last_partial: 마지막 캔들이 진행 중인 봉이면 True
+        :return: 새로 마감된 1m 캔들 수
+        """
+        arr = ohlcv_to_array(candles)
+        if len(arr) == 0:
+            return 0
+        closed = arr[:-1] if last_partial else arr
+        if self.last_closed is not None:
+            closed = closed[closed[:, 0] > self.last_closed]
+        if len(closed) >= BATCH_MIN:
+            self._close_batch(closed)
+        else:
+            for candle in closed:
+                self.close_candle(candle)
+        if last_partial and (self.last_closed is None or arr[-1, 0] > self.last_closed):
+            self.partial = arr[-1].copy()
+            self._touch()
+        return len(closed)
+
+    def _close_batch(self, closed):
+        """
+        마감된 1m 캔들 여러 개를 벡터화 집계로 반영 (close_candle 반복과 같은 결과)
+
+        :param closed: last_closed 이후 timestamp 오름차순 (N, 6) 배열
+        """
+        self.base.append(closed)
+        self.last_closed = closed[-1, 0]
+        for tf in self.timeframes:
+            bars = resample_ohlcv(closed, tf)
+            bar = self.pending[tf]
+            if bar is not None and bar[0] == bars[0, 0]:
+                # 집계 중인 봉에 이어지는 첫 구간: 거래량은 close_candle과 같은 순서로 누적
+                first = bucket_start(closed[:, 0], tf) == bar[0]
+                bar[2] = max(bar[2], bars[0, 2])
+                bar[3] = min(bar[3], bars[0, 3])
+                bar[4] = bars[0, 4]
+                bar[5] = np.cumsum(np.r_[bar[5], closed[first, 5]])[-1]
+                bars = bars[1:]
+            if len(bars):
+                if bar is not None:
+                    self.closed[tf].append(bar)
+                self.closed[tf].append(bars[:-1])
+                self.pending[tf] = bars[-1].copy()
+        if self.partial is not None and self.partial[0] <= self.last_closed:
+            self.partial = None
+        self._touch()
+
+    def _touch(self):
+        self.version += 1
+        self._cache.clear()
+
+    def get(self, timeframe, limit=None, include_partial=True):
+        """
+        시간 단위 봉 배열 (네트워크 호출 없음)
+
+        :param timeframe: '1m' 또는 파생 시간 단위
+        :param limit: 최근 봉 개수 (None이면 전체)
+        :param include_partial: 마지막 미완성 봉 포함 여부
+        :return: (N, 6) 배열 (읽기 전용, 다음 갱신까지 캐시됨)
+        """
+        key = (timeframe, include_partial)
+        bars = self._cache.get(key)
+        if bars is None:
+            bars = self._build(timeframe, include_partial)
+            bars.setflags(write=False)
+            self._cache[key] = bars
+        return bars if limit is None else bars[-limit:]
+
+    def _build(self, timeframe, include_partial):
+        if timeframe == '1m':
+            closed, tail = self.base.view(), self.partial
+        elif timeframe in self.closed:
+            closed, tail = self.closed[timeframe].view(), self.pending[timeframe]
+            if self.partial is not None:
+                start = int(bucket_start(self.partial[0], timeframe))
+                if tail is not None and tail[0] == start:
+                    tail = tail.copy()
+                    _merge(tail, self.partial)
+                else:
+                    # 진행 중인 1m 캔들이 다음 구간이면 집계 중인 봉은 이미 완성
+                    if tail is not None:
+                        closed = np.concatenate([closed, tail[None]])
+                    tail = self.partial.copy()
+                    tail[0] = start
+        else:
+            raise ValueError(f"Timeframe not cached: {timeframe}")
+        if include_partial and tail is not None:
+            return np.concatenate([closed, tail[None]])
+        return closed.copy()
+
+    def frame(self, timeframe, limit=None, include_partial=True):
+        """get() 결과를 timestamp 인덱스 DataFrame으로"""
+        return to_frame(self.get(timeframe, limit, include_partial))
+
+
+class MultiTimeframeCache:
+    def __init__(self, **resampler_kwargs):
+        """심볼별 CandleResampler 모음"""
+        self.resampler_kwargs = resampler_kwargs
+        self.resamplers = {}
+
+    def __getitem__(self, symbol):
+        resampler = self.resamplers.get(symbol)
+        if resampler is None:
+            resampler = self.resamplers[symbol] = CandleResampler(**self.resampler_kwargs)
+        return resampler
+
+    def update(self, symbol, candles, last_partial=True):
+        return self[symbol].update(candles, last_partial)
+
+    def get(self, symbol, timeframe, limit=None, include_partial=True):
+        return self[symbol].get(timeframe, limit, include_partial)
+
+
+if __name__ == "__main__":
+    import time
+
+    # 1m 캔들 30일치: 일괄 집계와 증분 집계 결과 비교
+    n = 30 * 24 * 60
+    rng = np.random.default_rng(0)
+    ts = 1_700_000_000_000 // MINUTE_MS * MINUTE_MS + np.arange(n, dtype=np.int64) * MINUTE_MS
+    close = 30000 + np.cumsum(rng.standard_normal(n) * 5)
+    base = np.column_stack([ts, close, close + rng.random(n) * 10, close - rng.random(n) * 10,
+                            close, rng.random(n) * 10])
+
+    resampler = CandleResampler()
+    resampler.seed(base[:n // 2])
+    started = time.perf_counter()
+    for i in range(n // 2, n, 5):
+        # 5개씩 조회, 마지막은 진행 중인 캔들
+        resampler.update(base[i - 1:i + 5])
+        resampler.get('5m', 100)
+    elapsed = time.perf_counter() - started
+    print(f"Incremental: {n // 2 / elapsed:,.0f} 1m candles/s across {len(resampler.timeframes)} timeframes")
+    for tf in DERIVED_TIMEFRAMES:
+        bars = resampler.get(tf)
+        same = np.array_equal(bars, resample_ohlcv(base, tf)[-len(bars):])
+        print(f"{tf}: {len(resampler.get(tf))} bars, matches batch={same}")
+
+    # 페이지(1000개) 단위 최초 적재: 벡터화 경로 결과 비교
+    paged = CandleResampler()
+    started = time.perf_counter()
+    for i in range(0, n, 1000):
+        paged.update(base[i:i + 1001], last_partial=i + 1001 <= n)
+    elapsed = time.perf_counter() - started
+    same = all(np.array_equal(paged.get(tf), resampler.get(tf)) for tf in DERIVED_TIMEFRAMES)
+    print(f"Paged load: {n / elapsed:,.0f} 1m candles/s, matches incremental={same}")
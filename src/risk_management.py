@@ -1,19 +1,27 @@
 import os
 import numpy as np
 from dotenv import load_dotenv
+try:
+    from .exchange_pool import get_exchange
+except ImportError:
+    from exchange_pool import get_exchange
 
 # 환경 변수 로드
 load_dotenv(os.path.join(os.path.dirname(__file__), '../config/.env'))
 
 class RiskManager:
-    def __init__(self, exchange, symbol=None):
+    def __init__(self, exchange=None, symbol=None, order_books=None, resampler=None):
         """
         위험 관리 클래스
         
-        :param exchange: ccxt 거래소 객체
+        :param exchange: ccxt 거래소 객체 (None일 경우 공용 세션 사용)
         :param symbol: 거래 심볼 (예: 'BTC/USDT')
+        :param order_books: 로컬 호가창 (OrderBookManager, 예상 체결가 반영용)
+        :param resampler: 다중 시간 단위 캔들 캐시 (CandleResampler, 있으면 REST 조회 생략)
         """
-        self.exchange = exchange
+        self.exchange = exchange or get_exchange()
+        self.order_books = order_books
+        self.resampler = resampler
         self.symbol = symbol or os.getenv('TRADE_SYMBOL', 'BTC/USDT')
         self.stop_loss_percent = float(os.getenv('STOP_LOSS_PERCENT', 2)) / 100
         self.take_profit_percent = float(os.getenv('TAKE_PROFIT_PERCENT', 5)) / 100
@@ -43,11 +51,24 @@ class RiskManager:
             risk_per_contract = abs(entry_price - stop_loss_price)
             position_size = risk_amount / risk_per_contract
             
+            # 호가 깊이 기준 예상 체결가로 한 번 더 보정 (슬리피지만큼 위험 증가)
+            fill_price = self.expected_fill_price('buy', position_size)
+            if fill_price is not None and abs(fill_price - stop_loss_price) > risk_per_contract:
+                position_size = risk_amount / abs(fill_price - stop_loss_price)
+            
             return round(position_size, 4)  # 소수점 4자리까지
         except Exception as e:
             print(f"Error calculating position size: {e}")
             return None
             
+    def expected_fill_price(self, side, amount):
+        """로컬 호가창 기준 예상 평균 체결가 (호가창이 없으면 None)"""
+        book = self.order_books.get_fresh(self.symbol) if self.order_books else None
+        if book is None:
+            return None
+        avg_price, _, _ = book.estimate_fill(side, amount)
+        return avg_price
+            
     def dynamic_stop_loss(self, current_price, atr_period=14, multiplier=2.0):
         """
         동적 손절 가격 계산 (ATR 기반)
@@ -58,11 +79,13 @@ class RiskManager:
         :return: 손절 가격
         """
         try:
-            # 과거 데이터 가져오기
-            ohlcv = self.exchange.fetch_ohlcv(self.symbol, '1h', limit=atr_period+1)
-            closes = np.array([x[4] for x in ohlcv])
-            highs = np.array([x[2] for x in ohlcv])
-            lows = np.array([x[3] for x in ohlcv])
+            # 과거 데이터 가져오기 (캔들 캐시에 충분하면 네트워크 호출 없음)
+            ohlcv = self.resampler.get('1h', atr_period+1) if self.resampler is not None else ()
+            if len(ohlcv) < atr_period + 1:
+                ohlcv = np.asarray(self.exchange.fetch_ohlcv(self.symbol, '1h', limit=atr_period+1), dtype=np.float64)
+            closes = ohlcv[:, 4]
+            highs = ohlcv[:, 2]
+            lows = ohlcv[:, 3]
             
             # ATR 계산
             atr = self.calculate_atr(highs, lows, closes, atr_period)
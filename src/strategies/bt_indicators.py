@@ -0,0 +1,167 @@
+import backtrader as bt
+import numpy as np
+try:
+    from ..indicators import obv, vwap, session_vwap, volume_delta
+except ImportError:
+    from indicators import obv, vwap, session_vwap, volume_delta
+
+# Backtrader 거래량 지표
+#
+# next()는 봉 단위(실시간/runonce=False), once()는 전체 배열을 numpy로 한 번에 계산한다.
+# 두 경로 모두 같은 순서로 순차 덧셈(np.cumsum)을 하므로 결과가 비트 단위로 같다.
+
+
+def _values(line, end):
+    """라인 버퍼를 복사 없이 numpy 배열로 (once() 전용, 쓰기 가능한 뷰)"""
+    return np.frombuffer(line.array, dtype=np.float64)[:end]
+
+
+def _continue_cumsum(prev, values):
+    """prev에 values를 순차 누적 (next()의 line[-1] + value와 같은 순서)"""
+    return np.cumsum(np.r_[prev, values])[1:]
+
+
+class OnBalanceVolume(bt.Indicator):
+    lines = ('obv',)
+
+    def __init__(self):
+        self.addminperiod(1)
+
+    def next(self):
+        if len(self.data) > 1:
+            if self.data.close[0] > self.data.close[-1]:
+                self.lines.obv[0] = self.lines.obv[-1] + self.data.volume[0]
+            elif self.data.close[0] < self.data.close[-1]:
+                self.lines.obv[0] = self.lines.obv[-1] - self.data.volume[0]
+            else:
+                self.lines.obv[0] = self.lines.obv[-1]
+        else:
+            self.lines.obv[0] = self.data.volume[0]
+
+    def once(self, start, end):
+        close, volume = _values(self.data.close, end), _values(self.data.volume, end)
+        out = _values(self.lines.obv, end)
+        if start == 0:
+            out[:] = obv(close, volume)
+        else:
+            flow = np.sign(np.diff(close[start - 1:])) * volume[start:]
+            out[start:] = _continue_cumsum(out[start - 1], flow)
+
+
+class CumulativeVolumeDelta(bt.Indicator):
+    """
+    누적 거래량 델타 (CVD)
+
+    데이터에 'delta' 라인(체결 집계 매수-매도 거래량)이 있으면 그대로 누적하고,
+    없으면 봉의 종가 위치로 추정한 델타(volume_delta)를 누적한다.
+    """
+    lines = ('cvd',)
+
+    def __init__(self):
+        self.addminperiod(1)
+        self.has_delta = 'delta' in self.data.getlinealiases()
+
+    def _delta(self):
+        if self.has_delta:
+            return self.data.delta[0]
+        h, l, c, v = self.data.high[0], self.data.low[0], self.data.close[0], self.data.volume[0]
+        rng = h - l
+        return v * ((c - l) - (h - c)) / rng if rng > 0 else 0.0
+
+    def next(self):
+        if len(self) > 1:
+            self.lines.cvd[0] = self.lines.cvd[-1] + self._delta()
+        else:
+            self.lines.cvd[0] = self._delta()
+
+    def once(self, start, end):
+        if self.has_delta:
+            delta = _values(self.data.delta, end)[start:]
+        else:
+            delta = volume_delta(*(_values(line, end)[start:] for line in
+                                   (self.data.high, self.data.low, self.data.close, self.data.volume)))
+        out = _values(self.lines.cvd, end)
+        out[start:] = np.cumsum(delta) if start == 0 else _continue_cumsum(out[start - 1], delta)
+
+
+class VolumeWeightedAveragePrice(bt.Indicator):
+    """
+    VWAP (daily=True이면 UTC 날짜가 바뀔 때마다 누적 초기화)
+
+    src/indicators.py의 vwap / session_vwap과 같은 결과
+    """
+    lines = ('vwap',)
+    params = (('daily', False),)
+    plotinfo = dict(subplot=False)
+
+    def __init__(self):
+        self.addminperiod(1)
+        self.session = None
+        self.cum_pv = 0.0
+        self.cum_v = 0.0
+
+    def next(self):
+        if self.p.daily:
+            session = int(self.data.datetime[0])
+            if session != self.session:
+                self.session = session
+                self.cum_pv = 0.0
+                self.cum_v = 0.0
+        tp = (self.data.high[0] + self.data.low[0] + self.data.close[0]) / 3
+        self.cum_pv = self.cum_pv + tp * self.data.volume[0]
+        self.cum_v = self.cum_v + self.data.volume[0]
+        self.lines.vwap[0] = self.cum_pv / self.cum_v
+
+    def once(self, start, end):
+        high, low, close, volume = (_values(line, end) for line in
+                                    (self.data.high, self.data.low, self.data.close, self.data.volume))
+        out = _values(self.lines.vwap, end)
+        if self.p.daily:
+            days = _values(self.data.datetime, end).astype(np.int64)
+            if start > 0:
+                # 진행 중인 세션은 처음부터 다시 누적 (세션 시작 이전 값은 그대로)
+                start = int(np.searchsorted(days, days[start]))
+            out[start:] = session_vwap(days[start:], high[start:], low[start:], close[start:],
+                                       volume[start:], session_ms=1)
+        elif start == 0:
+            out[:] = vwap(high, low, close, volume)
+        else:
+            # 누적합을 처음부터 다시 계산해 next()와 같은 덧셈 순서 유지
+            out[start:] = vwap(high, low, close, volume)[start:]
+
+
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+
+    # runonce(once) 결과와 봉 단위(next) 결과의 비트 단위 일치 확인
+    n = 50_000
+    rng = np.random.default_rng(0)
+    close = 50000 + np.cumsum(rng.standard_normal(n) * 10)
+    df = pd.DataFrame({
+        'open': close, 'high': close + rng.random(n) * 20, 'low': close - rng.random(n) * 20,
+        'close': close, 'volume': rng.random(n) * 100,
+    }, index=pd.date_range('2023-01-01', periods=n, freq='5min'))
+
+    class Probe(bt.Strategy):
+        def __init__(self):
+            self.ind = {
+                'obv': OnBalanceVolume(self.data),
+                'cvd': CumulativeVolumeDelta(self.data),
+                'vwap': VolumeWeightedAveragePrice(self.data),
+                'daily_vwap': VolumeWeightedAveragePrice(self.data, daily=True),
+            }
+            self.sma = bt.indicators.SMA(self.ind['obv'], period=21)
+
+    results = {}
+    for runonce in (True, False):
+        cerebro = bt.Cerebro(runonce=runonce, stdstats=False)
+        cerebro.adddata(bt.feeds.PandasData(dataname=df))
+        cerebro.addstrategy(Probe)
+        started = time.perf_counter()
+        strat = cerebro.run()[0]
+        elapsed = time.perf_counter() - started
+        results[runonce] = {name: np.asarray(ind.lines[0].array) for name, ind in strat.ind.items()}
+        print(f"runonce={runonce}: {elapsed:.2f}s")
+    for name in results[True]:
+        print(f"{name}: bit-exact={np.array_equal(results[True][name], results[False][name])}")
@@ -1,8 +1,25 @@
+from collections import deque
 import numpy as np
 import pandas as pd
 from jesse.strategies import Strategy
 from jesse.services import logger
 from jesse.indicators import rsi, sma
+try:
+    from ..indicators import OBV, obv, volume_delta
+    from ..divergence import DivergenceDetector, REGULAR_BULLISH
+    from ..market_profile import MarketProfile
+    from ..volume_profile import atr_bin_size
+except ImportError:
+    from indicators import OBV, obv, volume_delta
+    from divergence import DivergenceDetector, REGULAR_BULLISH
+    from market_profile import MarketProfile
+    from volume_profile import atr_bin_size
+
+# Jesse 캔들 컬럼: timestamp, open, close, high, low, volume (+ append_flow_columns의 cvd 등)
+CLOSE, HIGH, LOW, VOLUME, CVD = 2, 3, 4, 5, 6
+
+# obv 속성이 보관하는 최근 OBV 개수 (추세 판단 이평 기간 이상)
+OBV_HISTORY = 100
 
 class IntegratedVolumeStrategy(Strategy):
     def __init__(self):
@@ -11,6 +28,62 @@ class IntegratedVolumeStrategy(Strategy):
         self.scalping_enabled = True
         self.swing_enabled = True
         self.risk_reward_ratio = 2.0
+        
+        # 다이버전스 검출기 (before()에서 봉마다 증분 갱신)
+        self.obv_divergence = DivergenceDetector()
+        self.cvd_divergence = DivergenceDetector()
+        self.divergences = {'obv': set(), 'cvd': set()}  # 이번 봉에서 확정된 다이버전스 종류
+        self._obv_live = OBV()
+        self._obv_history = deque(maxlen=OBV_HISTORY)  # 봉마다 누적 갱신한 최근 OBV
+        self._divergence_ts = None
+
+        # 세션/주간 Market Profile (before()에서 봉마다 증분 갱신)
+        self.market_profile = None
+        self._profile_ts = None
+
+    def before(self):
+        self._update_divergences()
+        self._update_market_profile()
+
+    def _update_market_profile(self):
+        """마지막 봉으로 Market Profile 갱신 (최초 호출 시 ATR 기준 구간 크기로 생성 후 과거 봉 반영)"""
+        candles = self.candles
+        if self._profile_ts is not None and candles[-1, 0] == self._profile_ts:
+            return
+        if self.market_profile is None:
+            past = candles[:-1]
+            bin_size = atr_bin_size(candles[:, HIGH], candles[:, LOW], candles[:, CLOSE])
+            self.market_profile = MarketProfile(bin_size)
+            self.market_profile.seed(past[:, 0], past[:, HIGH], past[:, LOW], past[:, VOLUME])
+        last = candles[-1]
+        self.market_profile.update(last[0], last[HIGH], last[LOW], last[VOLUME])
+        self._profile_ts = last[0]
+
+    def _crossed_above(self, level) -> bool:
+        """직전 봉 종가가 level 이하이고 현재 종가가 level 초과"""
+        return self.candles[-2, CLOSE] <= level < self.close
+
+    def _update_divergences(self):
+        """마지막 봉으로 OBV/CVD 다이버전스 검출기 갱신 (최초 호출 시 과거 봉으로 초기화)"""
+        candles = self.candles
+        if self._divergence_ts is not None and candles[-1, 0] == self._divergence_ts:
+            return
+        cvd = self.cvd
+        if self._divergence_ts is None:
+            past = candles[:-1]
+            past_obv = obv(past[:, CLOSE], past[:, VOLUME])
+            self._obv_live.seed(past[:, CLOSE], past[:, VOLUME])
+            self._obv_history.extend(past_obv[-OBV_HISTORY:])
+            self.obv_divergence.seed(past[:, HIGH], past[:, LOW], past_obv)
+            self.cvd_divergence.seed(past[:, HIGH], past[:, LOW], cvd[:-1])
+        last = candles[-1]
+        obv_value = self._obv_live.update(last[CLOSE], last[VOLUME])
+        self._obv_history.append(obv_value)
+        self.divergences = {
+            'obv': {d['kind'] for d in self.obv_divergence.update(last[HIGH], last[LOW], obv_value)},
+            'cvd': {d['kind'] for d in self.cvd_divergence.update(last[HIGH], last[LOW], cvd[-1])},
+        }
+        self._divergence_ts = last[0]
 
     def should_long(self) -> bool:
         # 통합 스캘핑 전략 조건
@@ -60,10 +133,12 @@ class IntegratedVolumeStrategy(Strategy):
         near_poc = self._is_near_poc(resistance=True)
         
         # 2. CVD 급격한 상승 (1분기준 20% 이상 증가)
-        cvd_spike = self.cvd > self.cvd.shift(1) * 1.2
+        cvd = self.cvd
+        cvd_spike = cvd[-1] > cvd[-2] * 1.2
         
         # 3. OBV 상승 추세 (단기 이평 > 장기 이평)
-        obv_trend = self.obv > sma(self.obv, 5) > sma(self.obv, 20)
+        obv_values = self.obv
+        obv_trend = obv_values[-1] > sma(obv_values, 5) > sma(obv_values, 20)
         
         # 4. Market Profile Poor High/Single Prints 돌파
         mp_breakout = self._mp_poor_high_breakout()
@@ -109,7 +184,9 @@ class IntegratedVolumeStrategy(Strategy):
     # --------------------- 보조 함수 ---------------------
     def _is_near_poc(self, resistance: bool = True, threshold: float = 0.005) -> bool:
         """Volume Profile POC 근접 여부"""
-        current_poc = self.volume_profile.get_poc()
+        current_poc = self.volume_profile.poc()
+        if not np.isfinite(current_poc):
+            return False
         price_diff = abs(self.close - current_poc) / current_poc
         if resistance:
             return self.close > current_poc and price_diff < threshold
@@ -118,28 +195,42 @@ class IntegratedVolumeStrategy(Strategy):
 
     def _mp_poor_high_breakout(self) -> bool:
         """Market Profile Poor High/Single Prints 돌파"""
-        # 구현 생략 (Market Profile 라이브러리 통합 필요)
-        return True
+        # 직전 세션의 Poor High 또는 이번 세션 Single Prints 상단을 이번 봉에서 상향 돌파
+        self._update_market_profile()
+        levels = [hi for lo, hi in self.market_profile.current.single_prints()]
+        previous = self.market_profile.previous
+        if previous is not None and previous.poor_high():
+            levels.append(previous.high)
+        return any(self._crossed_above(level) for level in levels)
 
     def _weekly_value_area_break(self) -> bool:
         """주간 Value Area 이탈"""
-        # 구현 생략 (주간 데이터 분석 필요)
-        return True
+        # 현재 종가가 직전 주 Value Area 상단(VAH) 위
+        self._update_market_profile()
+        previous_week = self.market_profile.previous_week
+        if previous_week is None:
+            return False
+        _, vah, _ = previous_week.levels()
+        return self.close > vah
 
     def _obv_bullish_divergence(self) -> bool:
         """OBV 강세 다이버전스 감지"""
-        # 가격 신저가 vs OBV 고저점 유지
-        return self.low < self.low.shift(1) and self.obv > self.obv.shift(1)
+        # 가격 스윙 저점 하락 vs OBV 스윙 저점 상승 (이번 봉에서 확정)
+        self._update_divergences()
+        return REGULAR_BULLISH in self.divergences['obv']
 
     def _cvd_bullish_divergence(self) -> bool:
         """CVD 강세 다이버전스 감지"""
-        # 가격 신저가 vs CVD 고저점 유지
-        return self.low < self.low.shift(1) and self.cvd > self.cvd.shift(1)
+        # 가격 스윙 저점 하락 vs CVD 스윙 저점 상승 (이번 봉에서 확정)
+        self._update_divergences()
+        return REGULAR_BULLISH in self.divergences['cvd']
 
     def _low_volume_zone_pass(self) -> bool:
         """저거래량 구간 통과 확인"""
-        # Volume Profile 저거래량 영역 통과 로직
-        return True
+        # 이번 주 프로파일의 저거래량 영역(LVN) 상단을 이번 봉에서 상향 통과
+        self._update_market_profile()
+        lvn = self.market_profile.weekly.volume_nodes()['lvn']
+        return any(self._crossed_above(hi) for lo, hi in lvn)
 
     def calculate_position_size(self, entry_price: float) -> float:
         """위험 관리 기반 포지션 크기 계산"""
@@ -157,19 +248,21 @@ class IntegratedVolumeStrategy(Strategy):
 
     @property
     def obv(self):
-        """On-Balance Volume"""
-        return self.candles[:, 5]  # OBV 데이터
+        """최근 OBV_HISTORY개 On-Balance Volume (봉마다 누적 갱신, 마지막 값이 현재 봉)"""
+        self._update_divergences()
+        return np.asarray(self._obv_history)
 
     @property
     def cvd(self):
         """Cumulative Volume Delta"""
-        return self.candles[:, 6]  # CVD 데이터
+        if self.candles.shape[1] > CVD:
+            return self.candles[:, CVD]  # CVD 데이터 (src/tick_aggregator.append_flow_columns)
+        # 체결 데이터가 없으면 봉 종가 위치로 추정한 델타 누적
+        c = self.candles
+        return np.cumsum(volume_delta(c[:, HIGH], c[:, LOW], c[:, CLOSE], c[:, VOLUME]))
 
     @property
     def volume_profile(self):
-        """Volume Profile 객체"""
-        # 실제 구현에서는 Volume Profile 계산 로직 필요
-        class DummyProfile:
-            def get_poc(self):
-                return self.candles[-50:].mean()
-        return DummyProfile()
\ No newline at end of file
+        """진행 중인 세션 프로파일 (market_profile.SessionProfile)"""
+        self._update_market_profile()
+        return self.market_profile.current
@@ -1,21 +1,13 @@
 import backtrader as bt
-
-class OnBalanceVolume(bt.Indicator):
-    lines = ('obv',)
-    
-    def __init__(self):
-        self.addminperiod(1)
-        
-    def next(self):
-        if len(self.data) > 1:
-            if self.data.close[0] > self.data.close[-1]:
-                self.lines.obv[0] = self.lines.obv[-1] + self.data.volume[0]
-            elif self.data.close[0] < self.data.close[-1]:
-                self.lines.obv[0] = self.lines.obv[-1] - self.data.volume[0]
-            else:
-                self.lines.obv[0] = self.lines.obv[-1]
-        else:
-            self.lines.obv[0] = self.data.volume[0]
+import numpy as np
+try:
+    from ..indicators import OBV, SMA, obv, rolling_mean
+    from ..candle_view import as_candle_view
+    from .bt_indicators import OnBalanceVolume  # next()/once() 모두 지원 (runonce 벡터화 모드)
+except ImportError:
+    from indicators import OBV, SMA, obv, rolling_mean
+    from candle_view import as_candle_view
+    from strategies.bt_indicators import OnBalanceVolume
 
 class OBVStrategy(bt.Strategy):
     params = (
@@ -32,4 +24,46 @@ class OBVStrategy(bt.Strategy):
                 self.buy()
         else:
             if self.obv[0] < self.obv_ma[0]:
-                self.sell()
\ No newline at end of file
+                self.sell()
+
+class OBVSignalStrategy:
+    def __init__(self, data, ma_period=21):
+        """
+        OBV 이동평균 교차 전략 (실시간/DataFrame용, OBVStrategy와 같은 규칙)
+
+        OBV가 이동평균을 상향 돌파하면 매수(1), 하향 돌파하면 매도(-1)
+
+        :param data: DataFrame 또는 CandleView (columns: 'open', 'high', 'low', 'close', 'volume')
+        :param ma_period: OBV 이동평균 기간
+        """
+        self.data = as_candle_view(data)
+        self.ma_period = ma_period
+        self.obv = OBV()
+        self.obv_ma = SMA(ma_period)
+        self.prev_diff = np.nan
+        if len(self.data):
+            values = obv(self.data['close'], self.data['volume'])
+            self.obv.seed(self.data['close'], self.data['volume'])
+            self.obv_ma.seed(values)
+            self.prev_diff = values[-1] - rolling_mean(values, ma_period)[-1]
+
+    def generate_signals(self):
+        """매매 신호 생성"""
+        values = obv(self.data['close'], self.data['volume'])
+        diff = values - rolling_mean(values, self.ma_period)
+        prev = np.r_[np.nan, diff[:-1]]
+        signal = np.zeros(len(diff), dtype=int)
+        signal[(diff > 0) & (prev <= 0)] = 1
+        signal[(diff < 0) & (prev >= 0)] = -1
+        return self.data.series(signal, 'signal')
+
+    def on_bar(self, bar):
+        """새 봉 하나로 신호 계산 (O(1), generate_signals의 마지막 값과 동일)"""
+        value = self.obv.update(bar['close'], bar['volume'])
+        diff = value - self.obv_ma.update(value)
+        prev, self.prev_diff = self.prev_diff, diff
+        if diff > 0 and prev <= 0:
+            return 1
+        if diff < 0 and prev >= 0:
+            return -1
+        return 0
@@ -1,64 +1,121 @@
 import pandas as pd
 import numpy as np
+try:
+    from ..indicators import SMA, rolling_mean
+    from ..volume_profile import RollingVolumeProfile, rolling_volume_profile, atr_bin_size
+    from ..candle_view import as_candle_view
+except ImportError:
+    from indicators import SMA, rolling_mean
+    from volume_profile import RollingVolumeProfile, rolling_volume_profile, atr_bin_size
+    from candle_view import as_candle_view
 
 class VolumeProfileStrategy:
-    def __init__(self, data, window=100):
+    def __init__(self, data, window=100, bin_size=None, atr_fraction=0.25, warmup=None):
         """
         Volume Profile을 이용한 지지/저항 돌파(Breakout) 전략
         
-        :param data: DataFrame with columns ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        :param data: DataFrame 또는 CandleView (columns: 'open', 'high', 'low', 'close', 'volume')
         :param window: Volume Profile 계산 기간 (봉 개수)
+        :param bin_size: 가격 구간 크기 (None일 경우 ATR 기준으로 자동 설정)
+        :param atr_fraction: 자동 설정 시 ATR 대비 구간 크기 비율
+        :param warmup: 자동 설정 시 구간 크기를 정하는 앞쪽 봉 개수 (None일 경우 window,
+                       이 구간에서는 신호를 내지 않음)
         """
-        self.data = data.copy()
+        self.data = as_candle_view(data)  # 원본은 읽기 전용, 파생 시계열은 self.scratch
+        self.scratch = {}  # 파생 시계열 (poc, value_area_high/low, signal)
         self.window = window
+        self.bin_size = bin_size
+        self.atr_fraction = atr_fraction
+        # 구간 크기를 앞쪽 봉으로 정할 때만 그 구간 신호 제외 (고정 bin_size는 처음부터 인과적)
+        self.warmup = (window if warmup is None else warmup) if bin_size is None else 0
         self.calculate_volume_profile()
         
     def calculate_volume_profile(self):
-        """Volume Profile 계산"""
-        # 가격 레벨별 거래량 누적
-        self.data['price_level'] = self.data['close'].round(2)
-        volume_profile = self.data.groupby('price_level')['volume'].sum().reset_index()
+        """
+        봉별 Volume Profile 계산 (직전 window개 봉 기준)
+
+        각 봉에는 그 봉 이전까지의 프로파일 레벨을 기록하므로 돌파 판단에
+        미래 데이터가 섞이지 않는다. 자동 구간 크기는 처음 warmup개 봉으로 정하고
+        그 구간의 레벨은 비워 둔다 (데이터가 warmup보다 짧으면 있는 봉만 사용).
+        """
+        if self.bin_size is None:
+            self.bin_size = atr_bin_size(self.data['high'], self.data['low'], self.data['close'],
+                                         atr_fraction=self.atr_fraction, warmup=self.warmup)
+        self.profile = RollingVolumeProfile(self.window, self.bin_size)
+        poc, vah, val = rolling_volume_profile(
+            self.data['high'], self.data['low'], self.data['volume'], profile=self.profile
+        )
         
         # POC (Point of Control) - 최대 거래량 가격대
-        poc = volume_profile.loc[volume_profile['volume'].idxmax(), 'price_level']
-        self.data['poc'] = poc
+        self.scratch['poc'] = np.r_[np.nan, poc[:-1]]
         
         # Value Area (상위 70% 거래량 구간)
-        volume_profile = volume_profile.sort_values('volume', ascending=False)
-        cumulative_volume = volume_profile['volume'].cumsum()
-        total_volume = volume_profile['volume'].sum()
-        value_area = volume_profile[cumulative_volume <= total_volume * 0.7]
-        self.data['value_area_high'] = value_area['price_level'].max()
-        self.data['value_area_low'] = value_area['price_level'].min()
+        self.scratch['value_area_high'] = np.r_[np.nan, vah[:-1]]
+        self.scratch['value_area_low'] = np.r_[np.nan, val[:-1]]
+        for key in ('poc', 'value_area_high', 'value_area_low'):
+            self.scratch[key][:self.warmup] = np.nan
+        
+        # 실시간 갱신 상태 (on_bar)
+        self.levels = (poc[-1], vah[-1], val[-1]) if len(poc) else (np.nan, np.nan, np.nan)
+        self.prev_close = self.data['close'][-1] if len(self.data) else np.nan
+        self.count = len(self.data)  # 처리한 봉 수 (워밍업 판단)
+        self.volume_ma = SMA(self.window)
+        self.volume_ma.seed(self.data['volume'])
         
     def detect_breakout(self):
         """돌파 신호 감지"""
+        close = self.data['close']
+        prev_close = np.r_[np.nan, close[:-1]]
+        vah, val = self.scratch['value_area_high'], self.scratch['value_area_low']
+        
         # 신호 초기화
-        self.data['signal'] = 0
+        signal = np.zeros(len(close), dtype=int)
         
-        # 상승 돌파: 가격이 Value Area 상단 돌파
-        breakout_up = (self.data['close'] > self.data['value_area_high']) & \
-                     (self.data['close'].shift(1) <= self.data['value_area_high'])
-        self.data.loc[breakout_up, 'signal'] = 1
+        # 상승 돌파: 가격이 직전 Value Area 상단 돌파
+        signal[(close > vah) & (prev_close <= vah)] = 1
         
-        # 하락 돌파: 가격이 Value Area 하단 돌파
-        breakout_down = (self.data['close'] < self.data['value_area_low']) & \
-                       (self.data['close'].shift(1) >= self.data['value_area_low'])
-        self.data.loc[breakout_down, 'signal'] = -1
+        # 하락 돌파: 가격이 직전 Value Area 하단 돌파
+        signal[(close < val) & (prev_close >= val)] = -1
         
-        return self.data['signal']
+        self.scratch['signal'] = signal
+        return self.data.series(signal, 'signal')
         
     def generate_signals(self):
         """매매 신호 생성"""
         # 돌파 신호 감지
         self.detect_breakout()
+        signal = self.scratch['signal']
         
         # 추가 조건: 거래량이 평균의 1.5배 이상
-        avg_volume = self.data['volume'].rolling(window=self.window).mean()
-        volume_spike = self.data['volume'] > avg_volume * 1.5
-        self.data.loc[(self.data['signal'] != 0) & ~volume_spike, 'signal'] = 0
+        volume = self.data['volume']
+        avg_volume = rolling_mean(volume, self.window)
+        signal[(signal != 0) & ~(volume > avg_volume * 1.5)] = 0
+        
+        return self.data.series(signal, 'signal')
+
+    def on_bar(self, bar):
+        """
+        새 봉 하나로 신호 계산 (프로파일 증분 갱신, generate_signals의 마지막 값과 동일)
+
+        :param bar: {'high', 'low', 'close', 'volume'} 키를 가진 봉
+        :return: 1(상승 돌파), -1(하락 돌파), 0(관망)
+        """
+        _, vah, val = self.levels if self.count >= self.warmup else (np.nan, np.nan, np.nan)
+        close, prev_close = bar['close'], self.prev_close
+        avg_volume = self.volume_ma.update(bar['volume'])
         
-        return self.data['signal']
+        signal = 0
+        if close > vah and prev_close <= vah:
+            signal = 1
+        elif close < val and prev_close >= val:
+            signal = -1
+        if signal != 0 and not bar['volume'] > avg_volume * 1.5:
+            signal = 0
+            
+        self.levels = self.profile.update(bar['high'], bar['low'], bar['volume'])
+        self.prev_close = close
+        self.count += 1
+        return signal
 
 if __name__ == "__main__":
     # 테스트 데이터
@@ -1,57 +1,95 @@
-from .strategy_loader import load_strategy
+import numpy as np
+try:
+    from .strategy_loader import load_strategy
+    from .indicators import IndicatorEngine, VWAP, SMA, vwap, rolling_mean
+    from .candle_view import as_candle_view
+except ImportError:
+    from strategy_loader import load_strategy
+    from indicators import IndicatorEngine, VWAP, SMA, vwap, rolling_mean
+    from candle_view import as_candle_view
+
+# 기본 전략 파라미터
+VOLUME_MA_PERIOD = 20
+VOLUME_SPIKE_RATIO = 2
 
 class TradingStrategy:
-    def __init__(self, data, strategy_name=None, style=None):
+    def __init__(self, data, strategy_name=None, style=None,
+                 volume_ma_period=VOLUME_MA_PERIOD, volume_spike_ratio=VOLUME_SPIKE_RATIO):
         """
         거래량 기반 매매 전략 클래스
         
-        :param data: DataFrame with columns ['open', 'high', 'low', 'close', 'volume']
+        :param data: DataFrame 또는 CandleView (columns: 'open', 'high', 'low', 'close', 'volume')
         :param strategy_name: 사용할 전략 이름 (None일 경우 환경변수 사용)
         :param style: 거래 스타일 (SCALPING, SWING)
+        :param volume_ma_period: 기본 전략 거래량 이동평균 기간
+        :param volume_spike_ratio: 기본 전략 거래량 스파이크 배수 (이동평균 대비)
         """
-        self.data = data.copy()
-        self.strategy = load_strategy() if strategy_name is None else None
+        self.data = as_candle_view(data)  # 원본은 읽기 전용, 파생 시계열은 self.scratch
+        self.scratch = {}  # 파생 시계열 (vwap, volume_ma, signal 등)
+        self.strategy = load_strategy(data=self.data) if strategy_name is None else None
         self.strategy_name = strategy_name
         self.style = style
+        self.volume_ma_period = volume_ma_period
+        self.volume_spike_ratio = volume_spike_ratio
+        self.indicators = None  # 실시간 증분 지표 엔진 (on_bar 최초 호출 시 생성)
         
     def generate_signals(self):
         """매매 신호 생성"""
         if self.strategy:
-            return self.strategy.generate_signals(self.data)
+            return self.strategy.generate_signals()
         else:
             # 기본 전략 (VWAP + 거래량 스파이크)
             return self._generate_basic_signals()
             
     def _generate_basic_signals(self):
         """기본 매매 신호 생성 (VWAP + 거래량 스파이크)"""
+        high, low, close, volume = (self.data[col] for col in ('high', 'low', 'close', 'volume'))
+        
         # VWAP 계산
-        typical_price = (self.data['high'] + self.data['low'] + self.data['close']) / 3
-        cumulative_tp_volume = (typical_price * self.data['volume']).cumsum()
-        cumulative_volume = self.data['volume'].cumsum()
-        self.data['vwap'] = cumulative_tp_volume / cumulative_volume
+        self.scratch['vwap'] = vwap(high, low, close, volume)
         
-        # 거래량 스파이크 감지 (20기간 이동평균 대비 2배 이상)
-        self.data['volume_ma'] = self.data['volume'].rolling(window=20).mean()
-        self.data['volume_spike'] = (self.data['volume'] > 2 * self.data['volume_ma']).astype(int)
+        # 거래량 스파이크 감지 (이동평균 대비 volume_spike_ratio배 이상, 기본 20기간 2배)
+        self.scratch['volume_ma'] = rolling_mean(volume, self.volume_ma_period)
+        volume_spike = volume > self.volume_spike_ratio * self.scratch['volume_ma']
         
         # 신호 초기화
-        self.data['signal'] = 0
+        signal = np.zeros(len(close), dtype=int)
         
         # 매수 신호: 가격이 VWAP 아래이고 거래량 급증 발생
-        self.data.loc[
-            (self.data['close'] < self.data['vwap']) & 
-            (self.data['volume_spike'] == 1), 
-            'signal'
-        ] = 1  # 매수
+        signal[(close < self.scratch['vwap']) & volume_spike] = 1  # 매수
         
         # 매도 신호: 가격이 VWAP 위이고 거래량 급증 발생
-        self.data.loc[
-            (self.data['close'] > self.data['vwap']) & 
-            (self.data['volume_spike'] == 1), 
-            'signal'
-        ] = -1  # 매도
+        signal[(close > self.scratch['vwap']) & volume_spike] = -1  # 매도
         
-        return self.data['signal']
+        self.scratch['signal'] = signal
+        return self.data.series(signal, 'signal')
+
+    def on_bar(self, bar):
+        """
+        새 봉 하나로 기본 전략 신호 계산 (O(1), 과거 데이터 길이와 무관)
+
+        첫 호출 시 생성자에 넘긴 데이터로 지표 상태를 초기화하며,
+        결과는 _generate_basic_signals의 마지막 신호와 같다.
+
+        :param bar: {'timestamp': ms, 'high', 'low', 'close', 'volume'} 또는 같은 키의 Series
+        :return: 1(매수), -1(매도), 0(관망)
+        """
+        if self.strategy:
+            return self.strategy.on_bar(bar)
+        if self.indicators is None:
+            self.indicators = IndicatorEngine()
+            self.indicators.add('vwap', VWAP(), inputs=('timestamp', 'high', 'low', 'close', 'volume'))
+            self.indicators.add('volume_ma', SMA(self.volume_ma_period), inputs=('volume',))
+            if len(self.data):
+                self.indicators.seed(self.data)
+        values = self.indicators.update(bar)
+        if not bar['volume'] > self.volume_spike_ratio * values['volume_ma']:
+            return 0
+        if bar['close'] < values['vwap']:
+            return 1
+        if bar['close'] > values['vwap']:
+            return -1
+        return 0
         
 if __name__ == "__main__":
     import pandas as pd
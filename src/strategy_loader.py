@@ -1,53 +1,182 @@
 import os
+import importlib
 from dotenv import load_dotenv
-from .strategies.obv_strategy import OBVStrategy
-from .strategies.volume_profile_strategy import VolumeProfileStrategy
 
 # 환경 변수 로드
 load_dotenv(os.path.join(os.path.dirname(__file__), '../config/.env'))
 
+# 기본 전략 (TRADING_STRATEGY 미설정 시)
+DEFAULT_STRATEGY = 'obv'
+
+# 전략 레지스트리: 이름 -> {'factory', 'title'}
+STRATEGIES = {}
+
+
+def register_strategy(name, title=None):
+    """
+    전략 등록 데코레이터
+
+    등록 대상은 data를 첫 인자로 받고 generate_signals()/on_bar(bar)를 제공하는
+    클래스(또는 팩토리 함수)다.
+
+    사용 예:
+        @register_strategy('my_strategy', 'My Strategy')
+        class MyStrategy:
+            ...
+    """
+    def decorator(factory):
+        STRATEGIES[name.lower()] = {'factory': factory, 'title': title or name}
+        return factory
+    return decorator
+
+
+def _lazy(module, attr, **defaults):
+    """모듈을 처음 사용할 때 임포트하는 팩토리 (순환 임포트 방지)"""
+    def factory(data, **params):
+        try:
+            mod = importlib.import_module(f'.{module}', __package__)
+        except (ImportError, TypeError):
+            mod = importlib.import_module(module)
+        return getattr(mod, attr)(data, **{**defaults, **params})
+    return factory
+
+
+register_strategy('obv', "OBV Crossover Strategy")(
+    _lazy('strategies.obv_strategy', 'OBVSignalStrategy'))
+register_strategy('volume_profile', "Volume Profile Breakout Strategy")(
+    _lazy('strategies.volume_profile_strategy', 'VolumeProfileStrategy'))
+register_strategy('basic', "VWAP + Volume Spike Strategy")(
+    _lazy('strategy', 'TradingStrategy', strategy_name='BASIC'))
+
+
+def strategy_names():
+    """환경 설정의 전략 이름 목록 (TRADING_STRATEGY=obv,volume_profile 처럼 여러 개 지정 가능)"""
+    value = os.getenv('TRADING_STRATEGY', DEFAULT_STRATEGY)
+    return [name.strip().lower() for name in value.split(',') if name.strip()]
+
+
+def load_strategy(name=None, data=None, **params):
+    """
+    레지스트리에서 전략 인스턴스 생성
+
+    :param name: 전략 이름 (None일 경우 환경변수의 첫 번째 전략)
+    :param data: 초기 상태를 만들 과거 캔들 DataFrame
+    :param params: 전략 파라미터
+    """
+    name = (name or strategy_names()[0]).lower()
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy type: {name}")
+    return STRATEGIES[name]['factory'](data, **params)
+
+
+class StrategyRunner:
+    def __init__(self, data, names=None, params=None):
+        """
+        여러 전략을 한 번만 생성해 같은 데이터로 나란히 실행
+
+        각 전략은 생성 시 과거 데이터로 상태를 만들고, 이후에는 마감된 새 봉만
+        on_bar()로 받아 상태를 이어서 갱신한다.
+
+        :param data: 마감된 과거 캔들 DataFrame (timestamp 인덱스)
+        :param names: 전략 이름 목록 (None일 경우 환경변수)
+        :param params: {전략 이름: 파라미터 딕셔너리}
+        """
+        self.names = list(names or strategy_names())
+        params = params or {}
+        self.strategies = {name: load_strategy(name, data, **params.get(name, {})) for name in self.names}
+        self.last_timestamp = data.index[-1] if len(data) else None
+        self.signals = {name: 0 for name in self.names}
+
+    @property
+    def primary(self):
+        """첫 번째 전략 이름 (주문 신호 기준)"""
+        return self.names[0]
+
+    def on_bar(self, bar):
+        """
+        새 봉 하나를 모든 전략에 전달
+
+        :return: {전략 이름: 신호}
+        """
+        self.signals = {name: strategy.on_bar(bar) for name, strategy in self.strategies.items()}
+        return self.signals
+
+    def feed(self, data, closed_only=True):
+        """
+        DataFrame에서 아직 처리하지 않은 봉만 전략에 전달
+
+        :param data: 최근 캔들 DataFrame (fetch_latest_data 결과)
+        :param closed_only: True이면 진행 중인 마지막 봉은 제외
+        :return: 마지막으로 처리한 봉의 {전략 이름: 신호}, 새 봉이 없으면 None
+        """
+        if closed_only:
+            data = data.iloc[:-1]
+        if self.last_timestamp is not None:
+            data = data.iloc[data.index.searchsorted(self.last_timestamp, side='right'):]
+        if data.empty:
+            return None
+        # on_bar 입력: 컬럼 딕셔너리 + ms timestamp
+        columns = list(data.columns)
+        timestamps = data.index.as_unit('ms').asi8 if data.index.dtype.kind == 'M' else data.index
+        for timestamp, row in zip(timestamps, data.to_numpy(dtype=float)):
+            bar = dict(zip(columns, row))
+            bar['timestamp'] = int(timestamp)
+            self.on_bar(bar)
+        self.last_timestamp = data.index[-1]
+        return self.signals
+
+
 class StrategyLoader:
     @staticmethod
     def get_strategy(data):
         """환경 설정에 따라 전략 인스턴스 반환"""
-        strategy_type = os.getenv('TRADING_STRATEGY', 'obv').lower()
-        
-        if strategy_type == 'obv':
-            return OBVStrategy(data)
-        elif strategy_type == 'volume_profile':
-            return VolumeProfileStrategy(data)
-        else:
-            raise ValueError(f"Unknown strategy type: {strategy_type}")
+        return load_strategy(data=data)
+
+    @staticmethod
+    def get_runner(data, names=None):
+        """환경 설정의 전략들을 한 번 생성한 실행기 반환"""
+        return StrategyRunner(data, names)
 
     @staticmethod
     def get_strategy_name():
         """현재 선택된 전략 이름 반환"""
-        strategy_type = os.getenv('TRADING_STRATEGY', 'obv').lower()
-        
-        if strategy_type == 'obv':
-            return "OBV Divergence Strategy"
-        elif strategy_type == 'volume_profile':
-            return "Volume Profile Breakout Strategy"
-        else:
-            return "Unknown Strategy"
+        titles = [STRATEGIES[name]['title'] if name in STRATEGIES else "Unknown Strategy"
+                  for name in strategy_names()]
+        return ", ".join(titles)
 
 if __name__ == "__main__":
     # 테스트 데이터
+    import time
     import pandas as pd
     import numpy as np
-    
+
+    n = 2000
+    close = np.cumsum(np.random.randn(n)) + 100
     data = pd.DataFrame({
-        'timestamp': pd.date_range(start='2023-01-01', periods=100, freq='T'),
-        'open': np.random.rand(100) * 100 + 100,
-        'high': np.random.rand(100) * 5 + 105,
-        'low': np.random.rand(100) * 5 + 95,
-        'close': np.random.rand(100) * 10 + 100,
-        'volume': np.random.randint(1000, 10000, 100)
-    })
-    
+        'open': close + np.random.randn(n) * 0.1,
+        'high': close + np.random.rand(n) * 2,
+        'low': close - np.random.rand(n) * 2,
+        'close': close,
+        'volume': np.random.randint(1000, 10000, n).astype(float)
+    }, index=pd.date_range(start='2023-01-01', periods=n, freq='min', name='timestamp'))
+
     # 전략 로드 테스트
     strategy = StrategyLoader.get_strategy(data)
     print(f"Loaded strategy: {StrategyLoader.get_strategy_name()}")
     signals = strategy.generate_signals()
     print("Sample signals:")
-    print(signals.tail(10))
\ No newline at end of file
+    print(signals.tail(10))
+
+    # 여러 전략 동시 실행: 과거 구간으로 생성 후 나머지 봉을 증분 처리
+    names = ['obv', 'volume_profile', 'basic']
+    runner = StrategyRunner(data.iloc[:1500], names)
+    started = time.perf_counter()
+    live = {name: [] for name in names}
+    for i in range(1500, n):
+        for name, signal in runner.feed(data.iloc[:i + 1], closed_only=False).items():
+            live[name].append(signal)
+    elapsed = time.perf_counter() - started
+    print(f"Incremental: {(n - 1500) / elapsed:,.0f} bars/s for {len(names)} strategies")
+    for name in names:
+        batch = load_strategy(name, data).generate_signals().to_numpy()[1500:]
+        print(f"{name}: matches batch={np.array_equal(batch, np.asarray(live[name]))}")
@@ -0,0 +1,275 @@
+import csv
+import gzip
+import numpy as np
+
+# 체결 배열 컬럼: timestamp(ms), price, size, side(+1 매수 공격 / -1 매도 공격)
+TRADE_COLUMNS = ('timestamp', 'price', 'size', 'side')
+
+# 집계 봉 컬럼
+BAR_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume',
+               'buy_volume', 'sell_volume', 'delta', 'cvd')
+
+# 캔들 배열에 덧붙이는 주문 흐름 컬럼 (IntegratedVolumeStrategy는 6번 컬럼을 CVD로 읽는다)
+FLOW_COLUMNS = ('cvd', 'delta', 'buy_volume', 'sell_volume')
+
+
+def classify_side(prices, sides=None, prev_price=None, prev_side=1):
+    """
+    체결 공격 방향 분류
+
+    거래소가 taker 방향을 주면(+1/-1) 그대로 쓰고, 0이거나 없으면 tick rule
+    (직전과 다른 가격 대비 상승이면 매수, 하락이면 매도)로 추정한다.
+
+    :param prices: 체결 가격 배열
+    :param sides: 거래소 제공 방향 배열 (+1, -1, 0) 또는 None
+    :param prev_price: 직전 묶음의 마지막 체결 가격 (연속 처리용)
+    :param prev_side: 직전 tick 방향 (가격 변동이 없을 때 사용)
+    :return: +1/-1 int8 배열
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if prev_price is None:
+        prev_price = prices[0] if len(prices) else 0.0
+    tick = np.sign(np.diff(prices, prepend=prev_price)).astype(np.int8)
+    # 가격 변동이 없으면 직전 방향 유지 (forward fill)
+    idx = np.where(tick != 0, np.arange(len(tick)), -1)
+    np.maximum.accumulate(idx, out=idx)
+    tick = np.where(idx >= 0, tick[idx], prev_side).astype(np.int8)
+    if sides is None:
+        return tick
+    sides = np.asarray(sides, dtype=np.int8)
+    return np.where(sides != 0, sides, tick).astype(np.int8)
+
+
+def _reduce_bars(ts, price, size, side, bar_ids, bar_ts, cvd_start=0.0):
+    """정렬된 bar_ids 기준으로 체결을 봉으로 집계"""
+    starts = np.flatnonzero(np.r_[True, bar_ids[1:] != bar_ids[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+    buy = np.where(side > 0, size, 0.0)
+    sell = size - buy
+    bars = np.empty((len(starts), len(BAR_COLUMNS)), dtype=np.float64)
+    bars[:, 0] = bar_ts[starts]
+    bars[:, 1] = price[starts]
+    bars[:, 2] = np.maximum.reduceat(price, starts)
+    bars[:, 3] = np.minimum.reduceat(price, starts)
+    bars[:, 4] = price[ends]
+    bars[:, 5] = np.add.reduceat(size, starts)
+    bars[:, 6] = np.add.reduceat(buy, starts)
+    bars[:, 7] = np.add.reduceat(sell, starts)
+    bars[:, 8] = bars[:, 6] - bars[:, 7]
+    bars[:, 9] = cvd_start + np.cumsum(bars[:, 8])
+    return bars
+
+
+def aggregate_time_bars(trades, interval_ms, cvd_start=0.0):
+    """
+    체결 배열을 시간 봉으로 집계 (체결이 없는 구간의 봉은 생성하지 않음)
+
+    :param trades: (N, 4) 배열 [timestamp, price, size, side]
+    :param interval_ms: 봉 길이 (ms)
+    :return: (M, 10) 배열 (BAR_COLUMNS 순서)
+    """
+    trades = np.asarray(trades, dtype=np.float64)
+    if len(trades) == 0:
+        return np.empty((0, len(BAR_COLUMNS)))
+    ts, price, size, side = trades.T
+    bar_ts = ts // interval_ms * interval_ms
+    return _reduce_bars(ts, price, size, side, bar_ts, bar_ts, cvd_start)
+
+
+def aggregate_volume_bars(trades, bar_volume, cvd_start=0.0):
+    """
+    체결 배열을 거래량 봉으로 집계 (누적 거래량이 bar_volume에 도달할 때마다 봉 마감)
+
+    봉 경계에 걸친 체결은 나누지 않고 경계를 넘긴 봉에 포함한다.
+    마지막 봉은 bar_volume에 못 미칠 수 있다(진행 중 봉).
+
+    :return: (M, 10) 배열 (timestamp는 봉 첫 체결 시각)
+    """
+    trades = np.asarray(trades, dtype=np.float64)
+    if len(trades) == 0:
+        return np.empty((0, len(BAR_COLUMNS)))
+    ts, price, size, side = trades.T
+    cum_before = np.cumsum(size) - size
+    bar_ids = (cum_before // bar_volume).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, bar_ids[1:] != bar_ids[:-1]])
+    bar_ts = np.repeat(ts[starts], np.diff(np.r_[starts, len(ts)]))
+    return _reduce_bars(ts, price, size, side, bar_ids, bar_ts, cvd_start)
+
+
+def rebucket_bars(bars, bar_ts):
+    """
+    집계 봉을 더 긴 봉으로 다시 묶음 (예: 1m 체결 봉 -> 5m)
+
+    :param bars: 시간순 (M, 10) 배열 (BAR_COLUMNS 순서)
+    :param bar_ts: 각 봉이 속할 새 봉 시작 시각 (길이 M, 오름차순)
+    :return: (K, 10) 배열
+    """
+    bars = np.asarray(bars, dtype=np.float64)
+    if len(bars) == 0:
+        return np.empty((0, len(BAR_COLUMNS)))
+    bar_ts = np.asarray(bar_ts, dtype=np.float64)
+    starts = np.flatnonzero(np.r_[True, bar_ts[1:] != bar_ts[:-1]])
+    ends = np.r_[starts[1:], len(bars)] - 1
+    out = np.empty((len(starts), len(BAR_COLUMNS)), dtype=np.float64)
+    out[:, 0] = bar_ts[starts]
+    out[:, 1] = bars[starts, 1]
+    out[:, 2] = np.maximum.reduceat(bars[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(bars[:, 3], starts)
+    out[:, 4] = bars[ends, 4]
+    out[:, 5:9] = np.add.reduceat(bars[:, 5:9], starts, axis=0)
+    out[:, 9] = bars[ends, 9]
+    return out
+
+
+class TickAggregator:
+    def __init__(self, interval_ms=60000, max_bars=10000):
+        """
+        실시간 체결 -> 시간 봉 증분 집계기
+
+        체결 묶음(WebSocket 메시지 단위)을 numpy로 한 번에 집계하고, 진행 중인
+        봉 상태와 누적 CVD를 유지한다.
+
+        :param interval_ms: 봉 길이 (ms)
+        :param max_bars: 보관할 완성 봉 개수
+        """
+        self.interval_ms = interval_ms
+        self.max_bars = max_bars
+        self.bars = np.empty((0, len(BAR_COLUMNS)))  # 완성 봉
+        self.current = None  # 진행 중 봉 (BAR_COLUMNS 길이 배열)
+        self.cvd = 0.0  # 마지막 완성 봉까지의 누적 델타
+        self.last_price = None
+        self.last_tick = 1
+
+    def on_trades(self, trades):
+        """
+        체결 묶음 반영
+
+        :param trades: (N, 4) 배열 [timestamp, price, size, side] (side 0은 tick rule로 분류)
+        :return: 이번 묶음으로 완성된 봉 배열
+        """
+        trades = np.array(trades, dtype=np.float64).reshape(-1, len(TRADE_COLUMNS))
+        if len(trades) == 0:
+            return np.empty((0, len(BAR_COLUMNS)))
+        tick = classify_side(trades[:, 1], prev_price=self.last_price, prev_side=self.last_tick)
+        trades[:, 3] = np.where(trades[:, 3] != 0, trades[:, 3], tick)
+        self.last_tick = int(tick[-1])
+        self.last_price = trades[-1, 1]
+
+        new_bars = aggregate_time_bars(trades, self.interval_ms)
+        if self.current is not None:
+            if new_bars[0, 0] == self.current[0]:
+                new_bars[0] = self._merge(self.current, new_bars[0])
+            else:
+                new_bars = np.vstack([self.current, new_bars])
+        # 누적 델타 재계산 (완성 봉 기준값에서 시작)
+        new_bars[:, 9] = self.cvd + np.cumsum(new_bars[:, 8])
+
+        completed = new_bars[:-1]
+        self.current = new_bars[-1].copy()
+        if len(completed):
+            self.cvd = completed[-1, 9]
+            self.bars = np.vstack([self.bars, completed])[-self.max_bars:]
+        return completed
+
+    @staticmethod
+    def _merge(bar, update):
+        """같은 시각 봉 병합 (bar가 먼저 발생)"""
+        merged = bar.copy()
+        merged[2] = max(bar[2], update[2])
+        merged[3] = min(bar[3], update[3])
+        merged[4] = update[4]
+        merged[5:9] = bar[5:9] + update[5:9]
+        return merged
+
+    def on_message(self, message):
+        """Bybit publicTrade WebSocket 메시지 반영 (MarketDataStream 콜백으로 사용)"""
+        return self.on_trades(parse_bybit_trades(message['data']))
+
+    def snapshot(self):
+        """완성 봉 + 진행 중 봉"""
+        if self.current is None:
+            return self.bars
+        return np.vstack([self.bars, self.current])
+
+
+def parse_bybit_trades(data):
+    """Bybit v5 publicTrade 메시지 data 목록을 체결 배열로 변환"""
+    trades = np.empty((len(data), len(TRADE_COLUMNS)), dtype=np.float64)
+    for i, t in enumerate(data):
+        trades[i] = (t['T'], float(t['p']), float(t['v']), 1.0 if t['S'] == 'Buy' else -1.0)
+    return trades
+
+
+def load_trades_csv(path):
+    """
+    Bybit 공개 체결 기록 파일(public.bybit.com/trading, .csv 또는 .csv.gz) 로드
+
+    컬럼: timestamp(초), symbol, side, size, price, ...
+    :return: 시간순 정렬된 (N, 4) 체결 배열
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        cols = {name: i for i, name in enumerate(header)}
+        rows = [(r[cols['timestamp']], r[cols['price']], r[cols['size']], r[cols['side']]) for r in reader]
+    if not rows:
+        return np.empty((0, len(TRADE_COLUMNS)))
+    ts, price, size, side = zip(*rows)
+    trades = np.column_stack([
+        np.round(np.asarray(ts, dtype=np.float64) * 1000),
+        np.asarray(price, dtype=np.float64),
+        np.asarray(size, dtype=np.float64),
+        np.where(np.asarray(side) == 'Buy', 1.0, -1.0),
+    ])
+    return trades[np.argsort(trades[:, 0], kind='stable')]
+
+
+def append_flow_columns(candles, bars):
+    """
+    캔들 배열 뒤에 주문 흐름 컬럼(FLOW_COLUMNS)을 붙인 새 배열 반환
+
+    timestamp(0번 컬럼)가 같은 봉끼리 맞추며, 체결이 없던 캔들은 델타 0,
+    CVD는 직전 값을 유지한다.
+
+    :param candles: (N, K) 캔들 배열 (0번 컬럼 timestamp)
+    :param bars: aggregate_time_bars 결과
+    :return: (N, K + 4) 배열
+    """
+    candles = np.asarray(candles, dtype=np.float64)
+    flow = np.zeros((len(candles), len(FLOW_COLUMNS)))
+    if len(bars):
+        pos = np.minimum(np.searchsorted(bars[:, 0], candles[:, 0]), len(bars) - 1)
+        matched = bars[pos, 0] == candles[:, 0]
+        flow[matched, 1:] = bars[pos[matched]][:, [8, 6, 7]]
+        # CVD: 해당 캔들 시각까지 마지막 봉의 누적값
+        last = np.searchsorted(bars[:, 0], candles[:, 0], side='right') - 1
+        flow[:, 0] = np.where(last >= 0, bars[np.maximum(last, 0), 9], 0.0)
+    return np.hstack([candles, flow])
+
+
+if __name__ == "__main__":
+    import time
+
+    # 합성 체결 500만 건 집계 처리량 확인
+    n = 5_000_000
+    ts = 1_700_000_000_000 + np.sort(np.random.randint(0, 3_600_000, n)).astype(np.float64)
+    price = 50000 + np.cumsum(np.random.randn(n) * 0.5)
+    size = np.random.exponential(0.01, n)
+    trades = np.column_stack([ts, price, size, classify_side(price)])
+
+    started = time.perf_counter()
+    bars = aggregate_time_bars(trades, 60000)
+    elapsed = time.perf_counter() - started
+    print(f"Time bars: {len(bars)} from {n:,} trades in {elapsed:.2f}s ({n / elapsed / 1e6:.1f}M trades/s)")
+
+    vbars = aggregate_volume_bars(trades, 100.0)
+    print(f"Volume bars: {len(vbars)}, final CVD: {vbars[-1, 9]:.2f} (time bars: {bars[-1, 9]:.2f})")
+
+    # 실시간 경로: 100건씩 메시지 단위로 투입
+    live = TickAggregator(60000)
+    started = time.perf_counter()
+    for chunk in np.array_split(trades[:200_000], 2000):
+        live.on_trades(chunk)
+    elapsed = time.perf_counter() - started
+    print(f"Streaming: {200_000 / elapsed:,.0f} trades/s, bars: {len(live.snapshot())}")
@@ -0,0 +1,175 @@
+import math
+from collections import deque
+import numpy as np
+try:
+    from .indicators import true_range, rolling_mean
+except ImportError:
+    from indicators import true_range, rolling_mean
+
+
+def atr_bin_size(high, low, close, atr_period=14, atr_fraction=0.25, warmup=None):
+    """
+    ATR 기준 가격 구간 크기 (워밍업 구간 ATR 중앙값 * atr_fraction)
+
+    처음 warmup개 봉만 사용하므로 이후 데이터가 늘어나도 값이 바뀌지 않는다
+    (워밍업 이후 봉에 미래 데이터가 섞이지 않고, 배치와 실시간 갱신이 같은 구간 크기를 쓴다).
+
+    :param atr_fraction: ATR 대비 구간 크기 비율 (0.25 = ATR 하나를 4개 구간으로)
+    :param warmup: 구간 크기 계산에 쓸 앞쪽 봉 개수 (None이면 전체)
+    """
+    if warmup is not None:
+        high, low, close = high[:warmup], low[:warmup], close[:warmup]
+    atr = rolling_mean(true_range(high, low, close), atr_period)
+    if not np.isfinite(atr).any():
+        atr = true_range(high, low, close)
+    size = float(np.nanmedian(atr)) * atr_fraction
+    return size if size > 0 else 1.0
+
+
+def value_area_bounds(hist, poc_index, target):
+    """
+    POC에서 시작해 위/아래 중 거래량이 큰 쪽으로 한 구간씩 넓혀 target 거래량을 담는 범위
+
+    :return: (아래 끝, 위 끝) 인덱스 (포함)
+    """
+    up = down = poc_index
+    acc = hist[up]
+    last = len(hist) - 1
+    while acc < target and (up < last or down > 0):
+        above = hist[up + 1] if up < last else -1.0
+        below = hist[down - 1] if down > 0 else -1.0
+        if above >= below:
+            up += 1
+            acc += above
+        else:
+            down -= 1
+            acc += below
+    return down, up
+
+
+class RollingVolumeProfile:
+    def __init__(self, window=100, bin_size=1.0, value_area=0.7, origin=0.0):
+        """
+        최근 window개 봉의 가격 구간별 거래량 분포 (슬라이딩 윈도우)
+
+        각 봉의 거래량을 고가~저가 범위의 구간에 균등 분배하고, 새 봉을 더하고
+        가장 오래된 봉을 빼는 방식으로 갱신하므로 매 봉마다 전체를 다시
+        집계/정렬하지 않는다.
+
+        :param window: 프로파일 기간 (봉 개수)
+        :param bin_size: 가격 구간 크기 (틱 크기 배수 또는 atr_bin_size 결과)
+        :param value_area: Value Area 거래량 비율
+        :param origin: 구간 기준 가격
+        """
+        self.window = window
+        self.bin_size = float(bin_size)
+        self.value_area = value_area
+        self.origin = origin
+        self.hist = np.zeros(0)
+        self.base = 0  # hist[0]에 해당하는 구간 번호
+        self.bars = deque()  # (lo_bin, hi_bin, 구간당 거래량)
+        self.total = 0.0
+        self.poc_bin = None
+
+    def _bin(self, price):
+        return int(math.floor((price - self.origin) / self.bin_size))
+
+    def _ensure(self, lo, hi):
+        """hist가 [lo, hi] 구간을 담도록 확장"""
+        if len(self.hist) == 0:
+            pad = max(hi - lo + 1, 64)
+            self.base = lo - pad
+            self.hist = np.zeros(hi - lo + 1 + 2 * pad)
+            return
+        top = self.base + len(self.hist) - 1
+        if lo >= self.base and hi <= top:
+            return
+        pad = max(hi - lo + 1, len(self.hist) // 2, 64)
+        new_base = min(self.base, lo - pad)
+        new_top = max(top, hi + pad)
+        hist = np.zeros(new_top - new_base + 1)
+        hist[self.base - new_base:self.base - new_base + len(self.hist)] = self.hist
+        self.hist, self.base = hist, new_base
+
+    def update(self, high, low, volume):
+        """
+        새 봉 추가 (window 초과 시 가장 오래된 봉 제거)
+
+        :return: (POC, VAH, VAL) 가격
+        """
+        lo, hi = self._bin(low), self._bin(high)
+        if hi < lo:
+            lo, hi = hi, lo
+        per_bin = volume / (hi - lo + 1)
+        self._ensure(lo, hi)
+        added = self.hist[lo - self.base:hi - self.base + 1]
+        added += per_bin
+        self.bars.append((lo, hi, per_bin))
+        self.total += volume
+
+        # POC: 새로 더한 구간이 기존 POC보다 커졌는지만 확인
+        if self.poc_bin is None or added.max() > self.hist[self.poc_bin - self.base]:
+            self.poc_bin = lo + int(np.argmax(added))
+
+        if len(self.bars) > self.window:
+            old_lo, old_hi, old_per = self.bars.popleft()
+            removed = self.hist[old_lo - self.base:old_hi - self.base + 1]
+            removed -= old_per
+            np.maximum(removed, 0.0, out=removed)
+            self.total -= old_per * (old_hi - old_lo + 1)
+            if old_lo <= self.poc_bin <= old_hi:
+                # POC 구간이 줄었을 때만 현재 윈도우 범위에서 다시 찾는다
+                win_lo = min(b[0] for b in self.bars)
+                win_hi = max(b[1] for b in self.bars)
+                segment = self.hist[win_lo - self.base:win_hi - self.base + 1]
+                self.poc_bin = win_lo + int(np.argmax(segment))
+        return self.levels()
+
+    def levels(self):
+        """현재 (POC, VAH, VAL) 가격 (POC는 구간 중앙, VAH/VAL은 구간 경계)"""
+        if self.poc_bin is None:
+            return np.nan, np.nan, np.nan
+        base = self.base
+        target = self.total * self.value_area * (1 - 1e-9)  # 누적 오차 허용
+        down, up = value_area_bounds(self.hist, self.poc_bin - base, target)
+        poc = self.origin + (self.poc_bin + 0.5) * self.bin_size
+        vah = self.origin + (up + base + 1) * self.bin_size
+        val = self.origin + (down + base) * self.bin_size
+        return poc, vah, val
+
+
+def rolling_volume_profile(high, low, volume, window=100, bin_size=1.0, value_area=0.7, profile=None):
+    """
+    봉별 슬라이딩 윈도우 Volume Profile 레벨 계산
+
+    i번째 값은 i번째 봉까지(포함) 최근 window개 봉의 프로파일이다.
+
+    :param profile: 이어서 갱신할 RollingVolumeProfile (None이면 새로 생성)
+    :return: (poc, vah, val) 배열
+    """
+    high, low, volume = (np.asarray(a, dtype=np.float64) for a in (high, low, volume))
+    if profile is None:
+        profile = RollingVolumeProfile(window, bin_size, value_area)
+    out = np.empty((len(high), 3))
+    for i in range(len(high)):
+        out[i] = profile.update(high[i], low[i], volume[i])
+    return out[:, 0], out[:, 1], out[:, 2]
+
+
+if __name__ == "__main__":
+    import time
+
+    # 1시간봉 5년치 합성 데이터
+    n = 5 * 365 * 24
+    rng = np.random.default_rng(0)
+    close = 30000 + np.cumsum(rng.standard_normal(n) * 100)
+    high = close + rng.random(n) * 150
+    low = close - rng.random(n) * 150
+    volume = rng.exponential(100, n)
+
+    bin_size = atr_bin_size(high, low, close, warmup=1000)
+    started = time.perf_counter()
+    poc, vah, val = rolling_volume_profile(high, low, volume, window=100, bin_size=bin_size)
+    elapsed = time.perf_counter() - started
+    print(f"Profiled {n:,} bars (bin {bin_size:.2f}) in {elapsed:.2f}s")
+    print(f"Last POC/VAH/VAL: {poc[-1]:.1f} / {vah[-1]:.1f} / {val[-1]:.1f}, close {close[-1]:.1f}")